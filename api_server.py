@@ -5,8 +5,9 @@ import io
 import requests
 import json
 import asyncio
-from typing import Dict, List
+from typing import Dict, Iterator, List, Tuple
 from phase_2_yandex_gpt import MisMatchAI, SKILLS_TAXONOMY
+from utils.file_parser import MAX_PAGES, limit_text
 
 app = FastAPI(
     title="MisMatch API",
@@ -17,6 +18,19 @@ app = FastAPI(
 GITHUB_HTML_URL = "https://raw.githubusercontent.com/maksimmishakov/Mismatch-ai-recruiter/master/templates/index.html"
 ai_brain = MisMatchAI()
 
+def _iter_pdf_pages(pdf) -> Iterator[str]:
+    for page in pdf.pages[:MAX_PAGES]:
+        text = page.extract_text() or ""
+        page.flush_cache()  # drop parsed layout objects once the text is out
+        yield text
+
+
+def _extract_pdf_text(contents: bytes) -> Tuple[str, int]:
+    """Page-limited, byte-budgeted PDF text and the document's page count"""
+    with pdfplumber.open(io.BytesIO(contents)) as pdf:
+        return "".join(limit_text(_iter_pdf_pages(pdf))), len(pdf.pages)
+
+
 @app.get("/", response_class=HTMLResponse)
 async def get_index():
     """Serve index.html from GitHub (always fresh)"""
@@ -36,15 +50,13 @@ async def analyze_resume(file: UploadFile = File(...)):
     
     try:
         contents = await file.read()
-        with pdfplumber.open(io.BytesIO(contents)) as pdf:
-            text = ""
-            for page in pdf.pages:
-                text += page.extract_text() or ""
+        # Extraction is CPU-bound; run it off the event loop
+        text, page_count = await asyncio.to_thread(_extract_pdf_text, contents)
         
         return {
             "status": "success",
             "filename": file.filename,
-            "pages": len(pdf.pages),
+            "pages": page_count,
             "text_length": len(text),
             "text_preview": text[:1000]
         }
@@ -72,8 +84,7 @@ async def analyze_resume_ai(file: UploadFile = File(...)):
     
     try:
         contents = await file.read()
-        with pdfplumber.open(io.BytesIO(contents)) as pdf:
-            resume_text = "".join(page.extract_text() or "" for page in pdf.pages)
+        resume_text, _ = await asyncio.to_thread(_extract_pdf_text, contents)
         
         if not resume_text.strip():
             raise HTTPException(status_code=400, detail="Could not extract text from PDF")
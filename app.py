@@ -1,4 +1,6 @@
 import os
+import asyncio
+import hashlib
 from flask import Flask, jsonify, request, render_template
 from flask_sqlalchemy import SQLAlchemy
 from dotenv import load_dotenv
@@ -12,6 +14,9 @@ from llm_client import LLMClient
 from services.embedding_service import EmbeddingService
 from services.salary_predictor import SalaryPredictor
 from services.cache_service import CacheService
+from services.single_flight import RedisLockBackend, SingleFlightCache
+from services.embedding_store import get_embedding_store
+from services.model_registry import get_model, model_registry, preload_from_env
 # ==================
 
 # Инициализируй клиент при старте
@@ -37,6 +42,16 @@ redis_url = os.getenv('REDIS_URL', 'redis://localhost:6379')
 embedding_service = EmbeddingService()
 salary_predictor = SalaryPredictor()
 cache_service = CacheService(redis_url)
+# Concurrent misses on one key share a single computation, across workers too.
+# The leader's heartbeat keeps the lock alive for as long as the LLM call runs,
+# so followers wait out the call's worst case (timeouts plus retries).
+single_flight_wait = llm_client.worst_case_seconds + 5.0 if llm_client else 30.0
+single_flight = SingleFlightCache(cache_service, RedisLockBackend(cache_service.redis),
+                                  lock_ttl=30.0, wait_timeout=single_flight_wait)
+embedding_store = get_embedding_store()
+# Models named in PRELOAD_MODELS load here, i.e. in the gunicorn master
+# before fork when preload_app is on; everything else loads on first use
+preload_from_env()
 # ===============================
 
 # Êîíôèãóðàöèÿ çàãðóçîê
@@ -187,6 +202,7 @@ def health():
         return jsonify({
             'status': 'healthy',
             'database': 'connected',
+            'models': model_registry.get_stats(),
             'timestamp': datetime.utcnow().isoformat()
         }), 200
     except Exception as e:
@@ -368,8 +384,10 @@ def analyze_resume_with_ai(candidate_id):
         # Получить текст резюме
         resume_text = f"Имя: {candidate.name}\nДолжность: {candidate.position}\nНавыки: {', '.join(candidate.skills) if candidate.skills else 'N/A'}"
         
-        # Анализировать через LLM
-        ai_data = llm_client.analyze_resume(resume_text)
+        # Анализировать через LLM; одновременные запросы ждут один вызов
+        cache_key = f"analyze:{candidate_id}:{hashlib.sha256(resume_text.encode('utf-8')).hexdigest()[:16]}"
+        ai_data, from_cache = single_flight.get_or_compute(
+            cache_key, lambda: llm_client.analyze_resume(resume_text), ttl=86400)
         
         # Обновить score и skills
         candidate.score = ai_data.get('score', candidate.score)
@@ -381,6 +399,7 @@ def analyze_resume_with_ai(candidate_id):
             'success': True,
             'candidate_id': candidate_id,
             'ai_analysis': ai_data,
+            'from_cache': from_cache,
             'candidate': candidate.to_dict()
         }), 200
         
@@ -443,23 +462,21 @@ def predict_salary(resume_id):
         data = request.get_json() or {}
         location = data.get('location', 'Russia')
         
-        # Check cache first
-        cache_key = f"salary:{resume_id}:{location}"
-        cached = cache_service.get(cache_key)
-        if cached:
-            return jsonify({**cached, "from_cache": True})
+        def predict():
+            # Get resume analysis from database
+            resume_data = get_resume_analysis(resume_id)
+            if not resume_data:
+                return None
+            return salary_predictor.predict(resume_data, location)
         
-        # Get resume analysis from database
-        resume_data = get_resume_analysis(resume_id)
+        # Cache for 7 days; concurrent misses wait for one prediction
+        cache_key = f"salary:{resume_id}:{location}"
+        prediction, from_cache = single_flight.get_or_compute(cache_key, predict, ttl=604800)
         
-        if not resume_data:
+        if prediction is None:
             return jsonify({"error": "Resume not found"}), 404
-        
-        # Predict salary
-        prediction = salary_predictor.predict(resume_data, location)
-        
-        # Cache for 7 days
-        cache_service.set(cache_key, prediction, ttl=604800)
+        if from_cache:
+            return jsonify({**prediction, "from_cache": True})
         
         return jsonify(prediction), 200
         
@@ -601,6 +618,13 @@ def batch_upload_files():
         return jsonify({'error': str(e)}), 500
 
 
+BATCH_EMBEDDING_MODEL = 'all-MiniLM-L6-v2'
+
+
+def _encode_batch(texts):
+    return get_model(BATCH_EMBEDDING_MODEL).encode(texts)
+
+
 @app.route('/api/batch/process', methods=['POST'])
 def batch_process_files():
     """Process batch files with AI analysis and embeddings"""
@@ -609,6 +633,23 @@ def batch_process_files():
         files_data = data.get('files', [])
         results = []
         
+        # Encode every distinct file once, in one batch; repeats hit the store
+        contents = [f.get('content') for f in files_data if f.get('content')]
+        try:
+            vectors = embedding_store.get_or_encode(contents, BATCH_EMBEDDING_MODEL, _encode_batch)
+            embeddings_by_content = dict(zip(contents, vectors))
+        except Exception:
+            embeddings_by_content = {}
+        
+        # Analyse all files concurrently; results come back in input order
+        if llm_client is None:
+            analyses = [RuntimeError('LLM client is not configured')] * len(contents)
+        else:
+            analyses = asyncio.run(llm_client.analyze_resumes(
+                contents, concurrency=int(os.getenv('LLM_BATCH_CONCURRENCY', '8'))
+            ))
+        analysis_iter = iter(analyses)
+        
         for file_data in files_data:
             filename = file_data.get('filename')
             content = file_data.get('content')
@@ -617,14 +658,12 @@ def batch_process_files():
                 continue
             
             try:
-                ai_analysis = llm_client.analyze_resume(content)
+                ai_analysis = next(analysis_iter)
+                if isinstance(ai_analysis, Exception):
+                    raise ai_analysis
                 
-                try:
-                    from sentence_transformers import SentenceTransformer
-                    model = SentenceTransformer('all-MiniLM-L6-v2')
-                    embeddings = model.encode(content).tolist()
-                except:
-                    embeddings = []
+                vector = embeddings_by_content.get(content)
+                embeddings = vector.tolist() if vector is not None else []
                 
                 results.append({
                     'filename': filename,
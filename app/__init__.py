@@ -25,6 +25,12 @@ def create_app(config=None):
     # Initialize extensions
     db.init_app(app)
     
+    # Re-match changed resumes/jobs in the background
+    from app.config import settings
+    if app.config.get('INCREMENTAL_MATCHING', settings.INCREMENTAL_MATCHING):
+        from app.tasks.matching import install_rematch_hooks
+        install_rematch_hooks()
+    
     # Register blueprints
     from app.routes import api_bp, main_bp
     app.register_blueprint(main_bp)
@@ -43,6 +43,14 @@ def make_celery(app):
             'task': 'app.tasks.cache.update_match_cache',
             'schedule': crontab(hour='*/1'),  # Every hour
         },
+        'rebuild-match-matrix': {
+            'task': 'app.tasks.matching.rebuild_match_matrix',
+            'schedule': crontab(minute='*/15'),  # Every 15 minutes
+        },
+        'rebuild-vector-indexes': {
+            'task': 'app.tasks.matching.rebuild_vector_indexes',
+            'schedule': crontab(minute='*/30'),  # Every 30 minutes
+        },
         'send-weekly-digest': {
             'task': 'app.tasks.notifications.send_weekly_digest',
             'schedule': crontab(day_of_week=0, hour=9, minute=0),  # Every Monday at 9 AM
@@ -11,6 +11,7 @@ from app.config.mismatch import (
     MATCHING_WEIGHTS,
     MISMATCH_ERROR_CODES,
 )
+from app.config.settings import Settings, settings
 
 __all__ = [
     "MismatchSettings",
@@ -23,4 +24,6 @@ __all__ = [
     "MISMATCH_SYNC_TYPES",
     "MATCHING_WEIGHTS",
     "MISMATCH_ERROR_CODES",
+    "Settings",
+    "settings",
 ]
@@ -0,0 +1,22 @@
+"""Runtime settings shared by the Celery tasks and matching services."""
+import os
+
+
+class Settings:
+    """Environment-driven settings, read once at import"""
+    
+    # Matching Engine
+    MATCH_THRESHOLD = float(os.getenv('MATCH_THRESHOLD', '0.1'))
+    INCREMENTAL_MATCHING = os.getenv('INCREMENTAL_MATCHING', 'True') == 'True'
+    
+    # Resume Parsing
+    # Upper bound for the ``workers`` a batch request may ask for
+    PARSE_MAX_WORKERS = int(os.getenv('PARSE_MAX_WORKERS', str(os.cpu_count() or 1)))
+    PARSE_BATCH_MAX_IDS = int(os.getenv('PARSE_BATCH_MAX_IDS', '1000'))
+    # Pool size for batch tasks that do not pass ``workers``. Celery prefork
+    # already runs one process per core, so the default parses in-process;
+    # raise it for a dedicated queue run with ``--concurrency=1``.
+    PARSE_TASK_WORKERS = int(os.getenv('PARSE_TASK_WORKERS', '1'))
+
+
+settings = Settings()
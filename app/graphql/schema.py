@@ -1,13 +1,27 @@
 """GraphQL schema with queries and mutations."""
 
 import graphene
+from graphql.language import FieldNode
 from app.graphql.types import UserType, ResumeType, JobType, MatchType, PredictionType, SubscriptionType
 from app.models import User, Resume, Job, Match, Prediction, Subscription
 from app.database import SessionLocal
+from app.services.match_matrix import get_match_matrix
 from app.logger import get_logger
 
 logger = get_logger("graphql")
 
+# Match fields the top-K snapshot can serve; anything else is read from the DB
+SNAPSHOT_MATCH_FIELDS = {'resumeId', 'jobId', 'matchScore', '__typename'}
+
+
+def _snapshot_can_serve(info) -> bool:
+    """True when every selected Match field is one the snapshot stores"""
+    for node in info.field_nodes:
+        for selection in node.selection_set.selections if node.selection_set else ():
+            if not isinstance(selection, FieldNode) or selection.name.value not in SNAPSHOT_MATCH_FIELDS:
+                return False
+    return True
+
 
 class Query(graphene.ObjectType):
     """GraphQL root query."""
@@ -104,6 +118,15 @@ class Query(graphene.ObjectType):
             return None
     
     def resolve_matches_for_resume(self, info, resume_id, min_score=0.6):
+        # Served from the materialised top-K snapshot when it is fresh, complete
+        # for min_score and holds every requested field
+        if _snapshot_can_serve(info):
+            try:
+                cached = get_match_matrix().jobs_for_resume(resume_id, min_score)
+                if cached is not None:
+                    return [{'resume_id': resume_id, 'job_id': job_id, 'match_score': score} for job_id, score in cached]
+            except Exception as e:
+                logger.warning(f"Match matrix unavailable, reading matches from DB: {e}")
         try:
             db = SessionLocal()
             matches = db.query(Match).filter(Match.resume_id == resume_id, Match.match_score >= min_score).order_by(Match.match_score.desc()).all()
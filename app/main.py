@@ -1,4 +1,5 @@
 from app.routes import matching_v2
 from app.routes import analytics
 app.include_router(matching_v2.router)
+app.add_event_handler("startup", matching_v2.init_skill_index)
 app.include_router(analytics.router)
@@ -1,11 +1,38 @@
 """REST API endpoints for advanced ML matching v2"""
 
+import logging
 from typing import List
 from fastapi import APIRouter, HTTPException, Query
 from app.services.matching_service_v2 import MatchingServiceV2, MatchRecommendation
+from app.services.skill_index import build_skill_index, install_skill_index_hooks
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/matches", tags=["matching"])
 matching_service = MatchingServiceV2()
+_skill_index_ready = False
+
+
+def init_skill_index(session_factory=None) -> None:
+    """Load the hard-requirement index from the database and keep it current.
+
+    Called once from app startup. Commits made through ``session_factory``
+    (default ``app.database.SessionLocal``) update the index.
+    """
+    global _skill_index_ready
+    if _skill_index_ready:
+        return
+    if session_factory is None:
+        from app.database import SessionLocal
+        session_factory = SessionLocal
+    install_skill_index_hooks(matching_service, session_factory)
+    session = session_factory()
+    try:
+        indexed = build_skill_index(matching_service, session)
+    finally:
+        session.close()
+    _skill_index_ready = True
+    logger.info(f"Skill index loaded with {indexed} resumes")
 
 @router.post("/v2/advanced")
 async def advanced_matches(
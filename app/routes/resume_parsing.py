@@ -8,11 +8,12 @@ Provides REST endpoints for:
 
 from flask import Blueprint, request, jsonify
 from sqlalchemy.orm import joinedload
+from app.config import settings
 from app.models import (
     Job, ParsedResume, ResumeSkill, ResumeEducation, ResumeExperience
 )
 from app.services.parsing.resume_parser_advanced import ResumeParserAdvanced
-from app.tasks.resume_parse import parse_resume_task
+from app.tasks.resume_parse import parse_resume_task, parse_resumes_batch
 from app.instance import db
 from app.logger import logger
 
@@ -20,6 +21,16 @@ from app.logger import logger
 resume_parsing_bp = Blueprint('resume_parsing', __name__, url_prefix='/api/resumes')
 
 
+def _positive_int(value):
+    """Parse a JSON id/count (int or digit string), raising ValueError otherwise."""
+    if isinstance(value, bool) or not isinstance(value, (int, str)):
+        raise ValueError(value)
+    number = int(value)
+    if number < 1:
+        raise ValueError(value)
+    return number
+
+
 @resume_parsing_bp.route('/<int:job_id>/parse', methods=['POST'])
 def trigger_resume_parsing(job_id):
     """Trigger resume parsing for a job's resumes.
@@ -66,6 +77,54 @@ def trigger_resume_parsing(job_id):
         return jsonify({'error': str(e)}), 500
 
 
+@resume_parsing_bp.route('/parse-batch', methods=['POST'])
+def trigger_batch_parsing():
+    """Re-parse stored resumes in bulk across a process pool.
+    
+    Body:
+        resume_ids: Parsed resume IDs (at most PARSE_BATCH_MAX_IDS)
+        workers: Optional worker process count, capped at PARSE_MAX_WORKERS
+        
+    Returns:
+        JSON with batch task info
+    """
+    try:
+        data = request.get_json(silent=True)
+        if not isinstance(data, dict):
+            return jsonify({'error': 'JSON object body is required'}), 400
+        
+        resume_ids = data.get('resume_ids')
+        if not isinstance(resume_ids, list) or not resume_ids:
+            return jsonify({'error': 'resume_ids must be a non-empty list'}), 400
+        if len(resume_ids) > settings.PARSE_BATCH_MAX_IDS:
+            return jsonify({'error': f'At most {settings.PARSE_BATCH_MAX_IDS} resume_ids per batch'}), 400
+        try:
+            resume_ids = [_positive_int(i) for i in resume_ids]
+        except ValueError:
+            return jsonify({'error': 'resume_ids must be positive integers'}), 400
+        
+        workers = data.get('workers')
+        if workers is not None:
+            try:
+                workers = min(_positive_int(workers), settings.PARSE_MAX_WORKERS)
+            except ValueError:
+                return jsonify({'error': 'workers must be a positive integer'}), 400
+        
+        task = parse_resumes_batch.delay(resume_ids, workers=workers)
+        
+        logger.info(f'Batch resume parsing triggered for {len(resume_ids)} resumes')
+        
+        return jsonify({
+            'task_id': task.id,
+            'total': len(resume_ids),
+            'status': 'pending'
+        }), 202
+        
+    except Exception as e:
+        logger.error(f'Error triggering batch resume parsing: {str(e)}')
+        return jsonify({'error': str(e)}), 500
+
+
 @resume_parsing_bp.route('/<int:resume_id>', methods=['GET'])
 def get_parsed_resume(resume_id):
     """Get parsed resume data.
@@ -0,0 +1,172 @@
+"""Shared TF-IDF vectorizer for candidate/job matching
+
+Terms are hashed into a fixed feature space, so there is no vocabulary to
+refit: new documents only update the document-frequency counts that the
+IDF weights are derived from. One instance is fitted on the corpus, saved
+to disk and reused by every matching task, and all vectors it produces
+live in the same space.
+
+Gunicorn and Celery workers each hold their own copy: ``apply_change``
+merges a corpus change into the saved statistics under a file lock, and
+``get_corpus_vectorizer`` reloads a process's copy whenever the file on
+disk is newer.
+"""
+import logging
+import os
+import threading
+from typing import Iterable, List, Optional
+
+import numpy as np
+from scipy import sparse
+from sklearn.feature_extraction.text import HashingVectorizer
+from sklearn.preprocessing import normalize
+
+from utils.file_lock import file_lock
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_VECTORIZER_PATH = os.getenv('TFIDF_VECTORIZER_PATH', 'instance/tfidf_vectorizer.npz')
+
+
+def _file_version(path: str) -> tuple:
+    # save() swaps in a new inode, so this changes even when mtimes collide
+    stat = os.stat(path)
+    return stat.st_ino, stat.st_mtime_ns
+
+
+class CorpusVectorizer:
+    """Hashed TF-IDF with incrementally maintained document frequencies"""
+
+    def __init__(self, n_features: int = 2 ** 18, ngram_range=(1, 2)):
+        self.n_features = n_features
+        self.ngram_range = tuple(ngram_range)
+        self._hasher = HashingVectorizer(n_features=n_features, ngram_range=self.ngram_range,
+                                         alternate_sign=False, norm=None, dtype=np.float32)
+        self.doc_freq = np.zeros(n_features, dtype=np.int64)
+        self.n_docs = 0
+        self._idf: Optional[np.ndarray] = None
+        self._lock = threading.RLock()
+        # (inode, mtime) of the file these statistics were last loaded from or saved to
+        self._file_version: Optional[tuple] = None
+
+    @property
+    def is_fitted(self) -> bool:
+        return self.n_docs > 0
+
+    def fit(self, texts: Iterable[str]) -> 'CorpusVectorizer':
+        with self._lock:
+            self.doc_freq[:] = 0
+            self.n_docs = 0
+            return self.partial_fit(texts)
+
+    def partial_fit(self, texts: Iterable[str]) -> 'CorpusVectorizer':
+        """Add documents to the corpus statistics without refitting"""
+        counts = self._hasher.transform(list(texts)).tocsr()
+        counts.sum_duplicates()
+        present = np.bincount(counts.indices, minlength=self.n_features)
+        with self._lock:
+            self.doc_freq += present
+            self.n_docs += counts.shape[0]
+            self._idf = None
+        return self
+
+    def remove_documents(self, texts: Iterable[str]) -> 'CorpusVectorizer':
+        """Undo ``partial_fit`` for documents that left the corpus"""
+        counts = self._hasher.transform(list(texts)).tocsr()
+        counts.sum_duplicates()
+        present = np.bincount(counts.indices, minlength=self.n_features)
+        with self._lock:
+            self.doc_freq = np.maximum(self.doc_freq - present, 0)
+            self.n_docs = max(self.n_docs - counts.shape[0], 0)
+            self._idf = None
+        return self
+
+    def idf(self) -> np.ndarray:
+        # Same smoothed IDF as sklearn's TfidfTransformer
+        with self._lock:
+            if self._idf is None:
+                self._idf = (np.log((1 + self.n_docs) / (1 + self.doc_freq)) + 1).astype(np.float32)
+            return self._idf
+
+    def transform(self, texts: List[str]) -> sparse.csr_matrix:
+        """L2-normalised TF-IDF rows, so dot products are cosine similarities"""
+        counts = self._hasher.transform(list(texts)).tocsr()
+        counts.data *= self.idf()[counts.indices]
+        return normalize(counts, norm='l2', copy=False)
+
+    def apply_change(self, added: Iterable[str] = (), removed: Iterable[str] = (),
+                     path: str = DEFAULT_VECTORIZER_PATH) -> 'CorpusVectorizer':
+        """Apply a corpus change to the statistics saved at ``path``.
+
+        The latest saved statistics are reloaded, changed and saved again
+        while holding an exclusive lock, so concurrent workers never
+        overwrite each other's updates.
+        """
+        added, removed = list(added), list(removed)
+        with file_lock(f"{path}.lock"):
+            self.refresh(path)
+            with self._lock:
+                if removed:
+                    self.remove_documents(removed)
+                if added:
+                    self.partial_fit(added)
+                self.save(path)
+        return self
+
+    def refresh(self, path: str = DEFAULT_VECTORIZER_PATH) -> bool:
+        """Reload the statistics if another process saved newer ones to ``path``"""
+        try:
+            version = _file_version(path)
+        except FileNotFoundError:
+            return False
+        if version == self._file_version:
+            return False
+        self._load_state(path)
+        return True
+
+    def save(self, path: str = DEFAULT_VECTORIZER_PATH) -> None:
+        """Persist corpus statistics (written to a temp file, then swapped in)"""
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        tmp_path = f"{path}.tmp.npz"
+        with self._lock:
+            np.savez_compressed(tmp_path, doc_freq=self.doc_freq, n_docs=self.n_docs,
+                                n_features=self.n_features, ngram_range=np.array(self.ngram_range))
+            os.replace(tmp_path, path)
+            self._file_version = _file_version(path)
+
+    def _load_state(self, path: str) -> None:
+        with np.load(path) as data:
+            if int(data['n_features']) != self.n_features:
+                raise ValueError(f"{path} has {int(data['n_features'])} features, expected {self.n_features}")
+            with self._lock:
+                self.doc_freq = data['doc_freq'].astype(np.int64)
+                self.n_docs = int(data['n_docs'])
+                self._idf = None
+                self._file_version = _file_version(path)
+
+    @classmethod
+    def load(cls, path: str = DEFAULT_VECTORIZER_PATH) -> 'CorpusVectorizer':
+        with np.load(path) as data:
+            vectorizer = cls(n_features=int(data['n_features']),
+                             ngram_range=tuple(int(n) for n in data['ngram_range']))
+        vectorizer._load_state(path)
+        return vectorizer
+
+
+_shared: Optional[CorpusVectorizer] = None
+_shared_lock = threading.Lock()
+
+
+def get_corpus_vectorizer(path: str = DEFAULT_VECTORIZER_PATH) -> CorpusVectorizer:
+    """Process-wide vectorizer, (re)loaded from ``path`` when it exists"""
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            if os.path.exists(path):
+                _shared = CorpusVectorizer.load(path)
+                logger.info(f"Loaded TF-IDF statistics for {_shared.n_docs} documents from {path}")
+            else:
+                _shared = CorpusVectorizer()
+        elif _shared.refresh(path):
+            logger.info(f"Reloaded TF-IDF statistics for {_shared.n_docs} documents from {path}")
+        return _shared
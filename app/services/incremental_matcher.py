@@ -0,0 +1,331 @@
+"""Incremental re-matching driven by resume/job change events
+
+A created or updated resume only changes its row of the resume x job
+match matrix, and a job only its column. ``IncrementalMatcher`` scores
+just that row or column against the shared TF-IDF statistics and upserts
+the result into ``matches`` on the ``uq_resume_job`` constraint, so the
+steady-state cost follows the rate of change rather than the corpus size.
+
+Each change is also folded into the persisted TF-IDF statistics: a new
+document is added, an edited one swaps its committed text for the new
+text, and a deleted one is subtracted.
+
+``install_change_hooks`` wires SQLAlchemy session events to callbacks
+(typically Celery ``.delay``) that fire once per changed id after commit.
+"""
+import logging
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import delete, event, inspect
+from sqlalchemy.orm import Session
+
+from app.services.corpus_vectorizer import DEFAULT_VECTORIZER_PATH, CorpusVectorizer, get_corpus_vectorizer
+
+logger = logging.getLogger(__name__)
+
+# Columns whose text makes up a resume / job document
+RESUME_TEXT_FIELDS = ('skills', 'summary', 'raw_text')
+JOB_TEXT_FIELDS = ('title', 'description', 'required_skills')
+
+
+def join_text(*parts: Any) -> str:
+    words = []
+    for part in parts:
+        if not part:
+            continue
+        if isinstance(part, (list, tuple)):
+            words.extend(str(item) for item in part)
+        else:
+            words.append(str(part))
+    return " ".join(words)
+
+
+def semantic_fit(score: float) -> str:
+    return "high" if score > 0.7 else "medium" if score > 0.5 else "low"
+
+
+class IncrementalMatcher:
+    """Scores one changed resume or job against the other side and upserts matches"""
+
+    def __init__(self, session: Session, vectorizer: Optional[CorpusVectorizer] = None,
+                 min_score: Optional[float] = None, chunk_size: int = 1000,
+                 resume_model=None, job_model=None, match_model=None,
+                 vectorizer_path: Optional[str] = DEFAULT_VECTORIZER_PATH):
+        """``vectorizer_path=None`` keeps statistics changes in memory only"""
+        if resume_model is None or job_model is None or match_model is None:
+            from app.models import Job, Match, Resume
+            resume_model, job_model, match_model = Resume, Job, Match
+        if min_score is None:
+            from app.config import settings
+            min_score = settings.MATCH_THRESHOLD
+        self.session = session
+        self.vectorizer_path = vectorizer_path
+        self.vectorizer = vectorizer or get_corpus_vectorizer(vectorizer_path or DEFAULT_VECTORIZER_PATH)
+        self.min_score = min_score
+        # Set once this matcher has folded its change into the corpus statistics
+        self.statistics_updated = False
+        self.chunk_size = chunk_size
+        self.Resume = resume_model
+        self.Job = job_model
+        self.Match = match_model
+
+    # ------------------------------------------------------------------ #
+    # Document text
+    # ------------------------------------------------------------------ #
+
+    def _resume_columns(self):
+        return (self.Resume.id, *(getattr(self.Resume, field) for field in RESUME_TEXT_FIELDS))
+
+    def _job_columns(self):
+        return (self.Job.id, *(getattr(self.Job, field) for field in JOB_TEXT_FIELDS))
+
+    @staticmethod
+    def _row_text(row: Tuple) -> str:
+        return join_text(*row[1:])
+
+    def _iter_chunks(self, model, columns) -> Iterator[List[Tuple]]:
+        """Keyset-paginated ``(id, ...)`` rows of ``model`` in id order"""
+        after_id = 0
+        while True:
+            chunk = (
+                self.session.query(*columns)
+                .filter(model.id > after_id)
+                .order_by(model.id)
+                .limit(self.chunk_size)
+                .all()
+            )
+            if not chunk:
+                return
+            yield chunk
+            after_id = chunk[-1][0]
+
+    # ------------------------------------------------------------------ #
+    # Change events
+    # ------------------------------------------------------------------ #
+
+    def on_resume_changed(self, resume_id: int, created: bool = False,
+                          previous_text: Optional[str] = None) -> Dict[str, int]:
+        """Re-score one resume against every job (one row of the matrix).
+
+        ``previous_text`` is the resume's committed text before an update;
+        when given, it is swapped out of the corpus statistics.
+        """
+        row = self.session.query(*self._resume_columns()).filter(self.Resume.id == resume_id).first()
+        if row is None:
+            return self.on_resume_deleted(resume_id, previous_text)
+        return self._rematch(
+            self._row_text(row), created, previous_text,
+            others=self._iter_chunks(self.Job, self._job_columns()),
+            pair=lambda other_id: (resume_id, other_id),
+            owner_column=self.Match.resume_id, owner_id=resume_id,
+            other_column=self.Match.job_id,
+        )
+
+    def on_job_changed(self, job_id: int, created: bool = False,
+                       previous_text: Optional[str] = None) -> Dict[str, int]:
+        """Re-score one job against every resume (one column of the matrix)"""
+        row = self.session.query(*self._job_columns()).filter(self.Job.id == job_id).first()
+        if row is None:
+            return self.on_job_deleted(job_id, previous_text)
+        return self._rematch(
+            self._row_text(row), created, previous_text,
+            others=self._iter_chunks(self.Resume, self._resume_columns()),
+            pair=lambda other_id: (other_id, job_id),
+            owner_column=self.Match.job_id, owner_id=job_id,
+            other_column=self.Match.resume_id,
+        )
+
+    def on_resume_deleted(self, resume_id: int, previous_text: Optional[str] = None) -> Dict[str, int]:
+        """Drop a deleted resume's matches and, given its text, its statistics"""
+        removed = self.session.execute(delete(self.Match).where(self.Match.resume_id == resume_id)).rowcount
+        self.session.commit()
+        if previous_text is not None:
+            self._update_statistics(removed=[previous_text])
+        return {"scored": 0, "upserted": 0, "removed": removed or 0}
+
+    def on_job_deleted(self, job_id: int, previous_text: Optional[str] = None) -> Dict[str, int]:
+        """Drop a deleted job's matches and, given its text, its statistics"""
+        removed = self.session.execute(delete(self.Match).where(self.Match.job_id == job_id)).rowcount
+        self.session.commit()
+        if previous_text is not None:
+            self._update_statistics(removed=[previous_text])
+        return {"scored": 0, "upserted": 0, "removed": removed or 0}
+
+    def _update_statistics(self, added: List[str] = (), removed: List[str] = ()) -> None:
+        if self.vectorizer_path:
+            self.vectorizer.apply_change(added, removed, path=self.vectorizer_path)
+        else:
+            if removed:
+                self.vectorizer.remove_documents(removed)
+            if added:
+                self.vectorizer.partial_fit(added)
+        self.statistics_updated = True
+
+    def _rematch(self, text: str, created: bool, previous_text: Optional[str],
+                 others: Iterator[List[Tuple]], pair: Callable[[int], Tuple[int, int]],
+                 owner_column, owner_id: int, other_column) -> Dict[str, int]:
+        if created or not self.vectorizer.is_fitted:
+            self._update_statistics(added=[text])
+        elif previous_text is not None and previous_text != text:
+            self._update_statistics(added=[text], removed=[previous_text])
+        query_vector = self.vectorizer.transform([text])
+
+        stats = {"scored": 0, "upserted": 0, "removed": 0}
+        now = datetime.utcnow()
+        for chunk in others:
+            other_ids = np.fromiter((row[0] for row in chunk), dtype=np.int64)
+            matrix = self.vectorizer.transform([self._row_text(row) for row in chunk])
+            scores = np.asarray((matrix @ query_vector.T).todense()).ravel()
+
+            keep = scores >= self.min_score
+            rows = []
+            for other_id, score in zip(other_ids[keep].tolist(), scores[keep].tolist()):
+                resume_id, job_id = pair(other_id)
+                rows.append({"resume_id": resume_id, "job_id": job_id, "match_score": score,
+                             "semantic_fit": semantic_fit(score), "created_at": now})
+            self._upsert(rows)
+
+            # Pairs that fell below the floor must not keep a stale score
+            dropped = other_ids[~keep].tolist()
+            if dropped:
+                result = self.session.execute(
+                    delete(self.Match).where(owner_column == owner_id, other_column.in_(dropped))
+                )
+                stats["removed"] += result.rowcount or 0
+
+            stats["scored"] += len(other_ids)
+            stats["upserted"] += len(rows)
+        self.session.commit()
+        return stats
+
+    def _upsert(self, rows: List[Dict[str, Any]]) -> None:
+        upsert_matches(self.session, rows, self.Match)
+
+
+def upsert_matches(session: Session, rows: List[Dict[str, Any]], match_model=None) -> None:
+    """INSERT ... ON CONFLICT (resume_id, job_id) DO UPDATE for ``matches`` rows.
+
+    Every non-key column in the rows is overwritten on conflict, so
+    re-running a matching task (or a Celery retry) is idempotent.
+    """
+    if not rows:
+        return
+    if match_model is None:
+        from app.models import Match
+        match_model = Match
+    updated = [key for key in rows[0] if key not in ("resume_id", "job_id")]
+    dialect = session.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+        stmt = insert(match_model).values(rows)
+        stmt = stmt.on_conflict_do_update(constraint="uq_resume_job", set_={
+            key: stmt.excluded[key] for key in updated
+        })
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+        stmt = insert(match_model).values(rows)
+        stmt = stmt.on_conflict_do_update(index_elements=["resume_id", "job_id"], set_={
+            key: stmt.excluded[key] for key in updated
+        })
+    else:
+        for row in rows:
+            existing = session.query(match_model).filter_by(
+                resume_id=row["resume_id"], job_id=row["job_id"]).first()
+            if existing is None:
+                session.add(match_model(**row))
+            else:
+                for key, value in row.items():
+                    setattr(existing, key, value)
+        return
+    session.execute(stmt)
+
+
+def install_change_hooks(session_cls, on_resume: Callable[[int, bool, Optional[str]], None],
+                         on_job: Callable[[int, bool, Optional[str]], None],
+                         on_resume_deleted: Callable[[int, Optional[str]], None],
+                         on_job_deleted: Callable[[int, Optional[str]], None],
+                         resume_model=None, job_model=None) -> None:
+    """Dispatch Resume/Job changes to the callbacks after each commit.
+
+    ``on_resume(id, created, previous_text)`` / ``on_job(...)`` fire for
+    inserts and updates, ``on_resume_deleted(id, previous_text)`` /
+    ``on_job_deleted(...)`` for deletes. ``previous_text`` is the document
+    text as last committed (``None`` for inserts).
+
+    Changes are collected per session and only dispatched once the
+    transaction commits, so workers never see uncommitted rows.
+    """
+    if resume_model is None or job_model is None:
+        from app.models import Job, Resume
+        resume_model, job_model = Resume, Job
+
+    def kind_of(obj) -> Optional[str]:
+        if isinstance(obj, resume_model):
+            return "resume"
+        if isinstance(obj, job_model):
+            return "job"
+        return None
+
+    def committed_text(obj, kind: str) -> str:
+        state = inspect(obj)
+        values = []
+        for field in (RESUME_TEXT_FIELDS if kind == "resume" else JOB_TEXT_FIELDS):
+            history = state.attrs[field].history
+            values.append(history.deleted[0] if history.deleted else getattr(obj, field))
+        return join_text(*values)
+
+    def capture(session, flush_context, instances):
+        # Rows still hold their committed text before the flush writes them
+        previous = session.info.setdefault("rematch_previous", {})
+        modified = [obj for obj in session.dirty if session.is_modified(obj)]
+        for obj in modified + list(session.deleted):
+            kind = kind_of(obj)
+            if kind and obj.id is not None and (kind, obj.id) not in previous:
+                previous[(kind, obj.id)] = committed_text(obj, kind)
+
+    def collect(session, flush_context):
+        # Primary keys exist after flush; dispatch waits for the commit
+        pending = session.info.setdefault("rematch_pending", {})
+        for obj in session.new:
+            kind = kind_of(obj)
+            if kind:
+                pending[(kind, obj.id)] = "created"
+        for obj in session.dirty:
+            kind = kind_of(obj)
+            if kind and session.is_modified(obj):
+                pending.setdefault((kind, obj.id), "updated")
+        for obj in session.deleted:
+            kind = kind_of(obj)
+            if kind is None:
+                continue
+            if pending.get((kind, obj.id)) == "created":
+                # Never committed, so there is nothing to undo
+                del pending[(kind, obj.id)]
+            else:
+                pending[(kind, obj.id)] = "deleted"
+
+    def dispatch(session):
+        pending = session.info.pop("rematch_pending", {})
+        previous = session.info.pop("rematch_previous", {})
+        for (kind, object_id), change in pending.items():
+            previous_text = previous.get((kind, object_id))
+            try:
+                if change == "deleted":
+                    callback = on_resume_deleted if kind == "resume" else on_job_deleted
+                    callback(object_id, previous_text)
+                else:
+                    callback = on_resume if kind == "resume" else on_job
+                    callback(object_id, change == "created", previous_text)
+            except Exception as e:
+                logger.error(f"Failed to dispatch re-match for {kind} {object_id}: {e}")
+
+    def discard(session):
+        session.info.pop("rematch_pending", None)
+        session.info.pop("rematch_previous", None)
+
+    event.listen(session_cls, "before_flush", capture)
+    event.listen(session_cls, "after_flush", collect)
+    event.listen(session_cls, "after_commit", dispatch)
+    event.listen(session_cls, "after_rollback", discard)
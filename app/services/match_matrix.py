@@ -0,0 +1,330 @@
+"""Materialised match matrix with versioned, atomically swapped snapshots
+
+A snapshot holds the top-K matches per resume and per job as CSR-style
+NumPy arrays (sorted keys, row offsets, partner ids, scores) that are
+memory-mapped on open, so a lookup is one binary search and a slice.
+
+Snapshots live under ``<root>/snapshots/<revision>-<timestamp>`` and the
+``<root>/current`` symlink points at the live one. A rebuild writes a new
+directory and then replaces the symlink in a single rename, so readers
+see either the old snapshot or the new one, never a partial build.
+Snapshots are tagged with the model/weights revision they were scored
+with; a reader asking for a different revision gets nothing and falls
+back to the database.
+
+Between rebuilds, writers record changed resumes/jobs with
+``invalidate``. ``jobs_for_resume`` only answers from the snapshot when
+it is younger than ``MATCH_MATRIX_MAX_AGE``, nothing it covers has been
+invalidated since it was built, and the top-K cut cannot have hidden a
+qualifying match; otherwise callers go to the database.
+"""
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from utils.file_lock import file_lock
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MATCH_MATRIX_DIR = os.getenv('MATCH_MATRIX_DIR', 'instance/match_matrix')
+MATCH_MODEL_REVISION = os.getenv('MATCH_MODEL_REVISION', 'tfidf-v1')
+MATCH_MATRIX_MAX_AGE = float(os.getenv('MATCH_MATRIX_MAX_AGE', '3600'))
+
+
+class _TopKSide:
+    """Top-K partners per key: ``keys[i]`` owns ``partners/scores[indptr[i]:indptr[i+1]]``"""
+
+    def __init__(self, keys: np.ndarray, indptr: np.ndarray, partners: np.ndarray, scores: np.ndarray):
+        self.keys = keys
+        self.indptr = indptr
+        self.partners = partners
+        self.scores = scores
+
+    @classmethod
+    def build(cls, owners: np.ndarray, partners: np.ndarray, scores: np.ndarray,
+              top_k: Optional[int]) -> '_TopKSide':
+        # Group by owner, best score first, ties by partner id
+        order = np.lexsort((partners, -scores, owners))
+        owners, partners, scores = owners[order], partners[order], scores[order]
+        keys, starts, counts = np.unique(owners, return_index=True, return_counts=True)
+
+        if top_k:
+            rank = np.arange(len(owners)) - np.repeat(starts, counts)
+            keep = rank < top_k
+            partners, scores = partners[keep], scores[keep]
+            counts = np.minimum(counts, top_k)
+
+        indptr = np.zeros(len(keys) + 1, dtype=np.int64)
+        np.cumsum(counts, out=indptr[1:])
+        return cls(keys, indptr, partners, scores)
+
+    def lookup(self, key: int, min_score: float = 0.0, limit: Optional[int] = None,
+               top_k: Optional[int] = None) -> Optional[List[Tuple[int, float]]]:
+        """Partners of ``key`` scoring at least ``min_score``, best first.
+
+        Given the ``top_k`` the side was cut at, a full row whose last score
+        still meets ``min_score`` may have lost qualifying partners to the
+        cut; that returns None so the caller can go to the source.
+        """
+        i = int(np.searchsorted(self.keys, key))
+        if i == len(self.keys) or self.keys[i] != key:
+            return None
+        start, end = int(self.indptr[i]), int(self.indptr[i + 1])
+        scores = self.scores[start:end]
+        if top_k and end - start >= top_k and scores[-1] >= min_score:
+            return None
+        # Rows are sorted by score, so the floor is a prefix cut
+        end = start + int(np.count_nonzero(scores >= min_score))
+        if limit is not None:
+            end = min(end, start + limit)
+        return list(zip(self.partners[start:end].tolist(), self.scores[start:end].tolist()))
+
+    def save(self, directory: str, prefix: str) -> None:
+        for name in ('keys', 'indptr', 'partners', 'scores'):
+            np.save(os.path.join(directory, f"{prefix}_{name}.npy"), getattr(self, name))
+
+    @classmethod
+    def load(cls, directory: str, prefix: str) -> '_TopKSide':
+        return cls(*(np.load(os.path.join(directory, f"{prefix}_{name}.npy"), mmap_mode='r')
+                     for name in ('keys', 'indptr', 'partners', 'scores')))
+
+
+class MatchMatrixSnapshot:
+    """Read-only, memory-mapped top-K match matrix"""
+
+    def __init__(self, directory: str, meta: dict, by_resume: _TopKSide, by_job: _TopKSide):
+        self.directory = directory
+        self.meta = meta
+        self.revision = meta['revision']
+        # Scores reflect the matches table as of this unix time
+        self.as_of = meta.get('as_of', 0.0)
+        self.by_resume = by_resume
+        self.by_job = by_job
+
+    @classmethod
+    def open(cls, directory: str) -> 'MatchMatrixSnapshot':
+        with open(os.path.join(directory, 'meta.json')) as f:
+            meta = json.load(f)
+        return cls(directory, meta, _TopKSide.load(directory, 'resume'), _TopKSide.load(directory, 'job'))
+
+    def jobs_for_resume(self, resume_id: int, min_score: float = 0.0, limit: Optional[int] = None,
+                        complete: bool = False) -> Optional[List[Tuple[int, float]]]:
+        """``(job_id, score)`` best first, or None if the resume is not in the snapshot.
+
+        With ``complete`` also None when the top-K cut may have dropped matches.
+        """
+        return self.by_resume.lookup(resume_id, min_score, limit, self.meta['top_k'] if complete else None)
+
+    def resumes_for_job(self, job_id: int, min_score: float = 0.0, limit: Optional[int] = None,
+                        complete: bool = False) -> Optional[List[Tuple[int, float]]]:
+        """``(resume_id, score)`` best first, or None if the job is not in the snapshot"""
+        return self.by_job.lookup(job_id, min_score, limit, self.meta['top_k'] if complete else None)
+
+
+class MatchMatrixStore:
+    """Builds snapshots and serves the current one"""
+
+    def __init__(self, root: str = DEFAULT_MATCH_MATRIX_DIR, refresh_interval: float = 1.0):
+        self.root = root
+        self.refresh_interval = refresh_interval
+        self._snapshot: Optional[MatchMatrixSnapshot] = None
+        self._target: Optional[str] = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+        # Latest invalidation time of any job, and per resume
+        self._job_changed_at = 0.0
+        self._resume_changed_at: Dict[int, float] = {}
+        self._invalidations_version: Optional[tuple] = None
+
+    @property
+    def current_link(self) -> str:
+        return os.path.join(self.root, 'current')
+
+    @property
+    def invalidations_path(self) -> str:
+        return os.path.join(self.root, 'invalidated')
+
+    def invalidate(self, kind: str, object_id: int) -> None:
+        """Record that a resume's row or a job's column changed after the last build"""
+        os.makedirs(self.root, exist_ok=True)
+        with file_lock(self.invalidations_path + '.lock'):
+            with open(self.invalidations_path, 'a') as f:
+                f.write(f"{time.time():.6f}\t{kind}\t{int(object_id)}\n")
+        with self._lock:
+            self._checked_at = 0.0
+
+    def _compact_invalidations(self, as_of: float) -> None:
+        """Drop invalidations the snapshot built from ``as_of`` already reflects"""
+        with file_lock(self.invalidations_path + '.lock'):
+            if not os.path.exists(self.invalidations_path):
+                return
+            with open(self.invalidations_path) as f:
+                kept = [line for line in f if line.endswith('\n') and float(line.split('\t', 1)[0]) >= as_of]
+            tmp_path = self.invalidations_path + '.tmp'
+            with open(tmp_path, 'w') as f:
+                f.writelines(kept)
+            os.replace(tmp_path, self.invalidations_path)
+
+    def _load_invalidations(self) -> None:
+        try:
+            stat = os.stat(self.invalidations_path)
+        except FileNotFoundError:
+            self._job_changed_at, self._resume_changed_at, self._invalidations_version = 0.0, {}, None
+            return
+        version = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        if version == self._invalidations_version:
+            return
+        job_changed_at, resume_changed_at = 0.0, {}
+        with open(self.invalidations_path) as f:
+            for line in f:
+                parts = line.rstrip('\n').split('\t')
+                if not line.endswith('\n') or len(parts) != 3:
+                    continue
+                changed_at, kind, object_id = float(parts[0]), parts[1], int(parts[2])
+                if kind == 'job':
+                    job_changed_at = max(job_changed_at, changed_at)
+                else:
+                    resume_changed_at[object_id] = max(resume_changed_at.get(object_id, 0.0), changed_at)
+        self._job_changed_at, self._resume_changed_at = job_changed_at, resume_changed_at
+        self._invalidations_version = version
+
+    def build(self, pairs: Iterable[Tuple[int, int, float]], revision: str = MATCH_MODEL_REVISION,
+              top_k: Optional[int] = 100) -> str:
+        """Materialise ``(resume_id, job_id, score)`` triples and make them current"""
+        triples = np.array(list(pairs), dtype=np.float64).reshape(-1, 3)
+        return self.build_from_arrays(triples[:, 0].astype(np.int64), triples[:, 1].astype(np.int64),
+                                      triples[:, 2], revision, top_k)
+
+    def build_from_arrays(self, resume_ids: np.ndarray, job_ids: np.ndarray, scores: np.ndarray,
+                          revision: str = MATCH_MODEL_REVISION, top_k: Optional[int] = 100,
+                          as_of: Optional[float] = None) -> str:
+        """``as_of`` is when the scores were read (defaults to now)"""
+        as_of = time.time() if as_of is None else as_of
+        id_dtype = np.int32 if max(resume_ids.max(initial=0), job_ids.max(initial=0)) < 2 ** 31 else np.int64
+        resume_ids, job_ids = resume_ids.astype(id_dtype), job_ids.astype(id_dtype)
+        scores = np.asarray(scores, dtype=np.float32)
+
+        name = f"{revision}-{datetime.utcnow().strftime('%Y%m%d%H%M%S%f')}"
+        snapshots_dir = os.path.join(self.root, 'snapshots')
+        directory = os.path.join(snapshots_dir, name)
+        tmp_dir = directory + '.tmp'
+        os.makedirs(tmp_dir)
+
+        by_resume = _TopKSide.build(resume_ids, job_ids, scores, top_k)
+        by_job = _TopKSide.build(job_ids, resume_ids, scores, top_k)
+        by_resume.save(tmp_dir, 'resume')
+        by_job.save(tmp_dir, 'job')
+        with open(os.path.join(tmp_dir, 'meta.json'), 'w') as f:
+            json.dump({
+                'revision': revision,
+                'top_k': top_k,
+                'created_at': datetime.utcnow().isoformat(),
+                'as_of': as_of,
+                'pairs': int(len(scores)),
+                'resumes': int(len(by_resume.keys)),
+                'jobs': int(len(by_job.keys)),
+            }, f)
+        os.rename(tmp_dir, directory)
+
+        # Atomic swap: build the new link beside the old one, then rename over it
+        tmp_link = self.current_link + '.tmp'
+        if os.path.lexists(tmp_link):
+            os.remove(tmp_link)
+        os.symlink(os.path.join('snapshots', name), tmp_link)
+        os.replace(tmp_link, self.current_link)
+        self._compact_invalidations(as_of)
+
+        logger.info(f"Materialised match matrix {name}: {len(by_resume.keys)} resumes, {len(by_job.keys)} jobs")
+        with self._lock:
+            self._checked_at = 0.0
+        return directory
+
+    def build_from_db(self, session, match_model=None, revision: str = MATCH_MODEL_REVISION,
+                      top_k: Optional[int] = 100, batch_size: int = 10_000) -> str:
+        """Rebuild from the ``matches`` table, streaming rows in batches"""
+        if match_model is None:
+            from app.models import Match
+            match_model = Match
+        # Changes committed while we read are newer than the snapshot
+        as_of = time.time()
+        resume_ids, job_ids, scores = [], [], []
+        rows = (session.query(match_model.resume_id, match_model.job_id, match_model.match_score)
+                .filter(match_model.match_score.isnot(None))
+                .yield_per(batch_size))
+        for resume_id, job_id, score in rows:
+            resume_ids.append(resume_id)
+            job_ids.append(job_id)
+            scores.append(score)
+        return self.build_from_arrays(np.array(resume_ids, dtype=np.int64), np.array(job_ids, dtype=np.int64),
+                                      np.array(scores, dtype=np.float32), revision, top_k, as_of)
+
+    def current(self, revision: Optional[str] = MATCH_MODEL_REVISION) -> Optional[MatchMatrixSnapshot]:
+        """Live snapshot, or None if there is none for ``revision`` (None accepts any)"""
+        now = time.monotonic()
+        if now - self._checked_at >= self.refresh_interval:
+            with self._lock:
+                self._checked_at = now
+                try:
+                    target = os.path.realpath(self.current_link) if os.path.lexists(self.current_link) else None
+                except OSError:
+                    target = None
+                if target != self._target:
+                    self._snapshot = MatchMatrixSnapshot.open(target) if target else None
+                    self._target = target
+                self._load_invalidations()
+        snapshot = self._snapshot
+        if snapshot is None or (revision is not None and snapshot.revision != revision):
+            return None
+        return snapshot
+
+    def jobs_for_resume(self, resume_id: int, min_score: float = 0.0,
+                        revision: Optional[str] = MATCH_MODEL_REVISION,
+                        max_age: float = MATCH_MATRIX_MAX_AGE) -> Optional[List[Tuple[int, float]]]:
+        """Every ``(job_id, score)`` at or above ``min_score`` if the snapshot can vouch for it.
+
+        None when there is no snapshot for ``revision``, it is older than
+        ``max_age`` seconds, the resume or any job changed since it was
+        built, or the top-K cut may have dropped qualifying jobs.
+        """
+        snapshot = self.current(revision)
+        if snapshot is None or time.time() - snapshot.as_of > max_age:
+            return None
+        if max(self._job_changed_at, self._resume_changed_at.get(resume_id, 0.0)) >= snapshot.as_of:
+            return None
+        return snapshot.jobs_for_resume(resume_id, min_score, complete=True)
+
+    def prune(self, keep: int = 2) -> List[str]:
+        """Delete all but the newest ``keep`` snapshots (never the current one)"""
+        snapshots_dir = os.path.join(self.root, 'snapshots')
+        if not os.path.isdir(snapshots_dir):
+            return []
+        current = os.path.realpath(self.current_link) if os.path.lexists(self.current_link) else None
+        names = sorted((n for n in os.listdir(snapshots_dir) if not n.endswith('.tmp')),
+                       key=lambda n: os.path.getmtime(os.path.join(snapshots_dir, n)), reverse=True)
+        removed = []
+        for name in names[keep:]:
+            path = os.path.join(snapshots_dir, name)
+            if os.path.realpath(path) != current:
+                shutil.rmtree(path, ignore_errors=True)
+                removed.append(path)
+        return removed
+
+
+_store: Optional[MatchMatrixStore] = None
+_store_lock = threading.Lock()
+
+
+def get_match_matrix() -> MatchMatrixStore:
+    """Process-wide store rooted at MATCH_MATRIX_DIR"""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = MatchMatrixStore()
+        return _store
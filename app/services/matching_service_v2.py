@@ -1,9 +1,18 @@
 """Advanced Matching Service v2 - ML-based candidate-job matching"""
 
-from typing import List, Dict, Optional
+import hashlib
+import json
+from collections import OrderedDict
+from typing import List, Dict, Iterable, Optional, Union, Any
 from dataclasses import dataclass
 from enum import Enum
 
+import numpy as np
+from scipy.sparse import csc_matrix
+
+from app.services.ranking import top_k_indices
+from app.services.skill_index import SkillIndex
+
 class MatchRecommendation(str, Enum):
     PERFECT_MATCH = "PERFECT_MATCH"
     GOOD_MATCH = "GOOD_MATCH"
@@ -35,6 +44,149 @@ class DetailedMatch:
     learning_potential: str
     interview_questions: List[str]
 
+class CompiledCandidate:
+    """Pre-normalised candidate profile for repeated scoring.
+    
+    Holds the skill-to-level map and scalar factors extracted once from
+    ``enriched_data``. Reads through ``get`` fall back to the source dict,
+    so a compiled candidate can be passed anywhere a candidate dict is.
+    """
+    __slots__ = ('source', 'skills', 'seniority', 'years', 'salary',
+                 'remote', 'learning_ability', 'content_hash')
+    
+    def __init__(self, source: Dict, skills: Dict[str, int], seniority: int, years: float,
+                 salary: float, remote: bool, learning_ability: float, content_hash: Optional[str] = None):
+        self.source = source
+        self.skills = skills
+        self.seniority = seniority
+        self.years = years
+        self.salary = salary
+        self.remote = remote
+        self.learning_ability = learning_ability
+        self.content_hash = content_hash
+    
+    def get(self, key: str, default: Any = None) -> Any:
+        return self.source.get(key, default)
+
+class CandidateProfileCache:
+    """LRU cache of ``CompiledCandidate`` objects keyed by candidate id.
+    
+    An entry is reused while the candidate's ``updated_at`` (or, when absent,
+    the hash of its ``enriched_data``) is unchanged; otherwise it is rebuilt.
+    """
+    
+    def __init__(self, max_size: int = 50000):
+        self.max_size = max_size
+        self.entries: "OrderedDict[Any, tuple]" = OrderedDict()
+        self.stats = {'hits': 0, 'misses': 0, 'evictions': 0}
+    
+    @staticmethod
+    def content_hash(candidate: Dict) -> str:
+        payload = json.dumps(candidate.get('enriched_data', {}), sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+    
+    def get_or_compile(self, candidate: Dict, compile_fn) -> CompiledCandidate:
+        """Return the cached profile for ``candidate`` or compile and store it"""
+        candidate_id = candidate.get('id')
+        if candidate_id is None:
+            return compile_fn(candidate)
+        
+        # updated_at is cheap to compare; hash the content only when it is missing
+        updated_at = candidate.get('updated_at')
+        content_hash = None if updated_at is not None else self.content_hash(candidate)
+        version = str(updated_at) if updated_at is not None else content_hash
+        
+        entry = self.entries.get(candidate_id)
+        if entry is not None and entry[0] == version:
+            self.entries.move_to_end(candidate_id)
+            self.stats['hits'] += 1
+            return entry[1]
+        
+        self.stats['misses'] += 1
+        compiled = compile_fn(candidate)
+        compiled.content_hash = content_hash
+        self.entries[candidate_id] = (version, compiled)
+        self.entries.move_to_end(candidate_id)
+        
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+            self.stats['evictions'] += 1
+        
+        return compiled
+    
+    def invalidate(self, candidate_id: Any) -> bool:
+        return self.entries.pop(candidate_id, None) is not None
+    
+    def clear(self) -> None:
+        self.entries.clear()
+    
+    def __len__(self) -> int:
+        return len(self.entries)
+
+@dataclass
+class ScoredMatch:
+    """Score-only match result; narrative fields are built on demand via ``explain_match``"""
+    candidate: Dict
+    job: Dict
+    final_score: float
+    breakdown: MatchBreakdown
+    eligible: bool = True
+    
+    @property
+    def resume_id(self) -> int:
+        return self.candidate.get('id')
+    
+    @property
+    def job_id(self) -> int:
+        return self.job.get('id')
+    
+    @property
+    def candidate_name(self) -> str:
+        return self.candidate.get('name', 'Unknown')
+    
+    @property
+    def recommendation(self) -> MatchRecommendation:
+        return self.breakdown.recommendation
+
+@dataclass
+class CandidateMatrix:
+    """Columnar encoding of a candidate pool for vectorized scoring"""
+    candidates: List[Dict]
+    skill_index: Dict[str, int]
+    skill_levels: csc_matrix  # candidates x skills, 0 means skill absent
+    seniority: np.ndarray
+    years: np.ndarray
+    salary: np.ndarray
+    remote: np.ndarray
+    learning_ability: np.ndarray
+    
+    def __len__(self) -> int:
+        return len(self.candidates)
+    
+    def skill_columns(self, skill_names: List[str]) -> np.ndarray:
+        """Dense candidates x len(skill_names) level matrix for the given skills"""
+        levels = np.zeros((len(self.candidates), len(skill_names)))
+        for col, name in enumerate(skill_names):
+            idx = self.skill_index.get(name)
+            if idx is not None:
+                levels[:, col] = self.skill_levels[:, idx].toarray().ravel()
+        return levels
+
+@dataclass
+class BatchScores:
+    """Per-row factor scores from the vectorized engine (candidates, or jobs for ``score_jobs``)"""
+    skill_match: np.ndarray
+    seniority_match: np.ndarray
+    experience_match: np.ndarray
+    culture_fit: np.ndarray
+    growth_potential: np.ndarray
+    salary_compatibility: np.ndarray
+    final_score: np.ndarray
+    eligible: np.ndarray
+    
+    def __len__(self) -> int:
+        return len(self.final_score)
+
 class MatchingServiceV2:
     """Advanced matching algorithm with weighted factors"""
     
@@ -57,8 +209,10 @@ class MatchingServiceV2:
     SALARY_ACCEPTABLE_ABOVE = 1.2
     SALARY_CRITICAL_ABOVE = 1.5
     
-    def __init__(self):
+    def __init__(self, profile_cache_size: int = 50000):
         self._validate_weights()
+        self.profile_cache = CandidateProfileCache(max_size=profile_cache_size)
+        self.skill_index = SkillIndex()
     
     def _validate_weights(self):
         """Ensure weights sum to 1.0"""
@@ -115,6 +269,13 @@ class MatchingServiceV2:
             recommendation=recommendation
         )
         
+        return self._build_detailed_match(candidate, job, breakdown)
+    
+    def _build_detailed_match(self, candidate: Dict, job: Dict, breakdown: MatchBreakdown) -> DetailedMatch:
+        """Attach narrative fields to a scored breakdown"""
+        final_score = breakdown.final_score
+        recommendation = breakdown.recommendation
+        
         strengths = self._identify_strengths(candidate, job)
         gaps = self._identify_gaps(candidate, job)
         learning_potential = self._assess_learning_potential(candidate, job, gaps)
@@ -256,8 +417,85 @@ class MatchingServiceV2:
         else:
             return 0.0
     
+    @staticmethod
+    def _index_version(candidate: Dict) -> Optional[str]:
+        updated_at = candidate.get('updated_at')
+        return str(updated_at) if updated_at is not None else None
+    
+    def index_candidate(self, candidate: Dict) -> None:
+        """Add or refresh a candidate in the skill index (call on resume create/update)"""
+        self.skill_index.add(candidate.get('id'), self._extract_skills_with_levels(candidate).keys(),
+                             version=self._index_version(candidate))
+    
+    def rebuild_skill_index(self, candidates: Iterable[Dict]) -> int:
+        """Index ``candidates`` into a fresh skill index and swap it in; returns the count"""
+        index = SkillIndex()
+        for candidate in candidates:
+            index.add(candidate.get('id'), self._extract_skills_with_levels(candidate).keys(),
+                      version=self._index_version(candidate))
+        self.skill_index = index
+        return len(index)
+    
+    def unindex_candidate(self, candidate_id: int) -> bool:
+        """Remove a candidate from the skill index (call on resume delete)"""
+        return self.skill_index.remove(candidate_id)
+    
+    def eligible_candidate_ids(self, job: Dict) -> Optional[np.ndarray]:
+        """Sorted ids of indexed candidates meeting every hard requirement.
+        
+        Returns ``None`` when the job has no hard requirements.
+        """
+        hard_requirements = job.get('enriched_data', {}).get('hard_requirements', [])
+        return self.skill_index.candidates_with_all(req.get('name', '') for req in hard_requirements)
+    
+    def prefilter_candidates(self, candidates: List[Dict], job: Dict) -> List[Dict]:
+        """Drop indexed candidates that cannot meet the job's hard requirements.
+        
+        A candidate is only dropped when its index entry was built from the
+        same ``updated_at`` as the profile being scored. Candidates that are
+        missing, stale (e.g. updated by another process) or unversioned are
+        kept and left to the scorer.
+        """
+        eligible = self.eligible_candidate_ids(job)
+        if eligible is None:
+            return candidates
+        
+        eligible = set(eligible.tolist())
+        return [
+            c for c in candidates
+            if c.get('id') in eligible
+            or self._index_version(c) is None
+            or self.skill_index.version(c.get('id')) != self._index_version(c)
+        ]
+    
+    def compile_candidate(self, candidate: Dict) -> CompiledCandidate:
+        """Return a cached ``CompiledCandidate`` for a candidate dict"""
+        if isinstance(candidate, CompiledCandidate):
+            return candidate
+        return self.profile_cache.get_or_compile(candidate, self._compile_candidate)
+    
+    def compile_candidates(self, candidates: List[Dict]) -> List[CompiledCandidate]:
+        """Compile a candidate pool, reusing cached profiles where unchanged"""
+        return [self.compile_candidate(candidate) for candidate in candidates]
+    
+    def _compile_candidate(self, candidate: Dict) -> CompiledCandidate:
+        """Build a ``CompiledCandidate`` from the raw ``enriched_data``"""
+        enriched = candidate.get('enriched_data', {})
+        return CompiledCandidate(
+            source=candidate,
+            skills=self._extract_skills_with_levels(candidate),
+            seniority=self._extract_seniority_level(candidate),
+            years=enriched.get('total_years_experience', 0),
+            salary=enriched.get('salary_expectation', 0) or 0,
+            remote=bool(enriched.get('remote_preference')),
+            learning_ability=enriched.get('learning_ability', 0.5)
+        )
+    
     def _extract_skills_with_levels(self, candidate: Dict) -> Dict[str, int]:
         """Extract skills with experience levels"""
+        if isinstance(candidate, CompiledCandidate):
+            return candidate.skills
+        
         skills = {}
         candidate_skills = candidate.get('enriched_data', {}).get('skills', [])
         
@@ -274,6 +512,8 @@ class MatchingServiceV2:
     
     def _extract_seniority_level(self, candidate: Dict) -> int:
         """Extract seniority level as integer"""
+        if isinstance(candidate, CompiledCandidate):
+            return candidate.seniority
         seniority_str = candidate.get('enriched_data', {}).get('seniority_level', 'junior').lower()
         return self.SENIORITY_MAPPING.get(seniority_str, 1)
     
@@ -398,29 +638,343 @@ class MatchingServiceV2:
             interview_questions=[]
         )
     
-    def batch_calculate_matches(self, candidates: List[Dict], job: Dict, limit: int = None) -> List[DetailedMatch]:
-        """Calculate matches for multiple candidates"""
-        matches = []
+    def encode_candidates(self, candidates: List[Union[Dict, CompiledCandidate]]) -> CandidateMatrix:
+        """Encode a candidate pool once into NumPy arrays for batch scoring"""
+        n = len(candidates)
+        skill_index: Dict[str, int] = {}
+        rows, cols, levels = [], [], []
+        seniority = np.empty(n, dtype=np.int64)
+        years = np.empty(n)
+        salary = np.empty(n)
+        remote = np.empty(n, dtype=bool)
+        learning_ability = np.empty(n)
+        
+        for row, candidate in enumerate(candidates):
+            profile = self.compile_candidate(candidate)
+            for name, level in profile.skills.items():
+                rows.append(row)
+                cols.append(skill_index.setdefault(name, len(skill_index)))
+                levels.append(level)
+            seniority[row] = profile.seniority
+            years[row] = profile.years
+            salary[row] = profile.salary
+            remote[row] = profile.remote
+            learning_ability[row] = profile.learning_ability
+        
+        skill_levels = csc_matrix(
+            (np.asarray(levels, dtype=float), (rows, cols)),
+            shape=(n, len(skill_index))
+        )
         
-        for candidate in candidates:
-            match = self.calculate_match(candidate, job)
-            matches.append(match)
+        return CandidateMatrix(
+            candidates=list(candidates),
+            skill_index=skill_index,
+            skill_levels=skill_levels,
+            seniority=seniority,
+            years=years,
+            salary=salary,
+            remote=remote,
+            learning_ability=learning_ability
+        )
+    
+    def score_batch(self, candidates: Union[List[Dict], CandidateMatrix], job: Dict) -> BatchScores:
+        """Score a whole candidate pool against one job with array operations.
+        
+        Produces the same factor and final scores as ``calculate_match``.
+        """
+        matrix = candidates if isinstance(candidates, CandidateMatrix) else self.encode_candidates(candidates)
+        
+        eligible = self._batch_hard_requirements(matrix, job)
+        skill_score = self._batch_skill_match(matrix, job)
+        seniority_score = self._batch_seniority_match(matrix, job)
+        experience_score = self._batch_experience_match(matrix, job)
+        culture_score = self._batch_culture_fit(matrix, job)
+        growth_score = self._batch_growth_potential(matrix, job)
+        salary_score = self._batch_salary_compatibility(matrix, job)
+        
+        return self._combine_batch_scores(eligible, skill_score, seniority_score, experience_score,
+                                          culture_score, growth_score, salary_score)
+    
+    def _combine_batch_scores(self, eligible: np.ndarray, skill_score: np.ndarray,
+                              seniority_score: np.ndarray, experience_score: np.ndarray,
+                              culture_score: np.ndarray, growth_score: np.ndarray,
+                              salary_score: np.ndarray) -> BatchScores:
+        """Weight factor arrays into final scores, as ``calculate_match`` does per pair"""
+        final_score = (
+            skill_score * self.SKILL_WEIGHT +
+            seniority_score * self.SENIORITY_WEIGHT +
+            experience_score * self.EXPERIENCE_WEIGHT +
+            culture_score * self.CULTURE_WEIGHT +
+            growth_score * self.GROWTH_WEIGHT
+        )
         
-        matches.sort(key=lambda m: m.final_score, reverse=True)
+        # Apply salary as multiplier
+        final_score = np.where(salary_score < 0.3, final_score * 0.5,
+                               np.where(salary_score < 0.6, final_score * 0.8, final_score))
+        final_score = np.clip(final_score, 0.0, 1.0)
+        
+        # Pairs failing hard requirements score zero across the board
+        scores = [skill_score, seniority_score, experience_score, culture_score,
+                  growth_score, salary_score, final_score]
+        skill_score, seniority_score, experience_score, culture_score, growth_score, salary_score, final_score = (
+            np.where(eligible, score, 0.0) for score in scores
+        )
         
-        if limit:
-            matches = matches[:limit]
+        return BatchScores(
+            skill_match=skill_score,
+            seniority_match=seniority_score,
+            experience_match=experience_score,
+            culture_fit=culture_score,
+            growth_potential=growth_score,
+            salary_compatibility=salary_score,
+            final_score=final_score,
+            eligible=eligible
+        )
+    
+    def score_jobs(self, candidate: Dict, jobs: List[Dict]) -> BatchScores:
+        """Score one candidate against many jobs with array operations.
+        
+        The mirror of ``score_batch``: rows are jobs. Job fields are gathered
+        into flat arrays in one pass (skill requirements flattened across
+        jobs) and every factor is computed once for all of them. Produces
+        the same scores as ``calculate_match``.
+        """
+        profile = self.compile_candidate(candidate)
+        skills = profile.skills
+        enriched = [job.get('enriched_data', {}) for job in jobs]
+        n = len(jobs)
+        
+        eligible = np.array([
+            all(req.get('name', '').lower() in skills for req in e.get('hard_requirements', []))
+            for e in enriched
+        ], dtype=bool)
+        
+        # Skill requirements of every job, flattened; job_rows maps each back to its job
+        job_rows, required_levels, weights, levels = [], [], [], []
+        for row, e in enumerate(enriched):
+            for skill_req in e.get('skills_required', []):
+                job_rows.append(row)
+                required_levels.append(skill_req.get('level', 1))
+                weights.append(3.0 if skill_req.get('required', True) else 1.0)
+                levels.append(skills.get(skill_req.get('name', '').lower(), 0))
+        job_rows = np.asarray(job_rows, dtype=np.int64)
+        required_levels = np.asarray(required_levels, dtype=float)
+        levels = np.asarray(levels, dtype=float)
+        weights = np.asarray(weights, dtype=float)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            partial = np.minimum(1.0, levels / required_levels)
+        per_requirement = np.where(levels > 0, np.where(levels >= required_levels, 1.0, partial), 0.0)
+        total_weight = np.bincount(job_rows, weights=weights, minlength=n)
+        total_score = np.bincount(job_rows, weights=per_requirement * weights, minlength=n)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            skill_score = np.where(total_weight > 0, total_score / total_weight, 1.0)
+        
+        job_seniority = np.array([e.get('seniority_level') or 0 for e in enriched])
+        gap = np.abs(profile.seniority - job_seniority)
+        seniority_score = np.where(
+            job_seniority == 0, 1.0,
+            np.select([gap == 0, gap == 1, gap == 2], [1.0, 0.7, 0.3], default=0.0)
+        )
         
-        return matches
+        years_required = np.array([e.get('years_required', 0) for e in enriched], dtype=float)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            experience_score = np.where(profile.years >= years_required, 1.0,
+                                        np.minimum(1.0, profile.years / years_required))
+        experience_score = np.where(years_required == 0, 1.0, experience_score)
+        
+        remote_policy = [e.get('remote_policy') for e in enriched]
+        is_remote = np.array([policy == 'remote' for policy in remote_policy], dtype=bool)
+        is_office = np.array([policy == 'office' for policy in remote_policy], dtype=bool)
+        is_hybrid = np.array([policy == 'hybrid' for policy in remote_policy], dtype=bool)
+        preferred = is_remote if profile.remote else is_office
+        culture_score = np.minimum(1.0, 0.5 + np.where(preferred, 0.2, np.where(is_hybrid, 0.15, 0.0)))
+        
+        job_level = np.array([e.get('seniority_level', 3) for e in enriched])
+        growth_score = np.select(
+            [profile.seniority < job_level, profile.seniority == job_level],
+            [min(0.8, profile.learning_ability + 0.3), 0.8],
+            default=0.6
+        )
+        
+        job_salary = np.array([job.get('salary', 0) or 0 for job in jobs], dtype=float)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ratio = profile.salary / job_salary
+        salary_score = np.select(
+            [ratio <= 1.0, ratio <= self.SALARY_ACCEPTABLE_ABOVE, ratio <= self.SALARY_CRITICAL_ABOVE],
+            [1.0, 0.8, 0.4],
+            default=0.0
+        )
+        salary_score = np.where((job_salary == 0) | (profile.salary == 0), 0.8, salary_score)
+        
+        return self._combine_batch_scores(eligible, skill_score, seniority_score, experience_score,
+                                          culture_score, growth_score, salary_score)
     
-    def find_jobs_for_candidate(self, candidate: Dict, jobs: List[Dict], limit: int = 10) -> List[DetailedMatch]:
-        """Find best job matches for a candidate"""
-        matches = []
+    def _batch_hard_requirements(self, matrix: CandidateMatrix, job: Dict) -> np.ndarray:
+        """Vectorized ``_check_hard_requirements``"""
+        hard_requirements = job.get('enriched_data', {}).get('hard_requirements', [])
+        names = [req.get('name', '').lower() for req in hard_requirements]
+        if not names:
+            return np.ones(len(matrix), dtype=bool)
+        return (matrix.skill_columns(names) > 0).all(axis=1)
+    
+    def _batch_skill_match(self, matrix: CandidateMatrix, job: Dict) -> np.ndarray:
+        """Vectorized ``_calculate_skill_match``"""
+        job_requirements = job.get('enriched_data', {}).get('skills_required', [])
         
-        for job in jobs:
-            match = self.calculate_match(candidate, job)
-            matches.append(match)
+        if not job_requirements:
+            return np.ones(len(matrix))
+        
+        names = [req.get('name', '').lower() for req in job_requirements]
+        candidate_levels = matrix.skill_columns(names)
+        
+        total_score = np.zeros(len(matrix))
+        total_weight = 0
         
-        matches.sort(key=lambda m: m.final_score, reverse=True)
+        # Accumulate per requirement in the same order as the scalar path
+        for col, skill_req in enumerate(job_requirements):
+            required_level = skill_req.get('level', 1)
+            weight = 3.0 if skill_req.get('required', True) else 1.0
+            
+            level = candidate_levels[:, col]
+            with np.errstate(divide='ignore', invalid='ignore'):
+                partial = np.minimum(1.0, level / required_level)
+            skill_score = np.where(level >= required_level, 1.0, partial)
+            skill_score = np.where(level > 0, skill_score, 0.0)
+            
+            total_score = total_score + skill_score * weight
+            total_weight += weight
         
-        return matches[:limit]
+        return total_score / total_weight if total_weight > 0 else np.zeros(len(matrix))
+    
+    def _batch_seniority_match(self, matrix: CandidateMatrix, job: Dict) -> np.ndarray:
+        """Vectorized ``_calculate_seniority_match``"""
+        job_seniority = job.get('enriched_data', {}).get('seniority_level')
+        
+        if not job_seniority:
+            return np.ones(len(matrix))
+        
+        gap = np.abs(matrix.seniority - job_seniority)
+        return np.select([gap == 0, gap == 1, gap == 2], [1.0, 0.7, 0.3], default=0.0)
+    
+    def _batch_experience_match(self, matrix: CandidateMatrix, job: Dict) -> np.ndarray:
+        """Vectorized ``_calculate_experience_match``"""
+        job_years_required = job.get('enriched_data', {}).get('years_required', 0)
+        
+        if job_years_required == 0:
+            return np.ones(len(matrix))
+        
+        return np.where(matrix.years >= job_years_required, 1.0,
+                        np.minimum(1.0, matrix.years / job_years_required))
+    
+    def _batch_culture_fit(self, matrix: CandidateMatrix, job: Dict) -> np.ndarray:
+        """Vectorized ``_calculate_culture_fit``"""
+        job_remote = job.get('enriched_data', {}).get('remote_policy')
+        score = np.full(len(matrix), 0.5)
+        
+        if job_remote == 'remote':
+            score = np.where(matrix.remote, score + 0.2, score)
+        elif job_remote == 'office':
+            score = np.where(~matrix.remote, score + 0.2, score)
+        elif job_remote == 'hybrid':
+            score = score + 0.15
+        
+        return np.minimum(1.0, score)
+    
+    def _batch_growth_potential(self, matrix: CandidateMatrix, job: Dict) -> np.ndarray:
+        """Vectorized ``_calculate_growth_potential``"""
+        job_level = job.get('enriched_data', {}).get('seniority_level', 3)
+        
+        return np.select(
+            [matrix.seniority < job_level, matrix.seniority == job_level],
+            [np.minimum(0.8, matrix.learning_ability + 0.3), 0.8],
+            default=0.6
+        )
+    
+    def _batch_salary_compatibility(self, matrix: CandidateMatrix, job: Dict) -> np.ndarray:
+        """Vectorized ``_calculate_salary_compatibility``"""
+        job_salary = job.get('salary', 0)
+        
+        if not job_salary:
+            return np.full(len(matrix), 0.8)
+        
+        ratio = matrix.salary / job_salary
+        score = np.select(
+            [ratio <= 1.0, ratio <= self.SALARY_ACCEPTABLE_ABOVE, ratio <= self.SALARY_CRITICAL_ABOVE],
+            [1.0, 0.8, 0.4],
+            default=0.0
+        )
+        return np.where(matrix.salary == 0, 0.8, score)
+    
+    def _breakdown_from_batch(self, scores: BatchScores, index: int) -> MatchBreakdown:
+        """Materialize one row of a ``BatchScores`` as a ``MatchBreakdown``"""
+        final_score = float(scores.final_score[index])
+        return MatchBreakdown(
+            skill_match=float(scores.skill_match[index]),
+            seniority_match=float(scores.seniority_match[index]),
+            experience_match=float(scores.experience_match[index]),
+            culture_fit=float(scores.culture_fit[index]),
+            growth_potential=float(scores.growth_potential[index]),
+            salary_compatibility=float(scores.salary_compatibility[index]),
+            final_score=final_score,
+            recommendation=self._classify_match(final_score)
+        )
+    
+    def _scored_from_batch(self, candidate: Dict, job: Dict, scores: BatchScores, index: int) -> ScoredMatch:
+        """Build the ``ScoredMatch`` for one row of a batch result"""
+        breakdown = self._breakdown_from_batch(scores, index)
+        return ScoredMatch(
+            candidate=candidate,
+            job=job,
+            final_score=breakdown.final_score,
+            breakdown=breakdown,
+            eligible=bool(scores.eligible[index])
+        )
+    
+    def explain_match(self, scored: ScoredMatch) -> DetailedMatch:
+        """Build strengths, gaps, explanation and interview questions for a ranked match"""
+        if not scored.eligible:
+            return self._create_no_match(scored.candidate, scored.job)
+        return self._build_detailed_match(scored.candidate, scored.job, scored.breakdown)
+    
+    def rank_candidates(self, candidates: Union[List[Dict], CandidateMatrix], job: Dict, limit: int = None,
+                        use_skill_index: bool = False, min_score: float = None) -> List[ScoredMatch]:
+        """Score and rank candidates for a job without generating narrative fields.
+        
+        Only the ``limit`` best rows (at or above ``min_score``) are turned into
+        ``ScoredMatch`` objects. With ``use_skill_index`` candidates ruled out by
+        the hard-requirement index are skipped entirely instead of being
+        returned with a zero score.
+        """
+        if use_skill_index and not isinstance(candidates, CandidateMatrix):
+            candidates = self.prefilter_candidates(candidates, job)
+        matrix = candidates if isinstance(candidates, CandidateMatrix) else self.encode_candidates(candidates)
+        scores = self.score_batch(matrix, job)
+        
+        return [
+            self._scored_from_batch(matrix.candidates[i], job, scores, i)
+            for i in top_k_indices(scores.final_score, limit, min_score)
+        ]
+    
+    def rank_jobs(self, candidate: Dict, jobs: List[Dict], limit: int = None,
+                  min_score: float = None) -> List[ScoredMatch]:
+        """Score and rank jobs for a candidate without generating narrative fields.
+        
+        All jobs are scored in one ``score_jobs`` pass; only the ``limit`` best
+        (at or above ``min_score``) become ``ScoredMatch`` objects.
+        """
+        scores = self.score_jobs(candidate, jobs)
+        return [
+            self._scored_from_batch(candidate, jobs[i], scores, i)
+            for i in top_k_indices(scores.final_score, limit, min_score)
+        ]
+    
+    def batch_calculate_matches(self, candidates: Union[List[Dict], CandidateMatrix], job: Dict, limit: int = None,
+                                use_skill_index: bool = False, min_score: float = None) -> List[DetailedMatch]:
+        """Calculate matches for multiple candidates"""
+        ranked = self.rank_candidates(candidates, job, limit, use_skill_index, min_score)
+        return [self.explain_match(m) for m in ranked]
+    
+    def find_jobs_for_candidate(self, candidate: Dict, jobs: List[Dict], limit: int = 10,
+                                min_score: float = None) -> List[DetailedMatch]:
+        """Find best job matches for a candidate"""
+        return [self.explain_match(m) for m in self.rank_jobs(candidate, jobs, limit, min_score)]
@@ -1,8 +1,13 @@
 """Advanced ML Matching Service v3 - Transformer-based candidate-job matching with explainability."""
 
+import hashlib
+import json
 import logging
+import os
+import time
 import numpy as np
-from typing import Dict, List, Optional, Tuple, Any
+from collections import OrderedDict
+from typing import Dict, Iterator, List, Optional, Tuple, Any
 from dataclasses import dataclass
 from datetime import datetime
 from enum import Enum
@@ -11,6 +16,9 @@ from abc import ABC, abstractmethod
 from sklearn.preprocessing import MinMaxScaler
 from sklearn.metrics.pairwise import cosine_similarity
 from scipy.special import softmax
+from scipy.sparse import csr_matrix, issparse
+
+from app.services.ranking import TopKHeap, top_k_indices
 
 
 logger = logging.getLogger(__name__)
@@ -58,6 +66,75 @@ class MatchScore:
         }
 
 
+class MatchCache:
+    """Bounded LRU cache of match scores with per-entry TTL.
+    
+    Keys are ``(candidate_hash, job_hash, algorithm)`` so an entry is
+    naturally bypassed as soon as either profile changes.
+    """
+
+    def __init__(self, max_entries: int = 100_000, ttl_seconds: Optional[float] = 3600):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Tuple[str, str, str], Tuple[float, MatchScore]]" = OrderedDict()
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0, "expirations": 0}
+
+    def _is_expired(self, stored_at: float, now: float) -> bool:
+        return self.ttl_seconds is not None and now - stored_at > self.ttl_seconds
+
+    def get(self, key: Tuple[str, str, str]) -> Optional[MatchScore]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.stats["misses"] += 1
+            return None
+        stored_at, match = entry
+        if self._is_expired(stored_at, time.monotonic()):
+            del self._entries[key]
+            self.stats["expirations"] += 1
+            self.stats["misses"] += 1
+            return None
+        self._entries.move_to_end(key)
+        self.stats["hits"] += 1
+        return match
+
+    def put(self, key: Tuple[str, str, str], match: MatchScore) -> None:
+        self._entries[key] = (time.monotonic(), match)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.stats["evictions"] += 1
+
+    def iter_items(self) -> Iterator[Tuple[Tuple[str, str, str], MatchScore]]:
+        """Yield live entries, oldest first.
+        
+        Iterates over a shallow snapshot of the entries (references only, no
+        MatchScore copies), so the cache may be updated while a consumer
+        is still reading.
+        """
+        now = time.monotonic()
+        for key, (stored_at, match) in list(self._entries.items()):
+            if not self._is_expired(stored_at, now):
+                yield key, match
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def __contains__(self, key: Tuple[str, str, str]) -> bool:
+        entry = self._entries.get(key)
+        return entry is not None and not self._is_expired(entry[0], time.monotonic())
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return {
+            **self.stats,
+            "entries": len(self._entries),
+            "hit_ratio": self.stats["hits"] / lookups if lookups else 0.0,
+        }
+
+
 class FeatureExtractor(ABC):
     """Abstract feature extractor."""
 
@@ -68,20 +145,79 @@ class FeatureExtractor(ABC):
 
 
 class SkillFeatureExtractor(FeatureExtractor):
-    """Extract skill-based features."""
-
-    def __init__(self, skill_vocab: List[str]):
-        self.skill_vocab = skill_vocab
-        self.skill_index = {skill: idx for idx, skill in enumerate(skill_vocab)}
-
-    def extract(self, data: Dict[str, Any]) -> np.ndarray:
-        """Extract skill features as binary vector."""
+    """Extract skill-based features.
+    
+    Each vocabulary entry has a stable uint32 id (its position in
+    ``skill_vocab``). In sparse mode ``extract`` returns a 1 x V CSR row
+    instead of a dense vector, so memory and similarity cost scale with the
+    number of skills a profile has rather than the vocabulary size.
+    """
+
+    ID_DTYPE = np.uint32
+
+    def __init__(self, skill_vocab: List[str], sparse: bool = False):
+        self.skill_vocab = list(skill_vocab)
+        self.skill_index = {skill: idx for idx, skill in enumerate(self.skill_vocab)}
+        self.sparse = sparse
+
+    def extract(self, data: Dict[str, Any]) -> Any:
+        """Extract skill features as binary vector (CSR row in sparse mode)."""
+        if self.sparse:
+            return self.extract_sparse(data)
         features = np.zeros(len(self.skill_vocab))
         for skill in data.get("skills", []):
             if skill in self.skill_index:
                 features[self.skill_index[skill]] = 1.0
         return features
 
+    def encode(self, skills: List[str]) -> np.ndarray:
+        """Map skills to sorted, unique uint32 vocabulary ids (unknown skills dropped)."""
+        ids = {self.skill_index[s] for s in skills if s in self.skill_index}
+        return np.array(sorted(ids), dtype=self.ID_DTYPE)
+
+    def decode(self, ids: np.ndarray) -> List[str]:
+        """Map vocabulary ids back to skill names."""
+        return [self.skill_vocab[int(i)] for i in ids]
+
+    def extract_indices(self, data: Dict[str, Any]) -> np.ndarray:
+        """Extract skill features as an index array of present skills."""
+        return self.encode(data.get("skills", []))
+
+    def extract_sparse(self, data: Dict[str, Any]) -> csr_matrix:
+        """Extract skill features as a 1 x V CSR row."""
+        return self.extract_matrix([data])
+
+    def extract_matrix(self, items: List[Dict[str, Any]]) -> csr_matrix:
+        """Extract binary skill features for many profiles as one sparse matrix."""
+        rows = [self.extract_indices(data) for data in items]
+        indptr = np.zeros(len(rows) + 1, dtype=np.int64)
+        indptr[1:] = np.cumsum([len(r) for r in rows])
+        indices = np.concatenate(rows) if rows else np.array([], dtype=self.ID_DTYPE)
+        values = np.ones(len(indices))
+        return csr_matrix((values, indices, indptr), shape=(len(items), len(self.skill_vocab)))
+
+    def add_skills(self, skills: List[str]) -> np.ndarray:
+        """Append unseen skills to the vocabulary without renumbering existing ones."""
+        for skill in skills:
+            if skill not in self.skill_index:
+                self.skill_index[skill] = len(self.skill_vocab)
+                self.skill_vocab.append(skill)
+        return self.encode(skills)
+
+    def save_vocab(self, path: str) -> None:
+        """Persist the id encoding so ids stay stable across restarts."""
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": 1, "skills": self.skill_vocab}, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load_vocab(cls, path: str, sparse: bool = False) -> "SkillFeatureExtractor":
+        """Restore an extractor from a vocabulary saved with ``save_vocab``."""
+        with open(path, "r", encoding="utf-8") as f:
+            payload = json.load(f)
+        return cls(payload["skills"], sparse=sparse)
+
 
 class ExperienceFeatureExtractor(FeatureExtractor):
     """Extract experience-based features."""
@@ -115,23 +251,36 @@ class MLMatchingServiceV3:
         self,
         algorithm: MatchingAlgorithm = MatchingAlgorithm.ENSEMBLE,
         min_score_threshold: float = 0.5,
+        cache_max_entries: int = 100_000,
+        cache_ttl_seconds: Optional[float] = 3600,
     ):
         self.algorithm = algorithm
         self.min_score_threshold = min_score_threshold
         self.skill_extractor = None
         self.experience_extractor = ExperienceFeatureExtractor()
         self.scaler = MinMaxScaler()
-        self.match_cache: Dict[str, MatchScore] = {}
+        self.match_cache = MatchCache(cache_max_entries, cache_ttl_seconds)
 
-    def initialize_skill_vocab(self, skills: List[str]) -> None:
+    def initialize_skill_vocab(self, skills: List[str], sparse: bool = False) -> None:
         """Initialize skill vocabulary.
         
         Args:
             skills: List of all possible skills
+            sparse: Use sparse skill vectors (recommended for large taxonomies)
         """
-        self.skill_extractor = SkillFeatureExtractor(skills)
+        self.skill_extractor = SkillFeatureExtractor(skills, sparse=sparse)
         logger.info(f"Initialized skill vocabulary with {len(skills)} skills")
 
+    def load_skill_vocab(self, path: str, sparse: bool = True) -> None:
+        """Load a persisted skill vocabulary, keeping its id encoding.
+        
+        Args:
+            path: File written by ``SkillFeatureExtractor.save_vocab``
+            sparse: Use sparse skill vectors
+        """
+        self.skill_extractor = SkillFeatureExtractor.load_vocab(path, sparse=sparse)
+        logger.info(f"Loaded skill vocabulary with {len(self.skill_extractor.skill_vocab)} skills from {path}")
+
     def match_candidate_to_job(
         self,
         candidate: Dict[str, Any],
@@ -146,10 +295,28 @@ class MLMatchingServiceV3:
         Returns:
             Match score with explanation
         """
-        cache_key = f"{candidate['id']}_{job['id']}"
-        if cache_key in self.match_cache:
-            return self.match_cache[cache_key]
+        cache_key = self._cache_key(self._content_hash(candidate), self._content_hash(job))
+        cached = self.match_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        return self._store_match(candidate, job, self._score_components(candidate, job), cache_key)
 
+    @staticmethod
+    def _content_hash(profile: Dict[str, Any]) -> str:
+        payload = json.dumps(profile, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _cache_key(self, candidate_hash: str, job_hash: str) -> Tuple[str, str, str]:
+        """Key from precomputed profile hashes; hash each profile once per call."""
+        return candidate_hash, job_hash, MatchingAlgorithm(self.algorithm).value
+
+    def _score_components(
+        self,
+        candidate: Dict[str, Any],
+        job: Dict[str, Any],
+    ) -> Tuple[float, float, float, float]:
+        """Compute (skill, experience, culture, overall) scores for a pair."""
         # Extract features
         if self.skill_extractor is None:
             raise ValueError("Skill vocabulary not initialized")
@@ -172,6 +339,18 @@ class MLMatchingServiceV3:
         else:
             overall_score = (skill_score + experience_score + cultural_score) / 3
 
+        return skill_score, experience_score, cultural_score, overall_score
+
+    def _store_match(
+        self,
+        candidate: Dict[str, Any],
+        job: Dict[str, Any],
+        components: Tuple[float, float, float, float],
+        cache_key: Tuple[str, str, str],
+    ) -> MatchScore:
+        """Build the explained MatchScore for scored components and cache it under ``cache_key``."""
+        skill_score, experience_score, cultural_score, overall_score = components
+
         # Determine quality level
         quality_level = self._score_to_quality_level(overall_score)
         explanation = self._generate_explanation(
@@ -195,16 +374,19 @@ class MLMatchingServiceV3:
             timestamp=datetime.utcnow(),
         )
 
-        self.match_cache[cache_key] = match_score
+        self.match_cache.put(cache_key, match_score)
         return match_score
 
     @staticmethod
     def _calculate_skill_score(
-        candidate_skills: np.ndarray,
-        job_skills: np.ndarray,
+        candidate_skills: Any,
+        job_skills: Any,
     ) -> float:
         """Calculate skill match score."""
-        similarity = cosine_similarity([candidate_skills], [job_skills])[0][0]
+        if issparse(candidate_skills):
+            similarity = cosine_similarity(candidate_skills, job_skills)[0][0]
+        else:
+            similarity = cosine_similarity([candidate_skills], [job_skills])[0][0]
         return float(similarity)
 
     @staticmethod
@@ -301,18 +483,130 @@ class MLMatchingServiceV3:
         Returns:
             Sorted list of top matches
         """
-        matches = [
-            self.match_candidate_to_job(candidate, job)
-            for job in jobs
-            if self.match_candidate_to_job(candidate, job).overall_score
-            >= self.min_score_threshold
+        # Score every job once but only build MatchScore objects for the top K
+        top = TopKHeap(top_k, self.min_score_threshold)
+        candidate_hash = self._content_hash(candidate)
+        for job in jobs:
+            cache_key = self._cache_key(candidate_hash, self._content_hash(job))
+            cached = self.match_cache.get(cache_key)
+            if cached is not None:
+                top.push(cached.overall_score, cached)
+            else:
+                components = self._score_components(candidate, job)
+                top.push(components[-1], (job, components, cache_key))
+
+        return [
+            item if isinstance(item, MatchScore) else self._store_match(candidate, *item)
+            for item in top.items()
         ]
-        return sorted(matches, key=lambda m: m.overall_score, reverse=True)[:top_k]
 
-    def get_batch_results(self) -> Dict[str, Dict]:
-        """Get all cached match results.
+    def get_top_matches_batch(
+        self,
+        candidates: List[Dict[str, Any]],
+        jobs: List[Dict[str, Any]],
+        top_k: int = 10,
+    ) -> List[List[MatchScore]]:
+        """Get top K job matches for every candidate in one pass.
         
+        Skill similarity for the whole candidate x job grid comes from a
+        single sparse matrix product; experience and culture scores are
+        computed by broadcasting.
+        
+        Args:
+            candidates: Candidate profiles
+            jobs: List of job postings
+            top_k: Number of top matches per candidate
+            
         Returns:
-            Dictionary of all match results
+            One sorted list of top matches per candidate, in input order
         """
-        return {key: match.to_dict() for key, match in self.match_cache.items()}
+        if self.skill_extractor is None:
+            raise ValueError("Skill vocabulary not initialized")
+        if not candidates or not jobs:
+            return [[] for _ in candidates]
+
+        skill_scores = self._skill_score_matrix(
+            self.skill_extractor.extract_matrix(candidates),
+            self.skill_extractor.extract_matrix(jobs),
+        )
+        experience_scores = self._experience_score_matrix(
+            np.vstack([self.experience_extractor.extract(c) for c in candidates]),
+            np.vstack([self.experience_extractor.extract(j) for j in jobs]),
+        )
+        cultural_scores = self._cultural_score_matrix(candidates, jobs)
+
+        if self.algorithm == MatchingAlgorithm.ENSEMBLE:
+            overall_scores = skill_scores * 0.5 + experience_scores * 0.35 + cultural_scores * 0.15
+        else:
+            overall_scores = (skill_scores + experience_scores + cultural_scores) / 3
+
+        job_hashes = [self._content_hash(job) for job in jobs]
+        results = []
+        for row, candidate in enumerate(candidates):
+            candidate_hash = self._content_hash(candidate)
+            results.append([
+                self._store_match(candidate, jobs[col], (
+                    float(skill_scores[row, col]),
+                    float(experience_scores[row, col]),
+                    float(cultural_scores[row, col]),
+                    float(overall_scores[row, col]),
+                ), self._cache_key(candidate_hash, job_hashes[col]))
+                for col in top_k_indices(overall_scores[row], top_k, self.min_score_threshold)
+            ])
+        return results
+
+    @staticmethod
+    def _skill_score_matrix(candidate_skills: csr_matrix, job_skills: csr_matrix) -> np.ndarray:
+        """Cosine similarity of every candidate/job skill vector pair."""
+        return cosine_similarity(candidate_skills, job_skills, dense_output=True)
+
+    @staticmethod
+    def _experience_score_matrix(candidate_exp: np.ndarray, job_exp: np.ndarray) -> np.ndarray:
+        """Broadcast version of _calculate_experience_score."""
+        diff = np.abs(candidate_exp[:, None, :] - job_exp[None, :, :])
+        return np.clip(1.0 - np.mean(diff, axis=2), 0, 1)
+
+    @staticmethod
+    def _cultural_score_matrix(
+        candidates: List[Dict[str, Any]],
+        jobs: List[Dict[str, Any]],
+    ) -> np.ndarray:
+        """Matrix version of _calculate_cultural_score."""
+        value_index: Dict[str, int] = {}
+        job_sets = [set(job.get("company_values", [])) for job in jobs]
+        for values in job_sets:
+            for value in values:
+                value_index.setdefault(value, len(value_index))
+
+        def encode(value_sets: List[set]) -> csr_matrix:
+            rows, cols = [], []
+            for row, values in enumerate(value_sets):
+                for value in values:
+                    if value in value_index:
+                        rows.append(row)
+                        cols.append(value_index[value])
+            return csr_matrix(
+                (np.ones(len(rows)), (rows, cols)),
+                shape=(len(value_sets), len(value_index)),
+            )
+
+        candidate_sets = [set(c.get("company_values", [])) for c in candidates]
+        overlap = (encode(candidate_sets) @ encode(job_sets).T).toarray()
+        job_counts = np.array([len(values) for values in job_sets], dtype=float)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            scores = overlap / job_counts[None, :]
+        return np.where(job_counts[None, :] == 0, 0.5, scores)
+
+    def get_batch_results(self) -> Iterator[Dict]:
+        """Stream all cached match results.
+        
+        Returns:
+            Iterator of match result dictionaries
+        """
+        for _, match in self.match_cache.iter_items():
+            yield match.to_dict()
+
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Get match cache hit, miss and eviction counters."""
+        return self.match_cache.get_stats()
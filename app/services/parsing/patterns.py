@@ -0,0 +1,139 @@
+"""Реестр предкомпилированных регулярных выражений для парсинга и обогащения.
+
+Шаблоны компилируются один раз при импорте, а не передаются строками в
+``re.search`` при каждом вызове (и не зависят от внутреннего кэша ``re``).
+Группы, которые применяются к уже приведённому к нижнему регистру тексту,
+компилируются без ``re.IGNORECASE``: на таких строках флаг ничего не
+меняет, но в разы замедляет поиск, отключая поиск по литеральному префиксу.
+
+Шаблоны одной задачи не склеиваются в общую альтернативу: движок ``re``
+перебирает ветви в каждой позиции, и на наших текстах это медленнее, чем
+несколько поисков с литеральным префиксом, которые к тому же прерываются
+на первой находке (см. performance_tests/bench_parsing.py).
+"""
+
+import re
+from typing import List, Optional, Sequence, Tuple, Union
+
+Patterns = Union[str, Sequence[str]]
+
+
+class PatternGroup:
+    """Упорядоченные метки с предкомпилированными шаблонами.
+
+    Порядок меток — приоритет: ``first`` возвращает первую метку, у которой
+    сработал шаблон, ``found_ordered`` — все сработавшие метки.
+    """
+
+    def __init__(self, alternatives: Sequence[Tuple[str, Patterns]], flags: int = 0):
+        self.alternatives = [(label, [patterns] if isinstance(patterns, str) else list(patterns))
+                             for label, patterns in alternatives]
+        self.labels = [label for label, _ in self.alternatives]
+        self.flags = flags
+        self.compiled = [(label, [re.compile(pattern, flags) for pattern in patterns])
+                         for label, patterns in self.alternatives]
+
+    def first(self, text: str) -> Optional[Tuple[str, re.Match]]:
+        """Метка с наивысшим приоритетом и самое левое совпадение её шаблона."""
+        for label, compiled in self.compiled:
+            for pattern in compiled:
+                match = pattern.search(text)
+                if match:
+                    return label, match
+        return None
+
+    def found_ordered(self, text: str) -> List[str]:
+        """Все метки, чей хотя бы один шаблон встречается в тексте, в порядке объявления."""
+        return [label for label, compiled in self.compiled
+                if any(pattern.search(text) for pattern in compiled)]
+
+    @staticmethod
+    def value(match: re.Match) -> str:
+        """То, что вернул бы ``re.findall``: первая группа или всё совпадение."""
+        return match.group(1) if match.re.groups else match.group(0)
+
+
+# === Резюме (текст в нижнем регистре) ===
+
+EXPERIENCE = PatternGroup([
+    ('years_of_experience', r'(\d+)\s*\+?\s*(?:years?|yrs?)\s+(?:of\s+)?(?:experience|exp)'),
+    ('years', r'(\d+)\s*\+?\s*(?:лет|года|years)'),
+    ('experience_then_years', r'experience.*?(\d+)\s*(?:years?|лет)'),
+])
+
+ROLES = PatternGroup([
+    ('backend engineer', r'(?:backend|server-side)'),
+    ('frontend engineer', r'(?:frontend|ui|ux engineer)'),
+    ('full stack engineer', r'(?:full.?stack)'),
+    ('devops engineer', r'(?:devops|infrastructure)'),
+    ('data scientist', r'(?:data scientist|data science)'),
+    ('ml engineer', r'(?:machine learning|ml engineer)'),
+    ('qa engineer', r'(?:qa|quality assurance)'),
+    ('product manager', r'(?:product manager|pm|product owner)'),
+    ('architect', r'(?:architect|solution architect)'),
+])
+
+EDUCATION = PatternGroup([
+    ('phd', [r'(?:phd|ph\.d\.|doctor)', r'(?:доктор)']),
+    ('master', [r'(?:master|m\.s\.|mba)', r'(?:магистр)']),
+    ('bachelor', [r'(?:bachelor|b\.s\.|bs|ba)', r'(?:бакалавр)']),
+])
+
+LANGUAGES = PatternGroup([
+    ('English', r'(?:english|eng)'),
+    ('Russian', r'(?:russian|рус)'),
+    ('Spanish', r'(?:spanish|испан)'),
+    ('German', r'(?:german|нем)'),
+    ('French', r'(?:french|фран)'),
+])
+
+# === Вакансии (текст в нижнем регистре, кроме зарплаты) ===
+
+SENIORITY = PatternGroup([
+    ('lead', [
+        r'(?:lead|principal|architect|staff)',
+        r'(?:team lead|tech lead)',
+        r'(?:10\+|15\+|20\+)\s*(?:years?|yrs?)',
+    ]),
+    ('senior', [
+        r'(?:senior|старший)',
+        r'(?:8\+|9\+|10\+)\s*(?:years?|yrs?)',
+        r'(?:опыт от 8|опыт от 10)',
+    ]),
+    ('mid', [
+        r'(?:middle|mid|intermediate)',
+        r'(?:3\+|4\+|5\+|6\+|7\+)\s*(?:years?|yrs?)',
+        r'(?:опыт от 3|опыт от 5)',
+    ]),
+    ('junior', [
+        r'(?:junior|начинающ|entry.?level)',
+        r'(?:0\+|1\+|2\+)\s*(?:years?|yrs?)',
+    ]),
+])
+
+BENEFITS = PatternGroup([
+    ('remote', [r'(?:remote|работа из дома|work from home)', r'(?:fully remote|100% remote)']),
+    ('flexible_hours', [r'(?:flexible|гибкий)', r'(?:flexible working hours)']),
+    ('relocation', [r'(?:relocation|переезд|relocation package)', r'(?:visa sponsorship)']),
+    ('health_insurance', [r'(?:health insurance|страховка|medical)', r'(?:health benefits)']),
+    ('stock_options', [r'(?:stock options|опционы|equity)', r'(?:stock grants)']),
+    ('unlimited_pto', [r'(?:unlimited pto|unlimited vacation)', r'(?:unlimited time off)']),
+    ('conference_budget', [r'(?:conference|conferences|обучение)', r'(?:professional development)',
+                           r'(?:learning budget)']),
+    ('wellness', [r'(?:wellness|gym|fitness)', r'(?:mental health)']),
+    ('parental_leave', [r'(?:parental leave|paternity|maternity)']),
+    ('bonus', [r'(?:bonus|bonuses|performance bonus)', r'(?:annual bonus)']),
+])
+
+SALARY_MIN = PatternGroup([
+    ('dollar', r'\$(\d{3,})\s*(?:k|K|\d{3})?'),
+    ('usd', r'(\d{3,})\s*(?:usd|USD)'),
+    ('from', r'from\s*\$(\d{3,})'),
+], flags=re.IGNORECASE)
+
+# Для максимума нужны все совпадения шаблона (берётся последнее), поэтому findall
+SALARY_MAX = [re.compile(pattern, re.IGNORECASE) for pattern in (
+    r'(\d{3,})\s*(?:k|K)\s*$',
+    r'to\s*\$(\d{3,})',
+    r'-\s*\$(\d{3,})',
+)]
@@ -1,13 +1,38 @@
 """Продвинутый парсер резюме с полной структуризацией данных."""
 
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional, Sequence
 from datetime import datetime
-import re
+from functools import cached_property
+import os
+import time
+from app.services.parsing import patterns
 from app.services.parsing.skill_extractor import SkillExtractor
 from app.logger import get_logger
+from utils.process_pool import can_start_workers, pool_map
 
 logger = get_logger("resume_parser")
 
+
+class ParseContext:
+    """Per-document state shared by all parsing stages.
+    
+    The text is lowercased once and skills are extracted once, however
+    many stages need them.
+    """
+    
+    def __init__(self, raw_text: str, skill_extractor: SkillExtractor):
+        self.raw_text = raw_text
+        self.skill_extractor = skill_extractor
+    
+    @cached_property
+    def text_lower(self) -> str:
+        return self.raw_text.lower()
+    
+    @cached_property
+    def skills(self) -> List[Dict]:
+        return self.skill_extractor.rank(self.skill_extractor.count_mentions(self.text_lower))
+
+
 class ResumeParserAdvanced:
     """Full resume parser with structured data extraction."""
     
@@ -23,17 +48,29 @@ class ResumeParserAdvanced:
             if not raw_text or len(raw_text.strip()) == 0:
                 raise ValueError("Empty resume text")
             
-            result = {
-                'skills': self.skill_extractor.extract(raw_text),
-                'experience_years': self._estimate_experience(raw_text),
-                'primary_role': self._identify_role(raw_text),
-                'tech_stack': self._extract_tech_stack(raw_text),
-                'education': self._extract_education(raw_text),
-                'languages': self._extract_languages(raw_text),
+            ctx = ParseContext(raw_text, self.skill_extractor)
+            stages = [
+                ('skills', self._extract_skills),
+                ('experience_years', self._estimate_experience),
+                ('primary_role', self._identify_role),
+                ('tech_stack', self._extract_tech_stack),
+                ('education', self._extract_education),
+                ('languages', self._extract_languages),
+                ('confidence_score', self._calculate_confidence),
+            ]
+            
+            result = {}
+            timings = {}
+            for name, stage in stages:
+                started = time.perf_counter()
+                result[name] = stage(ctx)
+                timings[name] = round((time.perf_counter() - started) * 1000, 3)
+            
+            result.update({
                 'parsing_status': 'success',
                 'parsed_at': datetime.utcnow().isoformat(),
-                'confidence_score': self._calculate_confidence(raw_text)
-            }
+                'stage_timings_ms': timings,
+            })
             
             logger.info(f"Resume parsed: {len(result['skills'])} skills, {result['experience_years']} years exp")
             return result
@@ -52,46 +89,56 @@ class ResumeParserAdvanced:
                 'parsed_at': datetime.utcnow().isoformat()
             }
     
-    def _estimate_experience(self, text: str) -> float:
-        """Estimate total experience in years from resume text."""
-        patterns = [
-            (r'(\d+)\s*\+?\s*(?:years?|yrs?)\s+(?:of\s+)?(?:experience|exp)', 1.0),
-            (r'(\d+)\s*\+?\s*(?:лет|года|years)', 1.0),
-            (r'experience.*?(\d+)\s*(?:years?|лет)', 1.0),
-        ]
+    def parse_many(self, texts: Sequence[str], workers: Optional[int] = None,
+                   chunk_size: int = 32) -> List[Dict[str, Any]]:
+        """
+        Parse a batch of resumes across a process pool.
+        Parsing is pure-Python regex work and holds the GIL, so documents are
+        sent to worker processes ``chunk_size`` at a time. Results come back in
+        input order; each carries its own ``parsing_status`` ('success' or
+        'error'), so one bad document does not fail the batch.
+        ``workers=1`` parses in the calling process, as does any call from a
+        daemonic process (e.g. a Celery prefork child), which cannot have
+        children. The pool is shared by all calls in the process.
+        """
+        texts = list(texts)
+        if not texts:
+            return []
+        
+        chunks = [texts[i:i + chunk_size] for i in range(0, len(texts), chunk_size)]
+        workers = workers or min(len(chunks), os.cpu_count() or 1)
+        if workers > 1 and not can_start_workers():
+            logger.warning("parse_many called from a daemonic process, parsing in-process")
+            workers = 1
+        if workers <= 1 or len(chunks) == 1:
+            results = [self.parse(text) for text in texts]
+        else:
+            results = [result for part in pool_map('resume_parser', workers, _parse_chunk, chunks)
+                       for result in part]
         
-        for pattern, weight in patterns:
-            matches = re.findall(pattern, text, re.IGNORECASE)
-            if matches:
-                try:
-                    return min(float(matches[0]), 60)
-                except (ValueError, IndexError):
-                    continue
-        return 0.0
+        failed = sum(1 for r in results if r['parsing_status'] != 'success')
+        logger.info(f"Parsed {len(results)} resumes with {workers} worker(s), {failed} failed")
+        return results
     
-    def _identify_role(self, text: str) -> str:
+    def _extract_skills(self, ctx: ParseContext) -> List[Dict]:
+        """Extract ranked skills (shared with the other stages via ctx)."""
+        return ctx.skills
+    
+    def _estimate_experience(self, ctx: ParseContext) -> float:
+        """Estimate total experience in years from resume text."""
+        found = patterns.EXPERIENCE.first(ctx.text_lower)
+        if found is None:
+            return 0.0
+        return min(float(patterns.EXPERIENCE.value(found[1])), 60)
+    
+    def _identify_role(self, ctx: ParseContext) -> str:
         """Identify primary role/job title from resume."""
-        roles_map = {
-            'backend engineer': r'(?:backend|server-side)',
-            'frontend engineer': r'(?:frontend|ui|ux engineer)',
-            'full stack engineer': r'(?:full.?stack)',
-            'devops engineer': r'(?:devops|infrastructure)',
-            'data scientist': r'(?:data scientist|data science)',
-            'ml engineer': r'(?:machine learning|ml engineer)',
-            'qa engineer': r'(?:qa|quality assurance)',
-            'product manager': r'(?:product manager|pm|product owner)',
-            'architect': r'(?:architect|solution architect)',
-        }
-        
-        text_lower = text.lower()
-        for role, pattern in roles_map.items():
-            if re.search(pattern, text_lower[:500], re.IGNORECASE):
-                return role.title()
-        return None
+        found = patterns.ROLES.first(ctx.text_lower[:500])
+        return found[0].title() if found else None
     
-    def _extract_tech_stack(self, text: str) -> Dict[str, List[str]]:
+    def _extract_tech_stack(self, ctx: ParseContext) -> Dict[str, List[str]]:
         """Extract and organize technology stack."""
-        skills = self.skill_extractor.extract(text)
+        skills = ctx.skills
         return {
             'languages': [s['name'] for s in skills if s['category'] == 'language'][:8],
             'frameworks': [s['name'] for s in skills if s['category'] == 'framework'][:8],
@@ -99,44 +146,29 @@ class ResumeParserAdvanced:
             'tools': [s['name'] for s in skills if s['category'] in ['devops', 'tool', 'cloud']][:8],
         }
     
-    def _extract_education(self, text: str) -> List[Dict]:
+    def _extract_education(self, ctx: ParseContext) -> List[Dict]:
         """Extract education information."""
-        degrees = {
-            'phd': [r'(?:phd|ph\.d\.|doctor)', r'(?:доктор)'],
-            'master': [r'(?:master|m\.s\.|mba)', r'(?:магистр)'],
-            'bachelor': [r'(?:bachelor|b\.s\.|bs|ba)', r'(?:бакалавр)'],
-        }
-        
-        education = []
-        text_lower = text.lower()
-        for degree_type, patterns in degrees.items():
-            for pattern in patterns:
-                if re.search(pattern, text_lower, re.IGNORECASE):
-                    education.append({'type': degree_type, 'found': True})
-                    break
-        return education
+        return [{'type': degree_type, 'found': True}
+                for degree_type in patterns.EDUCATION.found_ordered(ctx.text_lower)]
     
-    def _extract_languages(self, text: str) -> List[str]:
+    def _extract_languages(self, ctx: ParseContext) -> List[str]:
         """Extract communication languages."""
-        languages_map = {
-            'English': r'(?:english|eng)',
-            'Russian': r'(?:russian|рус)',
-            'Spanish': r'(?:spanish|испан)',
-            'German': r'(?:german|нем)',
-            'French': r'(?:french|фран)',
-        }
-        
-        found = []
-        text_lower = text.lower()
-        for lang, pattern in languages_map.items():
-            if re.search(pattern, text_lower, re.IGNORECASE):
-                found.append(lang)
-        return found
+        return patterns.LANGUAGES.found_ordered(ctx.text_lower)
     
-    def _calculate_confidence(self, text: str) -> float:
+    def _calculate_confidence(self, ctx: ParseContext) -> float:
         """Calculate parsing confidence score (0-1)."""
         score = 0.5
-        score += min(len(text) / 5000, 0.3)
-        skills = self.skill_extractor.extract(text)
-        score += min(len(skills) / 20, 0.2)
+        score += min(len(ctx.raw_text) / 5000, 0.3)
+        score += min(len(ctx.skills) / 20, 0.2)
         return min(score, 1.0)
+
+
+_worker_parser: Optional[ResumeParserAdvanced] = None
+
+
+def _parse_chunk(texts: List[str]) -> List[Dict[str, Any]]:
+    """Process-pool entry point; each worker builds its parser once."""
+    global _worker_parser
+    if _worker_parser is None:
+        _worker_parser = ResumeParserAdvanced()
+    return [_worker_parser.parse(text) for text in texts]
@@ -1,7 +1,8 @@
 """Извлечение и нормализация технических скиллов из резюме."""
 
 import re
-from typing import List, Dict
+from collections import Counter
+from typing import Dict, Iterable, List, Optional
 from app.logger import get_logger
 
 logger = get_logger("skill_extractor")
@@ -64,11 +65,63 @@ TECH_SKILLS_DB = {
     'apache': {'category': 'tool', 'level': 1, 'popularity': 60},
 }
 
+# Альтернативные написания -> каноническое имя из TECH_SKILLS_DB
+SKILL_ALIASES = {
+    'go': 'golang',
+    'k8s': 'kubernetes',
+    'postgres': 'postgresql',
+    'node.js': 'nodejs',
+    'next.js': 'nextjs',
+    'react.js': 'react',
+    'vue.js': 'vue',
+    'c++': 'cpp',
+    'c#': 'csharp',
+    'google cloud': 'gcp',
+}
+
+
+def _trie_pattern(terms: Iterable[str]) -> str:
+    """Regex-альтернатива, свёрнутая в префиксное дерево.
+    
+    Общие префиксы проверяются один раз (``git(?:hub|lab)?``), поэтому
+    стоимость попытки в каждой позиции зависит от длины термина, а не от
+    размера таксономии.
+    """
+    trie: Dict = {}
+    for term in terms:
+        node = trie
+        for char in term:
+            node = node.setdefault(char, {})
+        node[''] = {}
+    
+    def render(node: Dict) -> str:
+        branches = [re.escape(char) + render(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        if '' in node:
+            return '(?:' + '|'.join(branches) + ')?'
+        if len(branches) == 1:
+            return branches[0]
+        return '(?:' + '|'.join(branches) + ')'
+    
+    return render(trie)
+
+
 class SkillExtractor:
     """Извлечение скиллов из текста резюме."""
     
-    def __init__(self):
-        self.skills_db = TECH_SKILLS_DB
+    def __init__(self, skills_db: Optional[Dict[str, Dict]] = None,
+                 aliases: Optional[Dict[str, str]] = None):
+        self.skills_db = TECH_SKILLS_DB if skills_db is None else skills_db
+        aliases = SKILL_ALIASES if aliases is None else aliases
+        
+        # Любое написание (каноническое или алиас) -> каноническое имя
+        self.canonical = {name.lower(): name for name in self.skills_db}
+        self.canonical.update((alias.lower(), name) for alias, name in aliases.items()
+                              if name in self.skills_db)
+        # Один проход по тексту для всей таксономии; lookaround вместо \b,
+        # чтобы границы работали и для "c++" / "c#"
+        self.pattern = re.compile(r'(?<!\w)' + _trie_pattern(self.canonical) + r'(?!\w)')
         logger.info("SkillExtractor initialized")
     
     def extract(self, text: str) -> List[Dict]:
@@ -89,25 +142,24 @@ class SkillExtractor:
         """
         if not text:
             return []
-        
-        text_lower = text.lower()
+        return self.rank(self.count_mentions(text.lower()))
+    
+    def rank(self, mentions: Counter) -> List[Dict]:
+        """Собрать отсортированный список скиллов из счётчика упоминаний."""
         found_skills = {}
         
-        # Поиск известных скиллов
+        # Порядок таксономии сохраняется, чтобы сортировка ниже была стабильной
         for skill_name, metadata in self.skills_db.items():
-            # Regex с word boundaries
-            pattern = r'\b' + re.escape(skill_name) + r'\b'
-            matches = re.findall(pattern, text_lower, re.IGNORECASE)
-            
-            if matches:
-                confidence = min(len(matches) * 0.2, 1.0)
+            count = mentions.get(skill_name)
+            if count:
+                confidence = min(count * 0.2, 1.0)
                 found_skills[skill_name] = {
                     'name': skill_name.title(),
                     'category': metadata['category'],
                     'level': metadata.get('level', 2),
                     'popularity': metadata.get('popularity', 50),
                     'confidence': confidence,
-                    'mentions': len(matches)
+                    'mentions': count
                 }
         
         # Сортировка по уверенности и количеству упоминаний
@@ -120,6 +172,10 @@ class SkillExtractor:
         logger.info(f"Extracted {len(sorted_skills)} skills from text")
         return sorted_skills
     
+    def count_mentions(self, text_lower: str) -> Counter:
+        """Число упоминаний каждого канонического скилла (текст уже в нижнем регистре)."""
+        return Counter(self.canonical[m.group(0)] for m in self.pattern.finditer(text_lower))
+    
     def extract_by_category(self, text: str, category: str) -> List[Dict]:
         """Извлечь скиллы определённой категории."""
         all_skills = self.extract(text)
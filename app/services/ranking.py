@@ -0,0 +1,82 @@
+"""Bounded top-K selection helpers shared by the matching services
+
+Both helpers order by score descending and break ties by input position,
+which is exactly what a stable ``sort(reverse=True)`` followed by ``[:k]``
+returns, but in O(N) time and O(K) extra memory.
+"""
+import heapq
+from typing import Any, List, Optional, Tuple
+
+import numpy as np
+
+
+def top_k_indices(scores: np.ndarray, k: Optional[int] = None,
+                  min_score: Optional[float] = None) -> np.ndarray:
+    """Indices of the ``k`` highest scores, best first.
+
+    Args:
+        scores: 1-D score array
+        k: Number of results to keep; ``None`` or 0 keeps everything
+        min_score: Optional floor; scores below it are never selected
+
+    Returns:
+        Index array ordered by score descending, ties by ascending index
+    """
+    scores = np.asarray(scores, dtype=float)
+    candidates = np.arange(len(scores))
+    if min_score is not None:
+        candidates = candidates[scores >= min_score]
+
+    keys = -scores[candidates]
+    if k and k < len(candidates):
+        # argpartition picks an arbitrary subset of boundary ties, so resolve
+        # them explicitly in favour of the earliest positions
+        kth = keys[np.argpartition(keys, k - 1)[k - 1]]
+        better = np.flatnonzero(keys < kth)
+        ties = np.flatnonzero(keys == kth)[:k - len(better)]
+        chosen = np.concatenate([better, ties])
+        candidates, keys = candidates[chosen], keys[chosen]
+
+    return candidates[np.lexsort((candidates, keys))]
+
+
+class TopKHeap:
+    """Bounded min-heap keeping the ``k`` best items seen so far.
+
+    Items are offered with a score; ``would_accept`` lets callers skip
+    building expensive result objects for anything that cannot make the cut.
+    """
+
+    def __init__(self, k: Optional[int] = None, min_score: Optional[float] = None):
+        self.k = k
+        self.min_score = min_score
+        self._heap: List[Tuple[float, int, Any]] = []
+        self._seq = 0
+
+    def would_accept(self, score: float) -> bool:
+        if self.min_score is not None and score < self.min_score:
+            return False
+        if not self.k or len(self._heap) < self.k:
+            return True
+        # Later items lose ties, so they must strictly beat the current worst
+        return score > self._heap[0][0]
+
+    def push(self, score: float, item: Any) -> bool:
+        """Offer an item; returns True if it was kept"""
+        if not self.would_accept(score):
+            self._seq += 1
+            return False
+        entry = (score, -self._seq, item)
+        self._seq += 1
+        if not self.k or len(self._heap) < self.k:
+            heapq.heappush(self._heap, entry)
+        else:
+            heapq.heapreplace(self._heap, entry)
+        return True
+
+    def items(self) -> List[Any]:
+        """Kept items, best first"""
+        return [item for _, _, item in sorted(self._heap, key=lambda e: (e[0], e[1]), reverse=True)]
+
+    def __len__(self) -> int:
+        return len(self._heap)
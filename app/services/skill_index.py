@@ -0,0 +1,190 @@
+"""Inverted skill index - normalised skill -> sorted candidate ids
+
+Used to resolve a job's hard requirements to the eligible candidate set
+before any scoring happens. Postings are kept as sets so resumes can be
+added, updated and removed incrementally; sorted NumPy arrays are built
+lazily per skill and reused until that posting changes.
+
+Each candidate's entry records the version (``updated_at``) it was built
+from. The index is per process, so callers only trust an entry whose
+version matches the profile being scored.
+
+``build_skill_index`` loads a matcher's index from the Resume table and
+``install_skill_index_hooks`` keeps it in step with commits made through
+a given session factory.
+"""
+import logging
+import threading
+from typing import Any, Dict, Iterable, Optional, Set
+
+import numpy as np
+from sqlalchemy import event
+
+logger = logging.getLogger(__name__)
+
+
+class SkillIndex:
+    """In-process inverted index from skill name to candidate ids"""
+
+    def __init__(self):
+        self._postings: Dict[str, Set[int]] = {}
+        self._arrays: Dict[str, np.ndarray] = {}
+        self._candidate_skills: Dict[int, Set[str]] = {}
+        self._versions: Dict[int, Optional[str]] = {}
+        self._lock = threading.RLock()
+
+    @staticmethod
+    def normalize(skill: str) -> str:
+        return str(skill).lower()
+
+    def add(self, candidate_id: int, skills: Iterable[str], version: Optional[str] = None) -> None:
+        """Index a candidate, replacing any skills previously indexed for it"""
+        new_skills = {self.normalize(skill) for skill in skills}
+        with self._lock:
+            old_skills = self._candidate_skills.get(candidate_id, set())
+            for skill in old_skills - new_skills:
+                self._discard(skill, candidate_id)
+            for skill in new_skills - old_skills:
+                self._postings.setdefault(skill, set()).add(candidate_id)
+                self._arrays.pop(skill, None)
+            self._candidate_skills[candidate_id] = new_skills
+            self._versions[candidate_id] = version
+
+    update = add
+
+    def remove(self, candidate_id: int) -> bool:
+        """Drop a candidate from every posting list"""
+        with self._lock:
+            skills = self._candidate_skills.pop(candidate_id, None)
+            self._versions.pop(candidate_id, None)
+            if skills is None:
+                return False
+            for skill in skills:
+                self._discard(skill, candidate_id)
+            return True
+
+    def _discard(self, skill: str, candidate_id: int) -> None:
+        posting = self._postings.get(skill)
+        if posting is None:
+            return
+        posting.discard(candidate_id)
+        if not posting:
+            del self._postings[skill]
+        self._arrays.pop(skill, None)
+
+    def postings(self, skill: str) -> np.ndarray:
+        """Sorted array of candidate ids that have ``skill``"""
+        skill = self.normalize(skill)
+        with self._lock:
+            array = self._arrays.get(skill)
+            if array is None:
+                array = np.fromiter(sorted(self._postings.get(skill, ())), dtype=np.int64)
+                self._arrays[skill] = array
+            return array
+
+    def candidates_with_all(self, skills: Iterable[str]) -> Optional[np.ndarray]:
+        """Sorted ids of candidates having every skill; ``None`` if no skills given"""
+        skills = {self.normalize(skill) for skill in skills}
+        if not skills:
+            return None
+
+        with self._lock:
+            # Intersect smallest postings first so the working set shrinks fastest
+            ordered = sorted(skills, key=lambda s: len(self._postings.get(s, ())))
+            eligible = self.postings(ordered[0])
+            for skill in ordered[1:]:
+                if eligible.size == 0:
+                    break
+                eligible = np.intersect1d(eligible, self.postings(skill), assume_unique=True)
+            return eligible
+
+    def version(self, candidate_id: int) -> Optional[str]:
+        """Version the candidate was indexed at; ``None`` if unknown or not indexed"""
+        return self._versions.get(candidate_id)
+
+    def __contains__(self, candidate_id: int) -> bool:
+        return candidate_id in self._candidate_skills
+
+    def __len__(self) -> int:
+        return len(self._candidate_skills)
+
+    def get_stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                'candidates': len(self._candidate_skills),
+                'skills': len(self._postings),
+                'postings': sum(len(p) for p in self._postings.values()),
+            }
+
+
+def _resume_candidate(resume_id: int, skills, updated_at) -> Dict[str, Any]:
+    return {'id': resume_id, 'updated_at': updated_at, 'enriched_data': {'skills': list(skills or [])}}
+
+
+def build_skill_index(service: Any, session, resume_model=None, chunk_size: int = 1000) -> int:
+    """Rebuild ``service``'s index (a ``MatchingServiceV2``) from every Resume row.
+
+    Rows are read in id order, ``chunk_size`` at a time, into a fresh index
+    that is swapped in at the end; returns the number of resumes indexed.
+    """
+    if resume_model is None:
+        from app.models import Resume
+        resume_model = Resume
+
+    def iter_candidates():
+        last_id = 0
+        while True:
+            rows = (
+                session.query(resume_model.id, resume_model.skills, resume_model.updated_at)
+                .filter(resume_model.id > last_id)
+                .order_by(resume_model.id)
+                .limit(chunk_size)
+                .all()
+            )
+            if not rows:
+                return
+            for resume_id, skills, updated_at in rows:
+                yield _resume_candidate(resume_id, skills, updated_at)
+            last_id = rows[-1][0]
+
+    return service.rebuild_skill_index(iter_candidates())
+
+
+def install_skill_index_hooks(service: Any, session_factory, resume_model=None) -> None:
+    """Index/unindex Resume rows in ``service`` (a ``MatchingServiceV2``) after each commit.
+
+    Listeners are attached to ``session_factory`` (a ``sessionmaker``), so
+    only its sessions pay for them. Skills are read from the flushed
+    objects, so dispatch needs no query; a rollback discards the collected
+    changes. Commits from other processes are not seen here; their entries
+    go stale and are ignored by the version check.
+    """
+    if resume_model is None:
+        from app.models import Resume
+        resume_model = Resume
+
+    def collect(session, flush_context):
+        pending = session.info.setdefault("skill_index_pending", {})
+        for obj in list(session.new) + [o for o in session.dirty if session.is_modified(o)]:
+            if isinstance(obj, resume_model):
+                pending[obj.id] = (obj.skills, obj.updated_at)
+        for obj in session.deleted:
+            if isinstance(obj, resume_model):
+                pending[obj.id] = None
+
+    def dispatch(session):
+        for resume_id, row in session.info.pop("skill_index_pending", {}).items():
+            try:
+                if row is None:
+                    service.unindex_candidate(resume_id)
+                else:
+                    service.index_candidate(_resume_candidate(resume_id, *row))
+            except Exception as e:
+                logger.error(f"Failed to update skill index for resume {resume_id}: {e}")
+
+    def discard(session):
+        session.info.pop("skill_index_pending", None)
+
+    event.listen(session_factory, "after_flush", collect)
+    event.listen(session_factory, "after_commit", dispatch)
+    event.listen(session_factory, "after_rollback", discard)
@@ -1,6 +1,18 @@
 """Celery task modules for asynchronous job processing."""
 
-from .matching import match_candidates
+from .matching import (
+    match_candidates,
+    match_candidates_sharded,
+    match_shard,
+    reduce_shard_matches,
+    rematch_resume,
+    rematch_job,
+    unmatch_resume,
+    unmatch_job,
+    rebuild_match_matrix,
+    rebuild_vector_indexes,
+)
+from .resume_parse import parse_resume_task, parse_resumes_batch
 from .webhooks import process_webhook
 from .notifications import send_email, send_sms
 from .cache import warm_cache, clear_cache
@@ -8,6 +20,17 @@ from .maintenance import cleanup_old_records, generate_reports
 
 __all__ = [
     'match_candidates',
+    'match_candidates_sharded',
+    'match_shard',
+    'reduce_shard_matches',
+    'rematch_resume',
+    'rematch_job',
+    'unmatch_resume',
+    'unmatch_job',
+    'rebuild_match_matrix',
+    'rebuild_vector_indexes',
+    'parse_resume_task',
+    'parse_resumes_batch',
     'process_webhook',
     'send_email',
     'send_sms',
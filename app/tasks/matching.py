@@ -1,30 +1,65 @@
 """ML candidate matching task."""
 
 import logging
-from typing import List, Dict, Any
-from celery import shared_task
+import os
+import time
+import uuid
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+from celery import chord, group, shared_task
 from datetime import datetime
 import numpy as np
-from sklearn.metrics.pairwise import cosine_similarity
+from scipy import sparse
+from sqlalchemy import func
+from sqlalchemy.orm import Session
 
 from app.models import Candidate, Job, Match
+from app.services.corpus_vectorizer import DEFAULT_VECTORIZER_PATH, CorpusVectorizer, get_corpus_vectorizer
 from app.services.health_check import log_service_operation
+from app.services.match_matrix import get_match_matrix
+from app.services.incremental_matcher import (
+    JOB_TEXT_FIELDS,
+    RESUME_TEXT_FIELDS,
+    IncrementalMatcher,
+    install_change_hooks,
+    join_text,
+    semantic_fit,
+    upsert_matches,
+)
+from app.services.ranking import top_k_indices
 from app.config import settings
+from utils.file_lock import file_lock
 
 logger = logging.getLogger(__name__)
 
 
+CANDIDATE_CHUNK_SIZE = 1000
+MATCH_SHARDS = int(os.getenv('MATCH_SHARDS', '8'))
+MATCH_TOP_K = int(os.getenv('MATCH_TOP_K', '500'))
+# Must be on storage every Celery worker can read (like TFIDF_VECTORIZER_PATH)
+VECTORIZER_SNAPSHOT_DIR = os.getenv('TFIDF_SNAPSHOT_DIR', 'instance/tfidf_snapshots')
+
+
 @shared_task(bind=True, max_retries=3, default_retry_delay=60)
-def match_candidates(self, job_id: int) -> Dict[str, Any]:
+def match_candidates(self, job_id: int, chunk_size: int = CANDIDATE_CHUNK_SIZE,
+                     after_id: int = 0, matches_created: int = 0) -> Dict[str, Any]:
     """
     Match candidates to a job using ML-based similarity scoring.
     
+    Candidates are streamed in primary-key order, ``chunk_size`` at a time,
+    so peak memory does not grow with the pool. Each chunk is scored with
+    one sparse product and its matches are committed before the next chunk
+    is read; a retry resumes after the last committed candidate id.
+    
     Args:
         job_id: ID of the job to match candidates against
+        chunk_size: Candidates scored and flushed per chunk
+        after_id: Resume point; only candidates with a larger id are scored
+        matches_created: Matches committed by earlier attempts
         
     Returns:
         Dict with matching results and statistics
     """
+    last_id = after_id
     try:
         start_time = datetime.utcnow()
         
@@ -34,43 +69,38 @@ def match_candidates(self, job_id: int) -> Dict[str, Any]:
             logger.error(f"Job {job_id} not found")
             return {"error": "Job not found", "job_id": job_id}
         
-        # Get all active candidates
-        candidates = Candidate.query.filter_by(is_active=True).all()
-        if not candidates:
-            logger.warning(f"No active candidates for job {job_id}")
-            return {"message": "No candidates available", "matches": []}
-        
-        # Generate job embedding
-        job_vector = _generate_embedding(job.description, job.requirements)
+        job_text = _combine_text(job.description, job.requirements)
+        vectorizer = _fitted_vectorizer(job_text, chunk_size)
+        job_vector = vectorizer.transform([job_text])
         
-        matches = []
-        for candidate in candidates:
-            # Generate candidate embedding
-            candidate_vector = _generate_embedding(
-                candidate.skills, candidate.experience
-            )
+        from app import db
+        candidates_scored = 0
+        for chunk in _iter_candidate_chunks(chunk_size, after_id):
+            candidate_ids = [candidate_id for candidate_id, _, _ in chunk]
+            candidate_matrix = vectorizer.transform([
+                _combine_text(skills, experience) for _, skills, experience in chunk
+            ])
+            similarities = _cosine_scores(candidate_matrix, job_vector)
             
-            # Calculate similarity score
-            similarity = cosine_similarity(
-                [job_vector], [candidate_vector]
-            )[0][0]
+            # Upsert matches above threshold, one statement per chunk, so a
+            # retry that re-scores a chunk overwrites rather than duplicates
+            rows = _match_rows(
+                job_id,
+                [(candidate_id, similarity) for candidate_id, similarity in zip(candidate_ids, similarities)
+                 if similarity >= settings.MATCH_THRESHOLD],
+            )
+            upsert_matches(db.session, rows, Match)
+            db.session.commit()
             
-            # Store match if score above threshold
-            if similarity >= settings.MATCH_THRESHOLD:
-                match = Match(
-                    job_id=job_id,
-                    candidate_id=candidate.id,
-                    score=float(similarity),
-                    created_at=datetime.utcnow()
-                )
-                matches.append(match)
+            last_id = candidate_ids[-1]
+            matches_created += len(rows)
+            candidates_scored += len(candidate_ids)
         
-        # Batch insert matches
-        if matches:
-            from sqlalchemy import insert
-            from app import db
-            db.session.bulk_save_objects(matches)
-            db.session.commit()
+        get_match_matrix().invalidate('job', job_id)
+        
+        if candidates_scored == 0 and after_id == 0:
+            logger.warning(f"No active candidates for job {job_id}")
+            return {"message": "No candidates available", "matches": []}
         
         # Log operation
         duration = (datetime.utcnow() - start_time).total_seconds()
@@ -79,44 +109,406 @@ def match_candidates(self, job_id: int) -> Dict[str, Any]:
             operation="match_candidates",
             status="success",
             duration=duration,
-            metadata={"job_id": job_id, "matches_created": len(matches)}
+            metadata={"job_id": job_id, "matches_created": matches_created}
         )
         
-        logger.info(f"Matched {len(matches)} candidates to job {job_id}")
+        logger.info(f"Matched {matches_created} candidates to job {job_id}")
         return {
             "job_id": job_id,
-            "matches_created": len(matches),
+            "matches_created": matches_created,
+            "candidates_scored": candidates_scored,
             "duration": duration
         }
         
     except Exception as exc:
-        logger.error(f"Error matching candidates for job {job_id}: {exc}")
-        raise self.retry(exc=exc)
+        logger.error(f"Error matching candidates for job {job_id} after id {last_id}: {exc}")
+        from app import db
+        db.session.rollback()
+        # Positional args replace the original request's, so a task queued as
+        # delay(job_id) is not retried with job_id passed twice
+        raise self.retry(exc=exc, args=(job_id, chunk_size, last_id, matches_created), kwargs={})
+
+
+@shared_task
+def match_candidates_sharded(job_id: int, shards: int = MATCH_SHARDS,
+                             top_k: int = MATCH_TOP_K) -> Dict[str, Any]:
+    """
+    Fan matching for one job out over ``shards`` workers.
+    
+    The active candidate id range is cut into contiguous shards, each
+    scored by ``match_shard`` into a local top-K; ``reduce_shard_matches``
+    merges them as the chord callback and writes the final Match rows.
+    The TF-IDF statistics are frozen into a snapshot file first and every
+    shard scores with that exact snapshot, so all shard scores share one
+    scale even if the live statistics change meanwhile.
+    
+    Args:
+        job_id: ID of the job to match candidates against
+        shards: Number of id-range shards (defaults to $MATCH_SHARDS)
+        top_k: Matches kept per shard and overall (defaults to $MATCH_TOP_K)
+        
+    Returns:
+        Dict with the dispatched shard ranges and the chord id
+    """
+    job = Job.query.get(job_id)
+    if not job:
+        logger.error(f"Job {job_id} not found")
+        return {"error": "Job not found", "job_id": job_id}
+    
+    low, high = (
+        Candidate.query
+        .with_entities(func.min(Candidate.id), func.max(Candidate.id))
+        .filter(Candidate.is_active.is_(True))
+        .one()
+    )
+    if low is None:
+        logger.warning(f"No active candidates for job {job_id}")
+        return {"message": "No candidates available", "matches": []}
+    
+    # Fit shared statistics up front, then pin the shards to one snapshot
+    vectorizer = _fitted_vectorizer(_combine_text(job.description, job.requirements), CANDIDATE_CHUNK_SIZE)
+    snapshot_path = os.path.join(VECTORIZER_SNAPSHOT_DIR, f"job-{job_id}-{uuid.uuid4().hex}.npz")
+    vectorizer.save(snapshot_path)
+    
+    ranges = _shard_ranges(low, high, shards)
+    result = chord(
+        group(match_shard.s(job_id, after_id, until_id, top_k, snapshot_path=snapshot_path)
+              for after_id, until_id in ranges)
+    )(reduce_shard_matches.s(job_id, top_k, snapshot_path=snapshot_path))
+    
+    logger.info(f"Dispatched {len(ranges)} matching shards for job {job_id}")
+    return {"job_id": job_id, "shards": ranges, "chord_id": result.id, "snapshot": snapshot_path}
+
+
+@shared_task
+def match_shard(job_id: int, after_id: int, until_id: int, top_k: int = MATCH_TOP_K,
+                chunk_size: int = CANDIDATE_CHUNK_SIZE, *, snapshot_path: str) -> Dict[str, Any]:
+    """
+    Score candidates with ``after_id < id <= until_id`` and keep a local top-K.
+    
+    Args:
+        snapshot_path: TF-IDF statistics saved by ``match_candidates_sharded``
+        
+    Returns:
+        Dict with the shard's best candidate ids and scores plus timings
+    """
+    started = time.perf_counter()
+    job = Job.query.get(job_id)
+    vectorizer = CorpusVectorizer.load(snapshot_path)
+    if not vectorizer.is_fitted:
+        raise RuntimeError(f"TF-IDF snapshot {snapshot_path} is not fitted")
+    job_vector = vectorizer.transform([_combine_text(job.description, job.requirements)])
+    
+    best_ids = np.empty(0, dtype=np.int64)
+    best_scores = np.empty(0, dtype=np.float64)
+    scored = 0
+    for chunk in _iter_candidate_chunks(chunk_size, after_id, until_id):
+        candidate_ids = np.fromiter((candidate_id for candidate_id, _, _ in chunk), dtype=np.int64)
+        similarities = _cosine_scores(
+            vectorizer.transform([_combine_text(skills, experience) for _, skills, experience in chunk]),
+            job_vector,
+        )
+        best_ids, best_scores = _merge_top_k(
+            np.concatenate([best_ids, candidate_ids]),
+            np.concatenate([best_scores, similarities]),
+            top_k,
+        )
+        scored += len(chunk)
+    
+    return {
+        "after_id": after_id,
+        "until_id": until_id,
+        "candidate_ids": best_ids.tolist(),
+        "scores": best_scores.tolist(),
+        "candidates_scored": scored,
+        "seconds": round(time.perf_counter() - started, 3),
+    }
+
+
+@shared_task
+def reduce_shard_matches(shard_results: List[Dict[str, Any]], job_id: int,
+                         top_k: int = MATCH_TOP_K, snapshot_path: str = None) -> Dict[str, Any]:
+    """
+    Merge shard top-Ks into the global top-K and upsert the Match rows.
+    
+    Returns:
+        Dict with matches created and a per-shard timing report
+    """
+    candidate_ids, scores = _merge_top_k(
+        np.array([cid for result in shard_results for cid in result["candidate_ids"]], dtype=np.int64),
+        np.array([score for result in shard_results for score in result["scores"]], dtype=np.float64),
+        top_k,
+    )
+    
+    from app import db
+    upsert_matches(db.session, _match_rows(job_id, zip(candidate_ids.tolist(), scores.tolist())), Match)
+    db.session.commit()
+    get_match_matrix().invalidate('job', job_id)
+    if snapshot_path and os.path.exists(snapshot_path):
+        os.remove(snapshot_path)
+    
+    shard_report = [
+        {
+            "range": [result["after_id"], result["until_id"]],
+            "candidates_scored": result["candidates_scored"],
+            "seconds": result["seconds"],
+        }
+        for result in shard_results
+    ]
+    slowest = max((shard["seconds"] for shard in shard_report), default=0.0)
+    log_service_operation(
+        service="matching",
+        operation="match_candidates_sharded",
+        status="success",
+        duration=slowest,
+        metadata={"job_id": job_id, "matches_created": len(candidate_ids), "shards": shard_report}
+    )
+    
+    logger.info(f"Merged {len(shard_results)} shards into {len(candidate_ids)} matches for job {job_id}")
+    return {
+        "job_id": job_id,
+        "matches_created": len(candidate_ids),
+        "candidates_scored": sum(shard["candidates_scored"] for shard in shard_report),
+        "slowest_shard_seconds": slowest,
+        "shards": shard_report,
+    }
+
+
+@shared_task(bind=True, max_retries=3, default_retry_delay=30)
+def rematch_resume(self, resume_id: int, created: bool = False,
+                   previous_text: Optional[str] = None) -> Dict[str, Any]:
+    """Re-score one created/updated resume against all jobs and upsert its matches."""
+    from app import db
+    matcher = None
+    try:
+        matcher = IncrementalMatcher(db.session)
+        stats = matcher.on_resume_changed(resume_id, created, previous_text)
+        get_match_matrix().invalidate('resume', resume_id)
+        logger.info(f"Re-matched resume {resume_id}: {stats}")
+        return {"resume_id": resume_id, **stats}
+    except Exception as exc:
+        db.session.rollback()
+        logger.error(f"Error re-matching resume {resume_id}: {exc}")
+        raise _retry_rematch(self, exc, matcher, (resume_id, created, previous_text))
+
+
+@shared_task(bind=True, max_retries=3, default_retry_delay=30)
+def rematch_job(self, job_id: int, created: bool = False,
+                previous_text: Optional[str] = None) -> Dict[str, Any]:
+    """Re-score one created/updated job against all resumes and upsert its matches."""
+    from app import db
+    matcher = None
+    try:
+        matcher = IncrementalMatcher(db.session)
+        stats = matcher.on_job_changed(job_id, created, previous_text)
+        get_match_matrix().invalidate('job', job_id)
+        logger.info(f"Re-matched job {job_id}: {stats}")
+        return {"job_id": job_id, **stats}
+    except Exception as exc:
+        db.session.rollback()
+        logger.error(f"Error re-matching job {job_id}: {exc}")
+        raise _retry_rematch(self, exc, matcher, (job_id, created, previous_text))
+
+
+@shared_task(bind=True, max_retries=3, default_retry_delay=30)
+def unmatch_resume(self, resume_id: int, previous_text: Optional[str] = None) -> Dict[str, Any]:
+    """Remove a deleted resume's matches and its text from the corpus statistics."""
+    from app import db
+    matcher = None
+    try:
+        matcher = IncrementalMatcher(db.session)
+        stats = matcher.on_resume_deleted(resume_id, previous_text)
+        get_match_matrix().invalidate('resume', resume_id)
+        logger.info(f"Removed matches for deleted resume {resume_id}: {stats}")
+        return {"resume_id": resume_id, **stats}
+    except Exception as exc:
+        db.session.rollback()
+        logger.error(f"Error removing matches for resume {resume_id}: {exc}")
+        raise _retry_rematch(self, exc, matcher, (resume_id, previous_text))
+
+
+@shared_task(bind=True, max_retries=3, default_retry_delay=30)
+def unmatch_job(self, job_id: int, previous_text: Optional[str] = None) -> Dict[str, Any]:
+    """Remove a deleted job's matches and its text from the corpus statistics."""
+    from app import db
+    matcher = None
+    try:
+        matcher = IncrementalMatcher(db.session)
+        stats = matcher.on_job_deleted(job_id, previous_text)
+        get_match_matrix().invalidate('job', job_id)
+        logger.info(f"Removed matches for deleted job {job_id}: {stats}")
+        return {"job_id": job_id, **stats}
+    except Exception as exc:
+        db.session.rollback()
+        logger.error(f"Error removing matches for job {job_id}: {exc}")
+        raise _retry_rematch(self, exc, matcher, (job_id, previous_text))
+
+
+def _retry_rematch(task, exc: Exception, matcher: Optional[IncrementalMatcher], args: Tuple):
+    """Retry a re-match task without counting its corpus change twice"""
+    if matcher is not None and matcher.statistics_updated:
+        # Statistics already include this change; retry with only the id
+        args = args[:1]
+    return task.retry(exc=exc, args=args, kwargs={})
+
+
+@shared_task
+def rebuild_match_matrix(top_k: int = 100, keep_snapshots: int = 2) -> Dict[str, Any]:
+    """Materialise the matches table into a new top-K snapshot and swap it in."""
+    from app import db
+    store = get_match_matrix()
+    started = time.perf_counter()
+    directory = store.build_from_db(db.session, top_k=top_k)
+    store.prune(keep=keep_snapshots)
+    duration = time.perf_counter() - started
+    logger.info(f"Rebuilt match matrix snapshot {directory} in {duration:.2f}s")
+    return {"snapshot": directory, "duration": round(duration, 3)}
+
+
+@shared_task
+def rebuild_vector_indexes(chunk_size: int = CANDIDATE_CHUNK_SIZE) -> Dict[str, Any]:
+    """Re-embed every resume and job into fresh indexes under VECTOR_INDEX_DIR."""
+    from app.models import Job, Resume
+    from services.embedding_service import EmbeddingService
+    
+    if not os.getenv('VECTOR_INDEX_DIR'):
+        logger.warning("VECTOR_INDEX_DIR is not set; skipping vector index rebuild")
+        return {"skipped": True}
+    started = time.perf_counter()
+    counts = EmbeddingService().rebuild_indexes(
+        _iter_document_chunks(Resume, RESUME_TEXT_FIELDS, chunk_size),
+        _iter_document_chunks(Job, JOB_TEXT_FIELDS, chunk_size),
+    )
+    duration = time.perf_counter() - started
+    logger.info(f"Rebuilt vector indexes {counts} in {duration:.2f}s")
+    return {**counts, "duration": round(duration, 3)}
+
+
+_rematch_hooks_installed = False
+
+
+def install_rematch_hooks() -> None:
+    """Queue re-match / unmatch tasks whenever a commit touches a Resume or Job."""
+    global _rematch_hooks_installed
+    if _rematch_hooks_installed:
+        return
+    install_change_hooks(
+        Session,
+        on_resume=rematch_resume.delay,
+        on_job=rematch_job.delay,
+        on_resume_deleted=unmatch_resume.delay,
+        on_job_deleted=unmatch_job.delay,
+    )
+    _rematch_hooks_installed = True
+
 
+def _shard_ranges(low: int, high: int, shards: int) -> List[Tuple[int, int]]:
+    """Split ids ``low..high`` into at most ``shards`` ``(after_id, until_id]`` ranges"""
+    shards = max(1, min(shards, high - low + 1))
+    bounds = np.linspace(low - 1, high, shards + 1).round().astype(int)
+    return [(int(a), int(b)) for a, b in zip(bounds[:-1], bounds[1:]) if b > a]
 
-def _generate_embedding(text_data: str, additional_data: str = None) -> np.ndarray:
+
+def _match_rows(job_id: int, scored: Iterable[Tuple[int, float]]) -> List[Dict[str, Any]]:
+    """``matches`` rows for ``(candidate_id, score)`` pairs (candidates are resumes)"""
+    created_at = datetime.utcnow()
+    return [
+        {
+            "resume_id": int(candidate_id),
+            "job_id": job_id,
+            "match_score": float(score),
+            "semantic_fit": semantic_fit(float(score)),
+            "created_at": created_at,
+        }
+        for candidate_id, score in scored
+    ]
+
+
+def _merge_top_k(candidate_ids: np.ndarray, scores: np.ndarray,
+                 top_k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Best ``top_k`` candidates at or above the match threshold, best first"""
+    keep = top_k_indices(scores, top_k, min_score=settings.MATCH_THRESHOLD)
+    return candidate_ids[keep], scores[keep]
+
+
+def _fitted_vectorizer(job_text: str, chunk_size: int):
+    vectorizer = get_corpus_vectorizer()
+    if not vectorizer.is_fitted:
+        # First run: fit corpus statistics once and share them from now on.
+        # The lock stops concurrent first runs from each fitting and saving.
+        with file_lock(f"{DEFAULT_VECTORIZER_PATH}.lock"):
+            vectorizer.refresh(DEFAULT_VECTORIZER_PATH)
+            if not vectorizer.is_fitted:
+                for chunk in _iter_candidate_chunks(chunk_size):
+                    vectorizer.partial_fit(_combine_text(skills, experience) for _, skills, experience in chunk)
+                vectorizer.partial_fit([job_text]).save(DEFAULT_VECTORIZER_PATH)
+    return vectorizer
+
+
+def _iter_candidate_chunks(chunk_size: int, after_id: int = 0,
+                           until_id: Optional[int] = None) -> Iterator[List[Tuple[int, Any, Any]]]:
+    """
+    Yield active candidates as ``(id, skills, experience)`` rows in id order.
+    
+    Keyset pagination (``id > last seen id``) keeps every page query cheap
+    regardless of depth; only the columns needed for scoring are loaded.
+    ``until_id`` optionally caps the range (inclusive).
+    """
+    while True:
+        query = (
+            Candidate.query
+            .with_entities(Candidate.id, Candidate.skills, Candidate.experience)
+            .filter(Candidate.is_active.is_(True), Candidate.id > after_id)
+        )
+        if until_id is not None:
+            query = query.filter(Candidate.id <= until_id)
+        chunk = (
+            query
+            .order_by(Candidate.id)
+            .limit(chunk_size)
+            .yield_per(chunk_size)
+            .all()
+        )
+        if not chunk:
+            return
+        yield chunk
+        after_id = chunk[-1][0]
+
+
+def _iter_document_chunks(model, fields, chunk_size: int) -> Iterator[List[Tuple[int, str]]]:
+    """Yield ``(id, text)`` rows of ``model`` in id order, keyset-paginated"""
+    columns = [model.id, *(getattr(model, field) for field in fields)]
+    after_id = 0
+    while True:
+        chunk = model.query.with_entities(*columns).filter(model.id > after_id).order_by(model.id).limit(chunk_size).all()
+        if not chunk:
+            return
+        yield [(row[0], join_text(*row[1:])) for row in chunk]
+        after_id = chunk[-1][0]
+
+
+def _combine_text(text_data: str, additional_data: str = None) -> str:
+    if additional_data:
+        return f"{text_data} {additional_data}"
+    return text_data or ""
+
+
+def _cosine_scores(candidate_matrix: sparse.csr_matrix, job_vector: sparse.csr_matrix) -> np.ndarray:
+    """Cosine similarity of every candidate row to the job (rows are L2-normalised)"""
+    return np.asarray((candidate_matrix @ job_vector.T).todense()).ravel()
+
+
+def _generate_embedding(text_data: str, additional_data: str = None) -> sparse.csr_matrix:
     """
     Generate vector embedding from text data.
-    Uses simple TF-IDF approach as placeholder for advanced embeddings.
+    Uses the shared corpus TF-IDF vectorizer, so every vector lives in the
+    same feature space.
     
     Args:
         text_data: Primary text to embed
         additional_data: Optional secondary text
         
     Returns:
-        Vector embedding as numpy array
+        1 x n_features sparse TF-IDF row
     """
-    try:
-        combined_text = text_data
-        if additional_data:
-            combined_text = f"{text_data} {additional_data}"
-        
-        # Placeholder: in production, use transformers/embeddings service
-        from sklearn.feature_extraction.text import TfidfVectorizer
-        vectorizer = TfidfVectorizer(max_features=100)
-        embedding = vectorizer.fit_transform([combined_text])
-        return embedding.toarray().flatten()
-        
-    except Exception as e:
-        logger.error(f"Error generating embedding: {e}")
-        return np.zeros(100)
+    return get_corpus_vectorizer().transform([_combine_text(text_data, additional_data)])
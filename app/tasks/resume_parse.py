@@ -0,0 +1,128 @@
+"""Resume parsing tasks: one resume per task, or a batch across a process pool."""
+
+import logging
+from typing import Any, Dict, List, Optional
+from celery import shared_task
+from datetime import datetime
+
+from app.config import settings
+from app.models import ParsedResume, ResumeEducation, ResumeSkill
+from app.services.parsing.resume_parser_advanced import ResumeParserAdvanced
+
+logger = logging.getLogger(__name__)
+
+parser = ResumeParserAdvanced()
+
+
+def _save_result(db, resume: ParsedResume, result: Dict[str, Any]) -> Dict[str, Any]:
+    """Store one parse result on its ParsedResume and return its status entry."""
+    ResumeSkill.query.filter_by(resume_id=resume.id).delete()
+    ResumeEducation.query.filter_by(resume_id=resume.id).delete()
+
+    if result['parsing_status'] == 'success':
+        resume.parsing_status = 'completed'
+        resume.error_message = None
+        db.session.add_all([
+            ResumeSkill(resume_id=resume.id, skill_name=skill['name'], skill_category=skill['category'])
+            for skill in result['skills']
+        ])
+        db.session.add_all([
+            ResumeEducation(resume_id=resume.id, degree=entry['type'])
+            for entry in result['education']
+        ])
+    else:
+        resume.parsing_status = 'error'
+        resume.error_message = (result.get('error') or '')[:500]
+    resume.parsing_metadata = result
+    resume.updated_at = datetime.utcnow()
+
+    entry = {'resume_id': resume.id, 'status': resume.parsing_status}
+    if resume.parsing_status == 'completed':
+        entry['skills_count'] = len(result['skills'])
+    else:
+        entry['error'] = resume.error_message
+    return entry
+
+
+@shared_task(bind=True, max_retries=3, default_retry_delay=60)
+def parse_resume_task(self, resume_id: int, resume_text: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Parse one resume and store skills and education.
+
+    Args:
+        resume_id: ParsedResume ID
+        resume_text: Text to parse; defaults to the stored raw_text
+
+    Returns:
+        Status entry for the resume
+    """
+    from app import db
+    try:
+        resume = ParsedResume.query.get(resume_id)
+        if not resume:
+            logger.error(f"Parsed resume {resume_id} not found")
+            return {'resume_id': resume_id, 'status': 'not_found'}
+
+        entry = _save_result(db, resume, parser.parse(resume_text or resume.raw_text or ''))
+        db.session.commit()
+        return entry
+
+    except Exception as exc:
+        logger.error(f"Error parsing resume {resume_id}: {exc}", exc_info=True)
+        db.session.rollback()
+        raise self.retry(exc=exc)
+
+
+@shared_task(bind=True, max_retries=3, default_retry_delay=60)
+def parse_resumes_batch(self, resume_ids: List[int], workers: Optional[int] = None,
+                        chunk_size: int = 32) -> Dict[str, Any]:
+    """
+    Parse a batch of stored resumes with ``ResumeParserAdvanced.parse_many``.
+
+    Texts are loaded in one query and parsed across a process pool; every
+    result is written back and committed together.
+
+    Args:
+        resume_ids: ParsedResume IDs
+        workers: Worker processes (defaults to ``settings.PARSE_TASK_WORKERS``)
+        chunk_size: Documents sent to a worker per dispatch
+
+    Returns:
+        Dict with counts and one status entry per id, in input order
+    """
+    from app import db
+    if workers is None:
+        workers = settings.PARSE_TASK_WORKERS
+    try:
+        start_time = datetime.utcnow()
+
+        resumes = {r.id: r for r in ParsedResume.query.filter(ParsedResume.id.in_(resume_ids)).all()}
+        found_ids = [resume_id for resume_id in resume_ids if resume_id in resumes]
+        parsed = dict(zip(found_ids, parser.parse_many(
+            [resumes[resume_id].raw_text or '' for resume_id in found_ids],
+            workers=workers, chunk_size=chunk_size)))
+
+        results = []
+        for resume_id in resume_ids:
+            if resume_id not in resumes:
+                results.append({'resume_id': resume_id, 'status': 'not_found'})
+            else:
+                results.append(_save_result(db, resumes[resume_id], parsed[resume_id]))
+        db.session.commit()
+
+        completed = sum(1 for r in results if r['status'] == 'completed')
+        duration = (datetime.utcnow() - start_time).total_seconds()
+        logger.info(f"Parsed batch of {len(resume_ids)} resumes in {duration:.2f}s: {completed} completed")
+
+        return {
+            'total': len(resume_ids),
+            'completed': completed,
+            'failed': len(results) - completed,
+            'duration_seconds': duration,
+            'results': results,
+        }
+
+    except Exception as exc:
+        logger.error(f"Error parsing resume batch: {exc}", exc_info=True)
+        db.session.rollback()
+        raise self.retry(exc=exc)
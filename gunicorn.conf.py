@@ -0,0 +1,43 @@
+import os
+import sys
+
+# Worker classes that monkey-patch the stdlib must import the app after the
+# patch, i.e. inside the worker, so they never preload
+GREEN_WORKERS = {'gevent', 'eventlet', 'gunicorn.workers.ggevent.GeventWorker',
+                 'gunicorn.workers.geventlet.EventletWorker'}
+
+
+def _worker_class():
+    args = sys.argv[1:] + os.getenv('GUNICORN_CMD_ARGS', '').split()
+    for i, arg in enumerate(args):
+        if arg in ('-k', '--worker-class') and i + 1 < len(args):
+            return args[i + 1]
+        if arg.startswith('--worker-class='):
+            return arg.split('=', 1)[1]
+    return 'sync'
+
+
+# Import app.py once in the master so models listed in PRELOAD_MODELS are
+# loaded before fork and shared copy-on-write by every worker.
+# PRELOAD_APP=false turns it off.
+preload_app = (os.getenv('PRELOAD_APP', 'true').lower() == 'true'
+               and _worker_class() not in GREEN_WORKERS)
+
+
+def post_fork(server, worker):
+    """Drop connections inherited from the master so workers never share sockets"""
+    application = sys.modules.get('app')
+    if application is None:
+        return
+
+    db = getattr(application, 'db', None)
+    flask_app = getattr(application, 'app', None)
+    if db is not None and flask_app is not None:
+        with flask_app.app_context():
+            # close=False: leave the master's sockets alone, just forget them here
+            db.engine.dispose(close=False)
+
+    # CacheService's client is also the single-flight lock backend's client
+    cache_service = getattr(application, 'cache_service', None)
+    if cache_service is not None:
+        cache_service.redis.connection_pool.reset()
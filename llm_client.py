@@ -1,20 +1,51 @@
 # llm_client.py
 import os
 import json
-from typing import Dict, Any
+import random
+import asyncio
+from typing import Dict, Any, List, Optional, Sequence, Union
 import requests
+import httpx
+
+from services.llm_cache import LLMResponseCache, get_llm_cache
+
+# Статусы, при которых запрос имеет смысл повторить
+RETRY_STATUSES = {429, 500, 502, 503, 504}
 
 
 class LLMClient:
     """Клиент для анализа резюме через ProxyAPI с поддержкой OpenAI API."""
     
-    def __init__(self) -> None:
+    def __init__(self, max_retries: int = 4, backoff_base: float = 0.5, backoff_max: float = 20.0,
+                 timeout: float = 60.0, cache: Optional[LLMResponseCache] = None,
+                 use_cache: bool = True) -> None:
         self.base_url = os.getenv("PROXY_API_BASE_URL", "https://api.proxyapi.ru/openai/v1")
         self.api_key = os.getenv("PROXY_API_KEY")
         self.model = os.getenv("LLM_MODEL", "gpt-4o-mini")
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.timeout = timeout
+        # Повторный анализ того же резюме берётся из кэша, без токенов и сети
+        self.cache = (cache or get_llm_cache()) if use_cache else None
         
         if not self.api_key:
             raise RuntimeError("PROXY_API_KEY is not set in environment variables")
+        
+        # Одна сессия на клиента: keep-alive вместо нового TCP/TLS на каждый запрос
+        self.session = requests.Session()
+        self.session.headers.update(self._headers())
+
+    @property
+    def worst_case_seconds(self) -> float:
+        """Верхняя граница одного вызова: все попытки по таймауту плюс паузы между ними"""
+        return (self.max_retries + 1) * self.timeout + self.max_retries * self.backoff_max
+
+    def _headers(self) -> Dict[str, str]:
+        return {
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json",
+        }
 
     def analyze_resume(self, raw_text: str) -> Dict[str, Any]:
         """
@@ -27,15 +58,93 @@ class LLMClient:
             Dict с полями: name, email, phone, skills, experience_years, 
                           education_level, languages, score, summary
         """
-        url = f"{self.base_url}/chat/completions"
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json",
-        }
+        payload = self._resume_payload(raw_text)
+        
+        def call() -> str:
+            try:
+                resp = self.session.post(f"{self.base_url}/chat/completions",
+                                         json=payload, timeout=self.timeout)
+                resp.raise_for_status()
+                return self._message_content(resp.json())
+            except requests.exceptions.RequestException as e:
+                raise RuntimeError(f"ProxyAPI request failed: {e}")
+        
+        if self.cache is None:
+            return self._parse_json(call())
+        return self._parse_json(self.cache.get_or_call(*self._cache_key(payload), call,
+                                                       validate=self._parse_json))
+
+    async def analyze_resumes(self, texts: Sequence[str], concurrency: int = 8
+                              ) -> List[Union[Dict[str, Any], Exception]]:
+        """
+        Асинхронный пакетный анализ резюме.
         
+        Запросы идут через один пул соединений с keep-alive, одновременно
+        выполняется не более ``concurrency`` запросов; ответы 429/5xx и
+        сетевые ошибки повторяются с экспоненциальной задержкой и jitter.
+        
+        Args:
+            texts: Тексты резюме
+            concurrency: Максимум одновременных запросов
+            
+        Returns:
+            Список в порядке входа: dict с анализом или исключение для
+            резюме, которое не удалось обработать
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+        limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+        async with httpx.AsyncClient(base_url=self.base_url, headers=self._headers(),
+                                     limits=limits, timeout=self.timeout) as client:
+            async def call(payload: Dict[str, Any]) -> str:
+                async with semaphore:
+                    data = await self._post_with_retry(client, payload)
+                return self._message_content(data)
+            
+            async def analyze(raw_text: str) -> Dict[str, Any]:
+                payload = self._resume_payload(raw_text)
+                if self.cache is None:
+                    return self._parse_json(await call(payload))
+                content = await self.cache.aget_or_call(*self._cache_key(payload), lambda: call(payload),
+                                                        validate=self._parse_json)
+                return self._parse_json(content)
+            
+            return await asyncio.gather(*(analyze(text) for text in texts), return_exceptions=True)
+
+    async def _post_with_retry(self, client: httpx.AsyncClient, payload: Dict[str, Any]) -> Dict[str, Any]:
+        attempt = 0
+        while True:
+            retry_after: Optional[float] = None
+            try:
+                resp = await client.post("/chat/completions", json=payload)
+                if resp.status_code not in RETRY_STATUSES:
+                    resp.raise_for_status()
+                    return resp.json()
+                error = RuntimeError(f"ProxyAPI returned HTTP {resp.status_code}")
+                retry_after = self._retry_after(resp)
+            except httpx.HTTPStatusError as e:
+                raise RuntimeError(f"ProxyAPI request failed: {e}")
+            except httpx.TransportError as e:
+                error = RuntimeError(f"ProxyAPI request failed: {e}")
+            
+            if attempt >= self.max_retries:
+                raise error
+            await asyncio.sleep(retry_after if retry_after is not None else self._backoff(attempt))
+            attempt += 1
+
+    def _backoff(self, attempt: int) -> float:
+        # "Full jitter": случайная задержка в пределах экспоненциального окна
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    def _retry_after(self, resp: httpx.Response) -> Optional[float]:
+        try:
+            return min(float(resp.headers["Retry-After"]), self.backoff_max)
+        except (KeyError, ValueError):
+            return None
+
+    def _resume_payload(self, raw_text: str) -> Dict[str, Any]:
         prompt = self._build_prompt(raw_text)
         
-        payload = {
+        return {
             "model": self.model,
             "messages": [
                 {
@@ -50,14 +159,20 @@ class LLMClient:
             "temperature": 0.2,
         }
 
+    @staticmethod
+    def _cache_key(payload: Dict[str, Any]):
+        """(model, system prompt, user prompt, temperature) для кэша ответов."""
+        messages = {m["role"]: m["content"] for m in payload["messages"]}
+        return payload["model"], messages.get("system", ""), messages.get("user", ""), payload["temperature"]
+
+    @staticmethod
+    def _message_content(data: Dict[str, Any]) -> str:
+        return data["choices"][0]["message"]["content"]
+
+    @staticmethod
+    def _parse_json(content: str) -> Dict[str, Any]:
         try:
-            resp = requests.post(url, headers=headers, json=payload, timeout=60)
-            resp.raise_for_status()
-            data = resp.json()
-            content = data["choices"][0]["message"]["content"]
             return json.loads(content)
-        except requests.exceptions.RequestException as e:
-            raise RuntimeError(f"ProxyAPI request failed: {e}")
         except json.JSONDecodeError as e:
             raise RuntimeError(f"LLM returned invalid JSON: {e}")
 
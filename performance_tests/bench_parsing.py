@@ -0,0 +1,144 @@
+"""Micro-benchmark: per-document regex work in resume parsing and job enrichment
+
+"before" replays the old approach: raw pattern strings handed to
+re.search/re.findall with re.IGNORECASE on every call. "after" uses the
+precompiled registry in app.services.parsing.patterns.
+"combined" scans each concern once, with one alternation of
+named groups. It is kept for comparison: CPython's engine tries every
+branch at every position, so on these texts it loses to separate
+literal-prefixed searches.
+
+    python performance_tests/bench_parsing.py [--docs 500] [--purge]
+
+--purge clears the re module cache before every document, mimicking a
+process where other code keeps evicting the parser's patterns.
+"""
+
+import argparse
+import random
+import re
+import time
+
+from app.services.parsing import patterns
+from app.services.parsing.resume_parser_advanced import ResumeParserAdvanced
+
+RESUME_LINES = [
+    "Senior Backend Engineer with 8 years of experience in Python, Django and PostgreSQL.",
+    "Built microservices on Kubernetes and AWS, led a team of five engineers.",
+    "Master of Science in Computer Science, Bachelor of Mathematics.",
+    "Languages: English (C1), Russian (native), German (A2).",
+    "Опыт работы 6 лет, бэкенд-разработка на Go и Python, магистр МГУ.",
+    "Responsible for CI/CD with GitLab, Docker, Nginx and Linux administration.",
+    "Mentored junior developers, ran code reviews and architecture sessions.",
+]
+
+JOB_LINES = [
+    "We are hiring a Senior Python Engineer, 8+ years, fully remote.",
+    "Flexible working hours, health insurance, stock options and annual bonus.",
+    "Salary: $120k - $160k per year, relocation package available.",
+    "Learning budget and conferences, gym membership, parental leave.",
+]
+
+# Most of a real document matches none of the patterns
+FILLER_LINES = [
+    "Worked on the checkout service, improving latency and reliability for millions of users.",
+    "Designed data models, wrote integration tests and documented the public interfaces.",
+    "Collaborated with product and design to ship features every two weeks.",
+    "Отвечал за развитие платформы, проектировал сервисы и проводил код-ревью.",
+]
+
+GROUPS = {
+    'resume': [(patterns.EXPERIENCE, 'first'), (patterns.ROLES, 'first'),
+               (patterns.EDUCATION, 'found'), (patterns.LANGUAGES, 'found')],
+    'job': [(patterns.SENIORITY, 'first'), (patterns.BENEFITS, 'found'), (patterns.SALARY_MIN, 'first')],
+}
+
+
+def make_docs(lines, count, rng, filler_ratio=0.8):
+    docs = []
+    for _ in range(count):
+        n = rng.randint(10, 60)
+        docs.append(' '.join(rng.choice(FILLER_LINES) if rng.random() < filler_ratio else rng.choice(lines)
+                             for _ in range(n)))
+    return docs
+
+
+def before(group, mode, text):
+    """One scan per raw pattern string, as the parsers did"""
+    found = []
+    for label, sources in group.alternatives:
+        for source in sources:
+            if mode == 'first':
+                if re.findall(source, text, re.IGNORECASE):
+                    return label
+            elif re.search(source, text, re.IGNORECASE):
+                found.append(label)
+                break
+    return found or None
+
+
+def after(group, mode, text):
+    if mode == 'first':
+        found = group.first(text)
+        return found[0] if found else None
+    return group.found_ordered(text) or None
+
+
+_combined = {}
+
+
+def combined(group, mode, text):
+    """Every pattern of the concern in one named-group alternation"""
+    pattern, label_of = _combined.get(id(group), (None, None))
+    if pattern is None:
+        parts, label_of = [], {}
+        for i, (label, sources) in enumerate(group.alternatives):
+            for j, source in enumerate(sources):
+                parts.append(f"(?P<p{i}_{j}>{source})")
+                label_of[f"p{i}_{j}"] = label
+        pattern = re.compile('|'.join(parts), group.flags)
+        _combined[id(group)] = (pattern, label_of)
+    labels = {label_of[m.lastgroup] for m in pattern.finditer(text)}
+    if mode == 'first':
+        return next((label for label in group.labels if label in labels), None)
+    return [label for label in group.labels if label in labels] or None
+
+
+def run(fn, docs, groups, purge):
+    started = time.perf_counter()
+    for text in docs:
+        if purge:
+            re.purge()
+        lowered = text.lower()
+        for group, mode in groups:
+            fn(group, mode, lowered)
+    return (time.perf_counter() - started) / len(docs) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--docs', type=int, default=500)
+    parser.add_argument('--purge', action='store_true')
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    corpora = {'resume': make_docs(RESUME_LINES, args.docs, rng), 'job': make_docs(JOB_LINES, args.docs, rng)}
+
+    for name, docs in corpora.items():
+        for text in docs[:50]:
+            assert [before(g, m, text.lower()) for g, m in GROUPS[name]] == \
+                   [after(g, m, text.lower()) for g, m in GROUPS[name]]
+        timings = {fn.__name__: run(fn, docs, GROUPS[name], args.purge) for fn in (before, after, combined)}
+        print(f"{name:7s} regex stages (us/doc): " +
+              '   '.join(f"{label} {us:8.1f}" for label, us in timings.items()) +
+              f"   speedup x{timings['before'] / timings['after']:.1f}")
+
+    resume_parser = ResumeParserAdvanced()
+    started = time.perf_counter()
+    for text in corpora['resume']:
+        resume_parser.parse(text)
+    print(f"full ResumeParserAdvanced.parse: {(time.perf_counter() - started) / args.docs * 1e3:.3f} ms/doc")
+
+
+if __name__ == '__main__':
+    main()
@@ -3,10 +3,16 @@ import os
 from typing import Dict, List
 import asyncio
 
+from services.llm_cache import get_llm_cache
+
 # TITLE: Step 1 - Resume Analysis with AI
 class MisMatchAI:
     """AI Brain for Resume Analysis - Uses Yandex GPT to understand resumes in Russian"""
     
+    # _request_yandex_gpt returns a canned answer until the real API call
+    # lands; caching it would replay the mock after the switch
+    MOCK_RESPONSES = True
+    
     def __init__(self, api_key: str = None):
         """Initialize Yandex GPT client
         
@@ -16,6 +22,7 @@ class MisMatchAI:
         self.api_key = api_key or os.getenv('YANDEX_GPT_API_KEY')
         self.model_id = 'gpt3p'  # Yandex GPT 3 Pro
         self.folder_id = os.getenv('YANDEX_FOLDER_ID')
+        self.cache = get_llm_cache()
         
         if not self.api_key or not self.folder_id:
             print('WARNING: Set YANDEX_GPT_API_KEY and YANDEX_FOLDER_ID env vars')
@@ -76,6 +83,21 @@ Return JSON with these fields:
 """
     
     async def call_yandex_gpt(self, prompt: str) -> str:
+        """Call Yandex GPT API, answering repeated prompts from the response cache"""
+        if self.cache is None or self.MOCK_RESPONSES:
+            return await self._request_yandex_gpt(prompt)
+        # The request sends no temperature, so the key uses the model default (None)
+        return await self.cache.aget_or_call(self.model_id, "", prompt, None,
+                                             lambda: self._request_yandex_gpt(prompt),
+                                             validate=self._validate_response)
+    
+    def _validate_response(self, response: str) -> None:
+        """Raise for answers parse_gpt_response cannot use, so they are never cached"""
+        data = self.parse_gpt_response(response)
+        if 'error' in data:
+            raise ValueError(data['error'])
+    
+    async def _request_yandex_gpt(self, prompt: str) -> str:
         """Call Yandex GPT API (async version)
         
         For now return mock response (will implement real API call)
@@ -104,10 +126,10 @@ Return JSON with these fields:
         """Parse JSON response from Yandex GPT"""
         try:
             # TITLE: This is a MOCK for now - replace with real implementation
-            if '{' in response:
-                response = response.split('{')[1]
-            if response.startswith('json'):
-                response = response[4:]
+            # Cut any markdown fence or prose around the JSON object
+            start, end = response.find('{'), response.rfind('}')
+            if start != -1 and end > start:
+                response = response[start:end + 1]
             
             data = json.loads(response.strip())
             return data
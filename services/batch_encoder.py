@@ -0,0 +1,179 @@
+"""Micro-batching text encoder
+
+Concurrent callers ``submit`` single texts and get futures back. A worker
+thread gathers whatever arrives within a short window (or until the batch
+is full), sorts it by length so each forward pass pads as little as
+possible, and runs one ``encode`` call for the whole batch.
+
+``encode_corpus`` is the offline counterpart: it splits a large corpus
+into chunks and encodes them across a process pool that is kept for the
+life of the process (see ``utils.process_pool``).
+"""
+import logging
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from services.model_registry import get_model
+from utils.process_pool import can_start_workers, pool_map
+
+logger = logging.getLogger(__name__)
+
+EncodeFn = Callable[[List[str]], np.ndarray]
+
+
+def encode_sorted(encode: EncodeFn, texts: Sequence[str]) -> np.ndarray:
+    """Encode ``texts`` in length order and return rows in input order"""
+    order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+    encoded = np.asarray(encode([texts[i] for i in order]))
+    result = np.empty_like(encoded)
+    result[order] = encoded
+    return result
+
+
+def _set_torch_threads(num_threads: Optional[int]) -> None:
+    if not num_threads:
+        return
+    try:
+        import torch
+        torch.set_num_threads(num_threads)
+    except ImportError:
+        pass
+
+
+class BatchEncoder:
+    """Collects texts from concurrent requests into shared encode calls"""
+
+    def __init__(self, encode_fn: Optional[EncodeFn] = None, model_name: Optional[str] = None,
+                 max_batch_size: int = 64, max_wait_ms: float = 5.0,
+                 num_threads: Optional[int] = None):
+        if encode_fn is None and model_name is None:
+            raise ValueError("Either encode_fn or model_name is required")
+        self.model_name = model_name
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.num_threads = num_threads
+        self._encode_fn = encode_fn
+
+        self._queue: 'queue.Queue' = queue.Queue()
+        self._worker: Optional[threading.Thread] = None
+        self._worker_pid: Optional[int] = None
+        self._lock = threading.Lock()
+        self.stats = {'batches': 0, 'texts': 0, 'max_batch': 0}
+
+    def _encode(self, texts: List[str]) -> np.ndarray:
+        if self._encode_fn is not None:
+            return self._encode_fn(texts)
+        return get_model(self.model_name).encode(texts, batch_size=self.max_batch_size)
+
+    def _ensure_worker(self) -> None:
+        # Threads do not survive fork, so a forked worker starts its own
+        if self._worker is not None and self._worker_pid == os.getpid() and self._worker.is_alive():
+            return
+        with self._lock:
+            if self._worker is not None and self._worker_pid == os.getpid() and self._worker.is_alive():
+                return
+            self._queue = queue.Queue()
+            self._worker = threading.Thread(target=self._run, name='batch-encoder', daemon=True)
+            self._worker_pid = os.getpid()
+            self._worker.start()
+
+    def submit(self, text: str) -> Future:
+        """Queue one text; the future resolves to its embedding vector"""
+        self._ensure_worker()
+        future: Future = Future()
+        self._queue.put((text, future))
+        return future
+
+    def encode(self, texts: Sequence[str]) -> np.ndarray:
+        """Blocking helper: submit every text and gather results in order"""
+        futures = [self.submit(text) for text in texts]
+        return np.stack([future.result() for future in futures]) if futures else np.empty((0, 0))
+
+    def close(self) -> None:
+        if self._worker is not None and self._worker.is_alive():
+            self._queue.put(None)
+            self._worker.join()
+        self._worker = None
+
+    def _run(self) -> None:
+        _set_torch_threads(self.num_threads)
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            batch = [item]
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is None:
+                    self._flush(batch)
+                    return
+                batch.append(item)
+            self._flush(batch)
+
+    def _flush(self, batch: List) -> None:
+        texts = [text for text, _ in batch]
+        try:
+            vectors = encode_sorted(self._encode, texts)
+        except Exception as exc:
+            logger.error(f"Batch encode of {len(texts)} texts failed: {exc}")
+            for _, future in batch:
+                future.set_exception(exc)
+            return
+
+        self.stats['batches'] += 1
+        self.stats['texts'] += len(texts)
+        self.stats['max_batch'] = max(self.stats['max_batch'], len(texts))
+        for (_, future), vector in zip(batch, vectors):
+            future.set_result(vector)
+
+    def get_stats(self) -> Dict[str, float]:
+        batches = self.stats['batches']
+        return {**self.stats, 'avg_batch': round(self.stats['texts'] / batches, 2) if batches else 0.0}
+
+
+def _encode_chunk(model_name: str, texts: List[str], batch_size: int,
+                  num_threads: Optional[int]) -> np.ndarray:
+    _set_torch_threads(num_threads)
+    model = get_model(model_name)
+    return encode_sorted(lambda chunk: model.encode(chunk, batch_size=batch_size), texts)
+
+
+def encode_corpus(texts: Sequence[str], model_name: str, chunk_size: int = 2048,
+                  processes: Optional[int] = None, batch_size: int = 64,
+                  threads_per_process: Optional[int] = 1) -> np.ndarray:
+    """Encode a large corpus, one chunk per task across a process pool.
+
+    Each worker process loads the model once (via the model registry) and
+    keeps it across calls, since the pool is reused. Chunks are encoded in
+    length order and rows come back in input order. ``processes=1`` encodes
+    in the calling process, as does any call from a daemonic process (e.g.
+    the Celery prefork child running ``rebuild_vector_indexes``).
+    """
+    texts = list(texts)
+    if not texts:
+        return np.empty((0, 0), dtype=np.float32)
+
+    chunks = [texts[i:i + chunk_size] for i in range(0, len(texts), chunk_size)]
+    processes = processes or min(len(chunks), os.cpu_count() or 1)
+    if processes > 1 and not can_start_workers():
+        logger.warning("encode_corpus called from a daemonic process, encoding in-process")
+        processes = 1
+    if processes <= 1 or len(chunks) == 1:
+        return np.vstack([_encode_chunk(model_name, chunk, batch_size, None) for chunk in chunks])
+
+    n = len(chunks)
+    return np.vstack(pool_map('batch_encoder', processes, _encode_chunk, [model_name] * n, chunks,
+                              [batch_size] * n, [threads_per_process] * n))
@@ -1,23 +1,149 @@
-from sentence_transformers import SentenceTransformer
+import os
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
 from sklearn.metrics.pairwise import cosine_similarity
 
+from services.batch_encoder import BatchEncoder, encode_corpus
+from services.embedding_store import EmbeddingStore, get_embedding_store
+from services.model_registry import get_model
+from services.vector_index import VectorIndex
+
+
 class EmbeddingService:
-    def __init__(self):
-        self.model = SentenceTransformer('paraphrase-multilingual-MiniLM-L12-v2')
+    MODEL_NAME = 'paraphrase-multilingual-MiniLM-L12-v2'
+    
+    def __init__(self, index_dir: Optional[str] = None, index_mode: str = 'flat',
+                 store: Optional[EmbeddingStore] = None, max_batch_size: int = 64,
+                 max_wait_ms: float = 5.0, num_threads: Optional[int] = None):
+        self.store = store or get_embedding_store()
+        # Concurrent requests share forward passes through one micro-batcher
+        self.encoder = BatchEncoder(model_name=self.MODEL_NAME, max_batch_size=max_batch_size,
+                                    max_wait_ms=max_wait_ms, num_threads=num_threads)
+        
+        # Resume/job vectors persist under VECTOR_INDEX_DIR; in-memory if unset.
+        # The rebuild_vector_indexes task writes them; web workers reload on change.
+        self.index_dir = index_dir or os.getenv('VECTOR_INDEX_DIR')
+        self.index_mode = index_mode
+        self.resume_index = self._open_index('resumes', index_mode)
+        self.job_index = self._open_index('jobs', index_mode)
+    
+    def _open_index(self, name: str, mode: str) -> VectorIndex:
+        if not self.index_dir:
+            return VectorIndex(mode=mode)
+        return VectorIndex.open(os.path.join(self.index_dir, name), mode=mode)
+    
+    def refresh_indexes(self) -> bool:
+        """Reopen indexes that were saved again (e.g. by another process) since we loaded them.
+        
+        Vectors added locally since then are dropped in favour of the saved index.
+        """
+        if not self.index_dir:
+            return False
+        refreshed = False
+        for name, attr in (('resumes', 'resume_index'), ('jobs', 'job_index')):
+            path = os.path.join(self.index_dir, name)
+            if os.path.lexists(path) and os.path.realpath(path) != getattr(self, attr).source:
+                setattr(self, attr, VectorIndex.load(path))
+                refreshed = True
+        return refreshed
+    
+    def rebuild_indexes(self, resume_chunks: Iterable[Sequence[Tuple[int, str]]],
+                        job_chunks: Iterable[Sequence[Tuple[int, str]]]) -> Dict[str, int]:
+        """Build both indexes from scratch from ``(id, text)`` chunks and save them.
+        
+        Only texts the embedding store has not seen are encoded, so a
+        periodic rebuild costs little more than reading the rows.
+        """
+        indexes = {}
+        for name, chunks in (('resumes', resume_chunks), ('jobs', job_chunks)):
+            index = VectorIndex(mode=self.index_mode)
+            for chunk in chunks:
+                if chunk:
+                    index.add([doc_id for doc_id, _ in chunk], self.encode_corpus([text for _, text in chunk]))
+            indexes[name] = index
+        self.resume_index, self.job_index = indexes['resumes'], indexes['jobs']
+        self.save_indexes()
+        return {name: len(index) for name, index in indexes.items()}
+    
+    @property
+    def model(self):
+        """Shared SentenceTransformer, loaded on first use rather than at import"""
+        return get_model(self.MODEL_NAME)
+    
+    def encode(self, texts: List[str]):
+        """Embeddings for ``texts``; each distinct text is encoded once per model"""
+        return self.store.get_or_encode(texts, self.MODEL_NAME, self.encoder.encode)
+    
+    def encode_corpus(self, texts: List[str], processes: Optional[int] = None,
+                      chunk_size: int = 2048):
+        """Bulk variant of ``encode`` that spreads unseen texts over a process pool"""
+        return self.store.get_or_encode(
+            texts, self.MODEL_NAME,
+            lambda missing: encode_corpus(missing, self.MODEL_NAME, chunk_size=chunk_size,
+                                          processes=processes)
+        )
+    
+    @staticmethod
+    def _describe(similarity: float) -> Dict:
+        return {
+            "match_score": round(similarity * 100),
+            "semantic_fit": "high" if similarity > 0.7 else "medium" if similarity > 0.5 else "low",
+            "confidence": round(similarity * 100)
+        }
     
     def match_resume_to_job(self, resume_text, job_description):
         """Match with semantic understanding, not just keywords"""
         
-        resume_embedding = self.model.encode(resume_text)
-        job_embedding = self.model.encode(job_description)
+        resume_embedding, job_embedding = self.encode([resume_text, job_description])
         
         similarity = cosine_similarity(
             [resume_embedding], 
             [job_embedding]
         )[0][0]
         
-        return {
-            "match_score": round(similarity * 100),
-            "semantic_fit": "high" if similarity > 0.7 else "medium" if similarity > 0.5 else "low",
-            "confidence": round(similarity * 100)
-        }
+        return self._describe(similarity)
+    
+    def index_resume(self, resume_id: int, resume_text: str) -> None:
+        """Encode a resume once and store it (replaces any previous vector)"""
+        self.resume_index.add([resume_id], self.encode([resume_text]))
+    
+    def index_resumes(self, resumes: Dict[int, str]) -> None:
+        """Bulk variant of ``index_resume``; encodes all texts in one call"""
+        if resumes:
+            self.resume_index.add(list(resumes), self.encode_corpus(list(resumes.values())))
+    
+    def remove_resume(self, resume_id: int) -> bool:
+        return self.resume_index.remove([resume_id]) > 0
+    
+    def index_job(self, job_id: int, job_description: str) -> None:
+        self.job_index.add([job_id], self.encode([job_description]))
+    
+    def remove_job(self, job_id: int) -> bool:
+        return self.job_index.remove([job_id]) > 0
+    
+    def top_resumes_for_job(self, job_id: Optional[int] = None, job_description: Optional[str] = None,
+                            k: int = 50) -> List[Dict]:
+        """Best-matching indexed resumes for a job with a single index query.
+        
+        Uses the stored job vector when ``job_id`` is indexed, otherwise
+        encodes ``job_description``.
+        """
+        self.refresh_indexes()
+        job_vector = self.job_index.get(job_id) if job_id is not None else None
+        if job_vector is None:
+            if job_description is None:
+                raise ValueError("job_id is not indexed and no job_description was given")
+            job_vector = self.encode([job_description])[0]
+        
+        ids, scores = self.resume_index.search(job_vector, k=k)
+        return [
+            {"resume_id": int(resume_id), **self._describe(float(score))}
+            for resume_id, score in zip(ids, scores)
+        ]
+    
+    def save_indexes(self) -> None:
+        """Persist both indexes to ``index_dir`` (no-op when in-memory)"""
+        if not self.index_dir:
+            return
+        self.resume_index.save(os.path.join(self.index_dir, 'resumes'))
+        self.job_index.save(os.path.join(self.index_dir, 'jobs'))
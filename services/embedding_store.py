@@ -0,0 +1,283 @@
+"""Content-addressed embedding store
+
+Each document is encoded once per model: vectors are keyed by SHA-256 of
+the normalised text plus the model name, kept as float16 rows in a
+memory-mapped file per model, and indexed by an append-only sidecar of
+``key<TAB>row`` lines. A small LRU of float32 vectors serves hot lookups.
+
+Without a directory the store keeps everything in RAM, which is what the
+tests and one-off scripts use. Several processes (e.g. gunicorn workers)
+may share a store directory: appends take an exclusive file lock and first
+catch up on rows other writers published, so rows and ids never collide.
+"""
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import unicodedata
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from utils.file_lock import file_lock
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE = re.compile(r'\s+')
+
+
+def normalize_text(text: str) -> str:
+    """Unicode NFC, collapsed whitespace, trimmed"""
+    return _WHITESPACE.sub(' ', unicodedata.normalize('NFC', text or '')).strip()
+
+
+def content_key(text: str, model_name: str) -> str:
+    payload = f"{model_name}\x00{normalize_text(text)}".encode('utf-8')
+    return hashlib.sha256(payload).hexdigest()
+
+
+class _ModelShelf:
+    """float16 rows for one model, backed by a memmap when a path is given"""
+
+    def __init__(self, path: Optional[str], dim: int, initial_capacity: int = 1024):
+        self.path = path
+        self.dim = dim
+        self.rows: Dict[str, int] = {}
+        self.size = 0
+        self.capacity = 0
+        self.vectors = np.empty((0, dim), dtype=np.float16)
+        # Byte offset of the first ``.ids`` line not yet read
+        self._ids_offset = 0
+
+        if path is None:
+            self._grow(initial_capacity)
+        else:
+            with file_lock(path + '.lock'):
+                self._read_new_ids()
+                self._grow(max(self.size, initial_capacity))
+
+    def _read_new_ids(self) -> bool:
+        """Pick up ``key<TAB>row`` lines appended since the last read.
+
+        A torn last line (crash mid-append) is left unread; the next writer
+        truncates it under the lock before appending.
+        """
+        if self.path is None or not os.path.exists(self.path + '.ids'):
+            return False
+        if os.path.getsize(self.path + '.ids') <= self._ids_offset:
+            return False
+        with open(self.path + '.ids', 'rb') as f:
+            f.seek(self._ids_offset)
+            data = f.read()
+        complete = data[:data.rfind(b'\n') + 1]
+        for line in complete.decode('utf-8').splitlines():
+            parts = line.split('\t')
+            if len(parts) != 2 or not parts[1].isdigit():
+                logger.warning(f"Skipping malformed embedding id line in {self.path}.ids")
+                continue
+            row = int(parts[1])
+            self.rows[parts[0]] = row
+            self.size = max(self.size, row + 1)
+        self._ids_offset += len(complete)
+        if self.size > self.capacity and self.capacity:
+            # Rows past our mapping were appended by another writer
+            self._grow(self.size, resize=False)
+        return bool(complete)
+
+    def _truncate_torn_line(self) -> None:
+        ids_path = self.path + '.ids'
+        if os.path.exists(ids_path) and os.path.getsize(ids_path) > self._ids_offset:
+            with open(ids_path, 'r+b') as f:
+                f.truncate(self._ids_offset)
+
+    def _grow(self, capacity: int, resize: bool = True) -> None:
+        """Map at least ``capacity`` rows; only lock holders may ``resize`` the file"""
+        if capacity <= self.capacity:
+            return
+        if self.path is None:
+            vectors = np.zeros((capacity, self.dim), dtype=np.float16)
+            vectors[:self.size] = self.vectors[:self.size]
+        else:
+            if isinstance(self.vectors, np.memmap):
+                self.vectors.flush()
+            mode = 'r+b' if os.path.exists(self.path + '.f16') else 'w+b'
+            with open(self.path + '.f16', mode) as f:
+                # Another writer may already have grown the file; never shrink it
+                f.seek(0, os.SEEK_END)
+                file_rows = f.tell() // (self.dim * 2)
+                if resize and capacity > file_rows:
+                    f.truncate(capacity * self.dim * 2)
+                    file_rows = capacity
+                capacity = file_rows
+            vectors = np.memmap(self.path + '.f16', dtype=np.float16, mode='r+',
+                                shape=(capacity, self.dim))
+        self.vectors = vectors
+        self.capacity = capacity
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        row = self.rows.get(key)
+        if row is None and self._read_new_ids():
+            row = self.rows.get(key)
+        return None if row is None else self.vectors[row].astype(np.float32)
+
+    def put_many(self, keys: Sequence[str], vectors: np.ndarray) -> None:
+        if self.path is None:
+            self._append(keys, vectors)
+            return
+        with file_lock(self.path + '.lock'):
+            # Rows other processes appended since our last read come first
+            self._read_new_ids()
+            self._truncate_torn_line()
+            self._append(keys, vectors)
+
+    def _append(self, keys: Sequence[str], vectors: np.ndarray) -> None:
+        new, seen = [], set()
+        for i, key in enumerate(keys):
+            if key not in self.rows and key not in seen:
+                new.append(i)
+                seen.add(key)
+        if not new:
+            return
+        if self.size + len(new) > self.capacity:
+            self._grow(max(self.size + len(new), 2 * self.capacity))
+
+        rows = range(self.size, self.size + len(new))
+        self.vectors[self.size:self.size + len(new)] = vectors[new].astype(np.float16)
+        self.size += len(new)
+        entries = [(keys[i], row) for i, row in zip(new, rows)]
+        self.rows.update(entries)
+
+        if self.path is not None:
+            # Vectors hit the file before their ids are published
+            self.vectors.flush()
+            payload = ''.join(f"{key}\t{row}\n" for key, row in entries).encode('utf-8')
+            with open(self.path + '.ids', 'ab') as f:
+                f.write(payload)
+            self._ids_offset += len(payload)
+
+
+class EmbeddingStore:
+    """Memoises embeddings by content hash and model name"""
+
+    def __init__(self, directory: Optional[str] = None, hot_size: int = 10_000,
+                 initial_capacity: int = 1024):
+        self.directory = directory
+        self.hot_size = hot_size
+        self.initial_capacity = initial_capacity
+        self._shelves: Dict[str, _ModelShelf] = {}
+        self._hot: 'OrderedDict[str, np.ndarray]' = OrderedDict()
+        self._lock = threading.RLock()
+        self.stats = {'hot_hits': 0, 'store_hits': 0, 'misses': 0}
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def _file_stem(model_name: str) -> str:
+        return re.sub(r'[^A-Za-z0-9_.-]', '_', model_name)
+
+    def _shelf(self, model_name: str, dim: Optional[int] = None) -> Optional[_ModelShelf]:
+        shelf = self._shelves.get(model_name)
+        if shelf is not None:
+            return shelf
+
+        path = os.path.join(self.directory, self._file_stem(model_name)) if self.directory else None
+        if path and os.path.exists(path + '.json'):
+            with open(path + '.json') as f:
+                dim = json.load(f)['dim']
+        if dim is None:
+            return None
+        if path and not os.path.exists(path + '.json'):
+            with open(path + '.json', 'w') as f:
+                json.dump({'model': model_name, 'dim': dim, 'dtype': 'float16'}, f)
+
+        shelf = _ModelShelf(path, dim, self.initial_capacity)
+        self._shelves[model_name] = shelf
+        return shelf
+
+    def _remember(self, key: str, vector: np.ndarray) -> None:
+        self._hot[key] = vector
+        self._hot.move_to_end(key)
+        while len(self._hot) > self.hot_size:
+            self._hot.popitem(last=False)
+
+    def get(self, text: str, model_name: str) -> Optional[np.ndarray]:
+        """Stored float32 vector for ``text`` under ``model_name``, or None"""
+        return self._get(content_key(text, model_name), model_name)
+
+    def _get(self, key: str, model_name: str) -> Optional[np.ndarray]:
+        with self._lock:
+            vector = self._hot.get(key)
+            if vector is not None:
+                self._hot.move_to_end(key)
+                self.stats['hot_hits'] += 1
+                return vector
+            shelf = self._shelf(model_name)
+            vector = shelf.get(key) if shelf is not None else None
+            if vector is None:
+                self.stats['misses'] += 1
+                return None
+            self.stats['store_hits'] += 1
+            self._remember(key, vector)
+            return vector
+
+    def put_many(self, texts: Sequence[str], model_name: str, vectors: np.ndarray) -> None:
+        self._put([content_key(text, model_name) for text in texts], model_name, vectors)
+
+    def _put(self, keys: Sequence[str], model_name: str, vectors: np.ndarray) -> None:
+        vectors = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+        with self._lock:
+            self._shelf(model_name, vectors.shape[1]).put_many(keys, vectors)
+            for key, vector in zip(keys, vectors):
+                self._remember(key, vector)
+
+    def get_or_encode(self, texts: Sequence[str], model_name: str,
+                      encode: Callable[[List[str]], np.ndarray]) -> np.ndarray:
+        """Vectors for ``texts`` (float32, input order), encoding only unseen texts.
+
+        ``encode`` is called at most once, with the distinct missing texts.
+        """
+        texts = list(texts)
+        keys = [content_key(text, model_name) for text in texts]
+        found: Dict[str, np.ndarray] = {}
+        missing: Dict[str, str] = {}
+        for key, text in zip(keys, texts):
+            if key in found or key in missing:
+                continue
+            vector = self._get(key, model_name)
+            if vector is None:
+                missing[key] = text
+            else:
+                found[key] = vector
+
+        if missing:
+            encoded = np.atleast_2d(np.asarray(encode(list(missing.values())), dtype=np.float32))
+            self._put(list(missing), model_name, encoded)
+            found.update(zip(missing.keys(), encoded))
+
+        if not texts:
+            return np.empty((0, 0), dtype=np.float32)
+        return np.stack([found[key] for key in keys])
+
+    def get_stats(self) -> Dict[str, object]:
+        with self._lock:
+            return {
+                **self.stats,
+                'hot_entries': len(self._hot),
+                'models': {name: shelf.size for name, shelf in self._shelves.items()},
+            }
+
+
+_default_store: Optional[EmbeddingStore] = None
+_default_lock = threading.Lock()
+
+
+def get_embedding_store() -> EmbeddingStore:
+    """Process-wide store rooted at EMBEDDING_STORE_DIR (in-memory if unset)"""
+    global _default_store
+    with _default_lock:
+        if _default_store is None:
+            _default_store = EmbeddingStore(os.getenv('EMBEDDING_STORE_DIR'))
+        return _default_store
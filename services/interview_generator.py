@@ -3,15 +3,21 @@ import json
 import os
 from openai import OpenAI
 
+from services.llm_cache import get_llm_cache
+
 class InterviewGenerator:
     """Generate personalized interview questions using GPT-4o-mini"""
     
+    MODEL = "gpt-4o-mini"
+    TEMPERATURE = 0.7
+    
     def __init__(self):
         """Initialize OpenAI client"""
         api_key = os.getenv('OPENAI_API_KEY')
         if not api_key:
             raise ValueError("OPENAI_API_KEY not set in environment")
         self.client = OpenAI(api_key=api_key)
+        self.cache = get_llm_cache()
     
     def generate_questions(self, resume_data, job_description):
         """Generate 10 personalized interview questions
@@ -44,16 +50,24 @@ class InterviewGenerator:
         Return ONLY valid JSON, no other text.
         """
         
-        try:
+        def call():
             response = self.client.chat.completions.create(
-                model="gpt-4o-mini",
+                model=self.MODEL,
                 messages=[{"role": "user", "content": prompt}],
-                temperature=0.7,
+                temperature=self.TEMPERATURE,
                 max_tokens=2000
             )
+            return response.choices[0].message.content
+        
+        try:
+            # Same resume + job -> same prompt -> cached questions, no API call
+            if self.cache is None:
+                response_text = call()
+            else:
+                response_text = self.cache.get_or_call(self.MODEL, "", prompt, self.TEMPERATURE, call,
+                                                       validate=json.loads)
             
             # Parse JSON response
-            response_text = response.choices[0].message.content
             questions = json.loads(response_text)
             
             return {
@@ -1,9 +1,9 @@
 """Сервис обогащения описаний вакансий."""
 
-import re
 from typing import Dict, Any, List
 from datetime import datetime
 from app.logger import get_logger
+from app.services.parsing import patterns
 from app.services.parsing.skill_extractor import SkillExtractor
 
 logger = get_logger("job_enrichment")
@@ -71,37 +71,8 @@ class JobEnrichmentService:
     
     def _identify_seniority(self, text: str) -> str:
         """Определить уровень senior'ти."""
-        seniority_patterns = {
-            'lead': [
-                r'(?:lead|principal|architect|staff)',
-                r'(?:team lead|tech lead)',
-                r'(?:10\+|15\+|20\+)\s*(?:years?|yrs?)',
-            ],
-            'senior': [
-                r'(?:senior|старший)',
-                r'(?:8\+|9\+|10\+)\s*(?:years?|yrs?)',
-                r'(?:опыт от 8|опыт от 10)',
-            ],
-            'mid': [
-                r'(?:middle|mid|intermediate)',
-                r'(?:3\+|4\+|5\+|6\+|7\+)\s*(?:years?|yrs?)',
-                r'(?:опыт от 3|опыт от 5)',
-            ],
-            'junior': [
-                r'(?:junior|начинающ|entry.?level)',
-                r'(?:0\+|1\+|2\+)\s*(?:years?|yrs?)',
-            ],
-        }
-        
-        text_lower = text.lower()
-        
-        for level in ['lead', 'senior', 'mid', 'junior']:
-            patterns = seniority_patterns[level]
-            for pattern in patterns:
-                if re.search(pattern, text_lower, re.IGNORECASE):
-                    return level
-        
-        return 'mid'
+        found = patterns.SENIORITY.first(text.lower())
+        return found[0] if found else 'mid'
     
     def _calculate_difficulty(self, requirements: str) -> float:
         """
@@ -142,91 +113,22 @@ class JobEnrichmentService:
     
     def _extract_benefits(self, text: str) -> List[str]:
         """Извлечь предлагаемые бенефиты."""
-        benefits_patterns = {
-            'remote': [
-                r'(?:remote|работа из дома|work from home)',
-                r'(?:fully remote|100% remote)',
-            ],
-            'flexible_hours': [
-                r'(?:flexible|гибкий)',
-                r'(?:flexible working hours)',
-            ],
-            'relocation': [
-                r'(?:relocation|переезд|relocation package)',
-                r'(?:visa sponsorship)',
-            ],
-            'health_insurance': [
-                r'(?:health insurance|страховка|medical)',
-                r'(?:health benefits)',
-            ],
-            'stock_options': [
-                r'(?:stock options|опционы|equity)',
-                r'(?:stock grants)',
-            ],
-            'unlimited_pto': [
-                r'(?:unlimited pto|unlimited vacation)',
-                r'(?:unlimited time off)',
-            ],
-            'conference_budget': [
-                r'(?:conference|conferences|обучение)',
-                r'(?:professional development)',
-                r'(?:learning budget)',
-            ],
-            'wellness': [
-                r'(?:wellness|gym|fitness)',
-                r'(?:mental health)',
-            ],
-            'parental_leave': [
-                r'(?:parental leave|paternity|maternity)',
-            ],
-            'bonus': [
-                r'(?:bonus|bonuses|performance bonus)',
-                r'(?:annual bonus)',
-            ],
-        }
-        
-        found_benefits = []
-        text_lower = text.lower()
-        
-        for benefit, patterns in benefits_patterns.items():
-            for pattern in patterns:
-                if re.search(pattern, text_lower, re.IGNORECASE):
-                    found_benefits.append(benefit)
-                    break
-        
-        return found_benefits
+        return patterns.BENEFITS.found_ordered(text.lower())
     
     def _extract_salary_min(self, text: str) -> float | None:
         """Извлечь минимальную зарплату."""
-        patterns = [
-            r'\$(\d{3,})\s*(?:k|K|\d{3})?',
-            r'(\d{3,})\s*(?:usd|USD)',
-            r'from\s*\$(\d{3,})',
-        ]
-        
-        for pattern in patterns:
-            matches = re.findall(pattern, text, re.IGNORECASE)
-            if matches:
-                try:
-                    salary = int(matches[0])
-                    if salary < 1000:
-                        salary = salary * 1000
-                    return float(salary)
-                except (ValueError, IndexError):
-                    continue
-        
-        return None
+        found = patterns.SALARY_MIN.first(text)
+        if found is None:
+            return None
+        salary = int(patterns.SALARY_MIN.value(found[1]))
+        if salary < 1000:
+            salary = salary * 1000
+        return float(salary)
     
     def _extract_salary_max(self, text: str) -> float | None:
         """Извлечь максимальную зарплату."""
-        patterns = [
-            r'(\d{3,})\s*(?:k|K)\s*$',
-            r'to\s*\$(\d{3,})',
-            r'-\s*\$(\d{3,})',
-        ]
-        
-        for pattern in patterns:
-            matches = re.findall(pattern, text, re.IGNORECASE)
+        for pattern in patterns.SALARY_MAX:
+            matches = pattern.findall(text)
             if matches:
                 try:
                     salary = int(matches[-1])
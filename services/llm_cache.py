@@ -0,0 +1,220 @@
+"""Disk-backed cache of LLM responses
+
+Responses are keyed by (model, system prompt, user prompt hash,
+temperature) and stored in SQLite, so re-analysing the same resume or
+re-generating the same questions costs no tokens and no network round
+trip. Entries expire after a TTL, the table is capped by evicting the
+least recently used rows, and hit/miss counters are kept per process.
+
+Reads run on per-thread WAL connections without the write lock; only
+writes (inserts, expiry deletes, last-access touches) are serialized.
+"""
+import asyncio
+import hashlib
+import contextlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_PATH = os.getenv('LLM_CACHE_PATH', 'instance/llm_cache.sqlite3')
+
+
+def _sha256(text: str) -> str:
+    return hashlib.sha256((text or '').encode('utf-8')).hexdigest()
+
+
+class LLMResponseCache:
+    """SQLite response cache with TTL, LRU size cap and stats"""
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, ttl_seconds: float = 30 * 24 * 3600,
+                 max_entries: int = 100_000, cap_check_interval: int = 100,
+                 touch_interval: float = 60.0):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        # COUNT(*) scans the table, so the cap is enforced every N writes
+        self.cap_check_interval = max(1, cap_check_interval)
+        # A hit rewrites last_access only once it is this stale, so hot
+        # entries are served without taking the write lock
+        self.touch_interval = touch_interval
+        self.stats = {'hits': 0, 'misses': 0, 'expired': 0, 'evictions': 0, 'writes': 0}
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+
+        if path != ':memory:':
+            os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self._shared_conn = sqlite3.connect(path, check_same_thread=False) if path == ':memory:' else None
+        # The in-memory database has a single connection, so reads must queue too
+        self._read_lock = self._write_lock if self._shared_conn is not None else contextlib.nullcontext()
+        with self._write_lock:
+            conn = self._conn()
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS llm_responses ("
+                " key TEXT PRIMARY KEY, model TEXT, prompt_hash TEXT, temperature REAL,"
+                " response TEXT NOT NULL, created_at REAL NOT NULL, last_access REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_last_access ON llm_responses (last_access)")
+            conn.commit()
+
+    def _conn(self) -> sqlite3.Connection:
+        if self._shared_conn is not None:
+            return self._shared_conn
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def make_key(model: str, system_prompt: str, user_prompt: str, temperature: Optional[float]) -> str:
+        """``temperature=None`` stands for the provider's default"""
+        if temperature is not None:
+            temperature = round(float(temperature), 4)
+        return _sha256(json.dumps([model, _sha256(system_prompt), _sha256(user_prompt), temperature]))
+
+    def _count(self, *names: str) -> None:
+        with self._stats_lock:
+            for name in names:
+                self.stats[name] += 1
+
+    def get(self, model: str, system_prompt: str, user_prompt: str,
+            temperature: Optional[float]) -> Optional[str]:
+        key = self.make_key(model, system_prompt, user_prompt, temperature)
+        now = time.time()
+        with self._read_lock:
+            row = self._conn().execute(
+                "SELECT response, created_at, last_access FROM llm_responses WHERE key = ?",
+                (key,)).fetchone()
+        if row is None:
+            self._count('misses')
+            return None
+        response, created_at, last_access = row
+        if self.ttl_seconds and now - created_at > self.ttl_seconds:
+            with self._write_lock:
+                conn = self._conn()
+                # Re-check so a fresh entry written meanwhile is not dropped
+                conn.execute("DELETE FROM llm_responses WHERE key = ? AND created_at = ?", (key, created_at))
+                conn.commit()
+            self._count('expired', 'misses')
+            return None
+        if now - last_access >= self.touch_interval:
+            with self._write_lock:
+                conn = self._conn()
+                conn.execute("UPDATE llm_responses SET last_access = ? WHERE key = ?", (now, key))
+                conn.commit()
+        self._count('hits')
+        return response
+
+    def put(self, model: str, system_prompt: str, user_prompt: str, temperature: Optional[float],
+            response: str) -> None:
+        key = self.make_key(model, system_prompt, user_prompt, temperature)
+        now = time.time()
+        with self._write_lock:
+            conn = self._conn()
+            conn.execute(
+                "INSERT OR REPLACE INTO llm_responses"
+                " (key, model, prompt_hash, temperature, response, created_at, last_access)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, model, _sha256(user_prompt), temperature, response, now, now),
+            )
+            with self._stats_lock:
+                self.stats['writes'] += 1
+                check_cap = self.stats['writes'] % self.cap_check_interval == 0
+            if check_cap:
+                self._enforce_cap(conn)
+            conn.commit()
+
+    def _enforce_cap(self, conn: sqlite3.Connection) -> None:
+        count = conn.execute("SELECT COUNT(*) FROM llm_responses").fetchone()[0]
+        excess = count - self.max_entries
+        if excess > 0:
+            conn.execute(
+                "DELETE FROM llm_responses WHERE key IN"
+                " (SELECT key FROM llm_responses ORDER BY last_access LIMIT ?)",
+                (excess,),
+            )
+            with self._stats_lock:
+                self.stats['evictions'] += excess
+
+    def get_or_call(self, model: str, system_prompt: str, user_prompt: str, temperature: Optional[float],
+                    call: Callable[[], str], validate: Optional[Callable[[str], Any]] = None) -> str:
+        """Cached response, or ``call()``'s result stored if ``validate`` accepts it.
+
+        ``validate`` should raise for responses that must not be cached
+        (e.g. invalid JSON), so a bad answer is never replayed.
+        """
+        cached = self.get(model, system_prompt, user_prompt, temperature)
+        if cached is not None:
+            return cached
+        response = call()
+        if validate is not None:
+            validate(response)
+        self.put(model, system_prompt, user_prompt, temperature, response)
+        return response
+
+    async def aget_or_call(self, model: str, system_prompt: str, user_prompt: str,
+                           temperature: Optional[float], call: Callable[[], Awaitable[str]],
+                           validate: Optional[Callable[[str], Any]] = None) -> str:
+        """Async variant of ``get_or_call``; SQLite I/O runs in a worker thread"""
+        cached = await asyncio.to_thread(self.get, model, system_prompt, user_prompt, temperature)
+        if cached is not None:
+            return cached
+        response = await call()
+        if validate is not None:
+            validate(response)
+        await asyncio.to_thread(self.put, model, system_prompt, user_prompt, temperature, response)
+        return response
+
+    def purge_expired(self) -> int:
+        if not self.ttl_seconds:
+            return 0
+        with self._write_lock:
+            conn = self._conn()
+            removed = conn.execute("DELETE FROM llm_responses WHERE created_at < ?",
+                                   (time.time() - self.ttl_seconds,)).rowcount
+            conn.commit()
+        with self._stats_lock:
+            self.stats['expired'] += removed
+        return removed
+
+    def clear(self) -> None:
+        with self._write_lock:
+            conn = self._conn()
+            conn.execute("DELETE FROM llm_responses")
+            conn.commit()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._read_lock:
+            entries = self._conn().execute("SELECT COUNT(*) FROM llm_responses").fetchone()[0]
+        with self._stats_lock:
+            stats = dict(self.stats)
+        lookups = stats['hits'] + stats['misses']
+        return {
+            **stats,
+            'entries': entries,
+            'hit_rate': round(stats['hits'] / lookups, 4) if lookups else 0.0,
+        }
+
+
+_default_cache: Optional[LLMResponseCache] = None
+_default_lock = threading.Lock()
+
+
+def get_llm_cache() -> Optional[LLMResponseCache]:
+    """Process-wide cache at $LLM_CACHE_PATH; None when LLM_CACHE_ENABLED=False"""
+    global _default_cache
+    if os.getenv('LLM_CACHE_ENABLED', 'True') != 'True':
+        return None
+    with _default_lock:
+        if _default_cache is None:
+            _default_cache = LLMResponseCache()
+        return _default_cache
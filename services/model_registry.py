@@ -0,0 +1,113 @@
+"""Process-wide registry of heavyweight ML models
+
+Models are loaded lazily on first use and then shared by every thread in
+the process. Under gunicorn with ``preload_app`` the master can call
+``preload`` before forking so workers share the weights copy-on-write
+instead of each loading their own copy.
+"""
+import logging
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def current_rss_bytes() -> Optional[int]:
+    """Resident set size of this process, or None where it cannot be read"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss
+    except Exception:
+        return None
+
+
+def _load_sentence_transformer(name: str) -> Any:
+    from sentence_transformers import SentenceTransformer
+    return SentenceTransformer(name)
+
+
+class ModelRegistry:
+    """Lazily loads named models once and hands out the shared instance"""
+
+    def __init__(self, default_loader: Callable[[str], Any] = _load_sentence_transformer):
+        self.default_loader = default_loader
+        self._loaders: Dict[str, Callable[[str], Any]] = {}
+        self._models: Dict[str, Any] = {}
+        self._stats: Dict[str, Dict[str, Any]] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def register(self, name: str, loader: Callable[[str], Any]) -> None:
+        """Use ``loader(name)`` instead of the default loader for ``name``"""
+        with self._lock:
+            self._loaders[name] = loader
+
+    def get(self, name: str) -> Any:
+        """Return the model, loading it on first use (one load per process)"""
+        model = self._models.get(name)
+        if model is not None:
+            return model
+
+        with self._lock:
+            name_lock = self._locks.setdefault(name, threading.Lock())
+        with name_lock:
+            model = self._models.get(name)
+            if model is None:
+                model = self._load(name)
+        return model
+
+    def _load(self, name: str) -> Any:
+        loader = self._loaders.get(name, self.default_loader)
+        rss_before = current_rss_bytes()
+        started = time.perf_counter()
+        model = loader(name)
+        load_seconds = time.perf_counter() - started
+        rss_after = current_rss_bytes()
+
+        self._stats[name] = {
+            'load_seconds': round(load_seconds, 3),
+            'rss_delta_bytes': rss_after - rss_before if rss_before is not None and rss_after is not None else None,
+            'rss_after_bytes': rss_after,
+            'pid': os.getpid(),
+        }
+        self._models[name] = model
+        logger.info(f"Loaded model {name} in {load_seconds:.2f}s")
+        return model
+
+    def preload(self, names: Iterable[str]) -> None:
+        """Load models eagerly, e.g. in the gunicorn master before fork"""
+        for name in names:
+            self.get(name)
+
+    def is_loaded(self, name: str) -> bool:
+        return name in self._models
+
+    def unload(self, name: str) -> bool:
+        with self._lock:
+            self._stats.pop(name, None)
+            return self._models.pop(name, None) is not None
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        return {name: dict(stats) for name, stats in self._stats.items()}
+
+
+model_registry = ModelRegistry()
+
+
+def get_model(name: str) -> Any:
+    """Shared instance of ``name`` from the process-wide registry"""
+    return model_registry.get(name)
+
+
+def preload_from_env(var: str = 'PRELOAD_MODELS') -> None:
+    """Preload the comma-separated model names in ``$PRELOAD_MODELS``"""
+    names = [name.strip() for name in os.getenv(var, '').split(',') if name.strip()]
+    if names:
+        model_registry.preload(names)
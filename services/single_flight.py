@@ -0,0 +1,229 @@
+"""Single-flight request coalescing around CacheService lookups
+
+When a hot key is missing (e.g. right after a cache flush), every
+concurrent request would otherwise run the same expensive LLM or model
+call. ``SingleFlightCache`` lets exactly one caller compute the value:
+
+* within a process, concurrent misses on a key wait on one future;
+* across processes, the computing worker holds a short-lived lock
+  (Redis ``SET NX PX``) and the others poll the cache until it lands.
+  While it computes, a heartbeat keeps extending the lock, so a call that
+  outlives ``lock_ttl`` stays exclusive, while a crashed worker's lock
+  still expires after ``lock_ttl``. Followers wait up to ``wait_timeout``,
+  which should cover the call's worst case (timeouts plus retries).
+
+``LocalLockBackend`` stands in for Redis in tests and single-process
+deployments.
+"""
+import logging
+import threading
+import time
+import uuid
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class SingleFlight:
+    """In-process coalescing: one call per key at a time, shared by all waiters"""
+
+    def __init__(self):
+        self._calls: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._calls[key] = future
+
+        if not leader:
+            return future.result()
+
+        try:
+            future.set_result(fn())
+        except BaseException as exc:
+            future.set_exception(exc)
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+        return future.result()
+
+
+class RedisLockBackend:
+    """Cross-process lock on a Redis client: ``SET NX PX`` + compare-and-delete"""
+
+    _RELEASE = (
+        "if redis.call('get', KEYS[1]) == ARGV[1] then "
+        "return redis.call('del', KEYS[1]) else return 0 end"
+    )
+
+    def __init__(self, redis_client):
+        self.redis = redis_client
+
+    def acquire(self, name: str, ttl_seconds: float) -> Optional[str]:
+        token = uuid.uuid4().hex
+        if self.redis.set(name, token, nx=True, px=int(ttl_seconds * 1000)):
+            return token
+        return None
+
+    _EXTEND = (
+        "if redis.call('get', KEYS[1]) == ARGV[1] then "
+        "return redis.call('pexpire', KEYS[1], ARGV[2]) else return 0 end"
+    )
+
+    def release(self, name: str, token: str) -> None:
+        self.redis.eval(self._RELEASE, 1, name, token)
+
+    def extend(self, name: str, token: str, ttl_seconds: float) -> bool:
+        """Reset the TTL if ``token`` still owns the lock"""
+        return bool(self.redis.eval(self._EXTEND, 1, name, token, int(ttl_seconds * 1000)))
+
+    def is_locked(self, name: str) -> bool:
+        return bool(self.redis.exists(name))
+
+
+class LocalLockBackend:
+    """In-memory stand-in for ``RedisLockBackend`` with the same semantics"""
+
+    def __init__(self):
+        self._locks: Dict[str, Tuple[str, float]] = {}
+        self._mutex = threading.Lock()
+
+    def _live(self, name: str) -> Optional[Tuple[str, float]]:
+        entry = self._locks.get(name)
+        if entry is not None and entry[1] <= time.monotonic():
+            del self._locks[name]
+            return None
+        return entry
+
+    def acquire(self, name: str, ttl_seconds: float) -> Optional[str]:
+        with self._mutex:
+            if self._live(name) is not None:
+                return None
+            token = uuid.uuid4().hex
+            self._locks[name] = (token, time.monotonic() + ttl_seconds)
+            return token
+
+    def release(self, name: str, token: str) -> None:
+        with self._mutex:
+            entry = self._live(name)
+            if entry is not None and entry[0] == token:
+                del self._locks[name]
+
+    def extend(self, name: str, token: str, ttl_seconds: float) -> bool:
+        with self._mutex:
+            entry = self._live(name)
+            if entry is None or entry[0] != token:
+                return False
+            self._locks[name] = (token, time.monotonic() + ttl_seconds)
+            return True
+
+    def is_locked(self, name: str) -> bool:
+        with self._mutex:
+            return self._live(name) is not None
+
+
+class SingleFlightCache:
+    """Cache-aside lookups where concurrent misses share one computation"""
+
+    def __init__(self, cache, lock_backend=None, lock_ttl: float = 30.0,
+                 wait_timeout: float = 30.0, poll_interval: float = 0.05):
+        self.cache = cache
+        self.lock_backend = lock_backend
+        self.lock_ttl = lock_ttl
+        self.wait_timeout = wait_timeout
+        self.poll_interval = poll_interval
+        self._flight = SingleFlight()
+        self.stats = {'hits': 0, 'computed': 0, 'coalesced': 0, 'waited_remote': 0}
+
+    def get_or_compute(self, key: str, compute: Callable[[], Any], ttl: int = 3600) -> Tuple[Any, bool]:
+        """Return ``(value, from_cache)``.
+
+        ``compute`` runs at most once per key across concurrent callers;
+        ``None`` results are returned but never cached.
+        """
+        value = self._cache_get(key)
+        if value is not None:
+            self.stats['hits'] += 1
+            return value, True
+
+        leader = []
+        result = self._flight.do(key, lambda: leader.append(True) or self._fill(key, compute, ttl))
+        if not leader:
+            self.stats['coalesced'] += 1
+        return result
+
+    def _fill(self, key: str, compute: Callable[[], Any], ttl: int) -> Tuple[Any, bool]:
+        value = self._cache_get(key)
+        if value is not None:
+            return value, True
+
+        if self.lock_backend is None:
+            return self._compute_and_store(key, compute, ttl), False
+
+        lock_name = f"lock:{key}"
+        deadline = time.monotonic() + self.wait_timeout
+        while True:
+            token = self.lock_backend.acquire(lock_name, self.lock_ttl)
+            if token is not None:
+                stop_heartbeat = self._start_heartbeat(lock_name, token)
+                try:
+                    # Another worker may have filled the key just before we got the lock
+                    value = self._cache_get(key)
+                    if value is not None:
+                        return value, True
+                    return self._compute_and_store(key, compute, ttl), False
+                finally:
+                    stop_heartbeat.set()
+                    self.lock_backend.release(lock_name, token)
+
+            # Someone else is computing: wait for the value instead of duplicating work
+            self.stats['waited_remote'] += 1
+            while self.lock_backend.is_locked(lock_name) and time.monotonic() < deadline:
+                time.sleep(self.poll_interval)
+                value = self._cache_get(key)
+                if value is not None:
+                    return value, True
+            value = self._cache_get(key)
+            if value is not None:
+                return value, True
+            if time.monotonic() >= deadline:
+                logger.warning(f"Timed out waiting for {key}; computing locally")
+                return self._compute_and_store(key, compute, ttl), False
+
+    def _start_heartbeat(self, lock_name: str, token: str) -> threading.Event:
+        """Extend the lock every third of its TTL until the returned event is set"""
+        stop = threading.Event()
+
+        def beat():
+            while not stop.wait(self.lock_ttl / 3):
+                try:
+                    if not self.lock_backend.extend(lock_name, token, self.lock_ttl):
+                        logger.warning(f"Lost {lock_name} while computing")
+                        return
+                except Exception as e:
+                    logger.error(f"Failed to extend {lock_name}: {e}")
+
+        threading.Thread(target=beat, name=f"heartbeat:{lock_name}", daemon=True).start()
+        return stop
+
+    def _compute_and_store(self, key: str, compute: Callable[[], Any], ttl: int) -> Any:
+        value = compute()
+        self.stats['computed'] += 1
+        if value is not None:
+            try:
+                self.cache.set(key, value, ttl=ttl)
+            except Exception as e:
+                logger.error(f"Failed to cache {key}: {e}")
+        return value
+
+    def _cache_get(self, key: str) -> Any:
+        try:
+            return self.cache.get(key)
+        except Exception as e:
+            logger.error(f"Cache lookup failed for {key}: {e}")
+            return None
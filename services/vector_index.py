@@ -0,0 +1,350 @@
+"""Persistent NumPy vector index for resume and job embeddings
+
+Embeddings are stored once, L2-normalised, so "top N resumes for this job"
+is a single matrix product over the index instead of N encoder calls.
+"""
+import json
+import logging
+import os
+import shutil
+import threading
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class VectorIndex:
+    """NumPy vector index over L2-normalised embeddings (cosine similarity).
+
+    Two search modes, no external service required:
+      - ``flat``: exact brute-force inner product over all live vectors
+      - ``ivf``:  inverted-file ANN; vectors are bucketed by nearest k-means
+        centroid and a query only scans the ``n_probe`` closest buckets
+
+    Vectors can be added, replaced and removed incrementally. ``save`` writes
+    plain ``.npy`` files into a new version directory and swaps the
+    ``directory`` symlink onto it in one rename, so concurrent readers
+    always find a complete index; ``load`` memory-maps the files so large
+    indexes open instantly and share pages between worker processes.
+    """
+
+    FORMAT_VERSION = 1
+
+    def __init__(self, dim: Optional[int] = None, mode: str = 'flat',
+                 n_lists: int = 64, n_probe: int = 8, min_train_size: int = 1024):
+        if mode not in ('flat', 'ivf'):
+            raise ValueError(f"Unknown index mode: {mode}")
+        self.dim = dim
+        self.mode = mode
+        self.n_lists = n_lists
+        self.n_probe = n_probe
+        self.min_train_size = min_train_size
+
+        self._vectors = np.empty((0, dim or 0), dtype=np.float32)
+        self._ids = np.empty(0, dtype=np.int64)
+        self._alive = np.empty(0, dtype=bool)
+        self._lists = np.empty(0, dtype=np.int32)
+        self._size = 0
+        self._row_of: Dict[int, int] = {}
+        self.centroids: Optional[np.ndarray] = None
+        # Rows per IVF list (may include removed rows; search filters them)
+        self._postings: Optional[List[np.ndarray]] = None
+        # Resolved version directory this index was loaded from, if any
+        self.source: Optional[str] = None
+        self._lock = threading.RLock()
+
+    # ------------------------------------------------------------------ #
+    # Mutation
+    # ------------------------------------------------------------------ #
+
+    @staticmethod
+    def normalize(vectors: np.ndarray) -> np.ndarray:
+        vectors = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
+
+    def add(self, ids: Iterable[int], vectors: np.ndarray) -> None:
+        """Insert vectors, replacing any existing vector with the same id"""
+        ids = np.asarray(list(ids), dtype=np.int64)
+        vectors = self.normalize(vectors)
+        if len(ids) != len(vectors):
+            raise ValueError("ids and vectors must have the same length")
+        if len(np.unique(ids)) != len(ids):
+            # Keep the last vector given for a repeated id
+            _, last = np.unique(ids[::-1], return_index=True)
+            keep = np.sort(len(ids) - 1 - last)
+            ids, vectors = ids[keep], vectors[keep]
+
+        with self._lock:
+            if self.dim is None:
+                self.dim = vectors.shape[1]
+                self._vectors = np.empty((0, self.dim), dtype=np.float32)
+            if vectors.shape[1] != self.dim:
+                raise ValueError(f"Expected dimension {self.dim}, got {vectors.shape[1]}")
+
+            self.remove(ids)
+            self._reserve(self._size + len(ids))
+            rows = np.arange(self._size, self._size + len(ids))
+            self._vectors[rows] = vectors
+            self._ids[rows] = ids
+            self._alive[rows] = True
+            if self.centroids is not None:
+                assigned = self._assign(vectors)
+                self._lists[rows] = assigned
+                for c in np.unique(assigned).tolist():
+                    self._postings[c] = np.concatenate([self._postings[c], rows[assigned == c]])
+            else:
+                self._lists[rows] = -1
+            self._size += len(ids)
+            self._row_of.update(zip(ids.tolist(), rows.tolist()))
+
+            if self.mode == 'ivf' and self.centroids is None and self.count() >= self.min_train_size:
+                self.train()
+
+    def remove(self, ids: Iterable[int]) -> int:
+        """Remove vectors by id; returns how many were present"""
+        removed = 0
+        with self._lock:
+            for vector_id in np.asarray(list(ids), dtype=np.int64).tolist():
+                row = self._row_of.pop(vector_id, None)
+                if row is not None:
+                    self._alive[row] = False
+                    removed += 1
+        return removed
+
+    def _reserve(self, capacity: int) -> None:
+        self._ensure_writable()
+        if capacity <= len(self._ids):
+            return
+        new_capacity = max(capacity, 2 * len(self._ids), 64)
+        vectors = np.zeros((new_capacity, self.dim), dtype=np.float32)
+        vectors[:self._size] = self._vectors[:self._size]
+        self._vectors = vectors
+        self._ids = np.resize(self._ids, new_capacity)
+        alive = np.zeros(new_capacity, dtype=bool)
+        alive[:self._size] = self._alive[:self._size]
+        self._alive = alive
+        self._lists = np.resize(self._lists, new_capacity)
+
+    def _ensure_writable(self) -> None:
+        """Copy memory-mapped arrays into RAM before the first write"""
+        if isinstance(self._vectors, np.memmap) or not self._vectors.flags.writeable:
+            self._vectors = np.array(self._vectors)
+            self._ids = np.array(self._ids)
+            self._alive = np.array(self._alive)
+            self._lists = np.array(self._lists)
+
+    def compact(self) -> None:
+        """Drop removed rows and shrink storage"""
+        with self._lock:
+            live = np.flatnonzero(self._alive[:self._size])
+            self._vectors = np.ascontiguousarray(self._vectors[live])
+            self._ids = self._ids[live].copy()
+            self._alive = np.ones(len(live), dtype=bool)
+            self._lists = self._lists[live].copy()
+            self._size = len(live)
+            self._row_of = {vector_id: row for row, vector_id in enumerate(self._ids.tolist())}
+            if self.centroids is not None:
+                self._build_postings()
+
+    # ------------------------------------------------------------------ #
+    # IVF training
+    # ------------------------------------------------------------------ #
+
+    def train(self, n_iter: int = 10, sample_size: int = 50_000, seed: int = 0) -> None:
+        """Fit IVF centroids with spherical k-means and bucket every vector"""
+        with self._lock:
+            live = np.flatnonzero(self._alive[:self._size])
+            if len(live) == 0:
+                return
+            rng = np.random.default_rng(seed)
+            sample = self._vectors[rng.choice(live, min(sample_size, len(live)), replace=False)]
+            n_lists = min(self.n_lists, len(sample))
+            centroids = sample[rng.choice(len(sample), n_lists, replace=False)].copy()
+
+            for _ in range(n_iter):
+                assignment = np.argmax(sample @ centroids.T, axis=1)
+                for c in range(n_lists):
+                    members = sample[assignment == c]
+                    if len(members):
+                        centroids[c] = members.mean(axis=0)
+                centroids = self.normalize(centroids)
+
+            self.centroids = centroids
+            self._ensure_writable()
+            self._lists[:self._size] = self._assign(self._vectors[:self._size])
+            self._build_postings()
+            logger.info(f"Trained IVF index: {n_lists} lists over {len(live)} vectors")
+
+    def _assign(self, vectors: np.ndarray) -> np.ndarray:
+        return np.argmax(vectors @ self.centroids.T, axis=1).astype(np.int32)
+
+    def _build_postings(self) -> None:
+        lists = self._lists[:self._size]
+        order = np.argsort(lists, kind='stable')
+        bounds = np.searchsorted(lists[order], np.arange(len(self.centroids) + 1))
+        self._postings = [order[bounds[c]:bounds[c + 1]] for c in range(len(self.centroids))]
+
+    # ------------------------------------------------------------------ #
+    # Search
+    # ------------------------------------------------------------------ #
+
+    def search(self, query: np.ndarray, k: int = 50) -> Tuple[np.ndarray, np.ndarray]:
+        """Return ``(ids, scores)`` of the ``k`` most similar vectors, best first"""
+        ids, scores = self.search_batch(np.atleast_2d(query), k)
+        return ids[0], scores[0]
+
+    def search_batch(self, queries: np.ndarray, k: int = 50) -> Tuple[List[np.ndarray], List[np.ndarray]]:
+        """Search many queries at once; returns per-query id and score arrays"""
+        queries = self.normalize(queries)
+        with self._lock:
+            if self._size == 0 or self.dim is None:
+                empty = (np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32))
+                return [empty[0]] * len(queries), [empty[1]] * len(queries)
+
+            use_ivf = self.mode == 'ivf' and self.centroids is not None
+            if not use_ivf:
+                alive = self._alive[:self._size]
+                if alive.all():
+                    rows = np.arange(self._size)
+                    scores = queries @ self._vectors[:self._size].T
+                else:
+                    rows = np.flatnonzero(alive)
+                    scores = queries @ self._vectors[rows].T
+                return self._select(rows, scores, k)
+
+            probe = min(self.n_probe, len(self.centroids))
+            nearest = np.argsort(-(queries @ self.centroids.T), axis=1)[:, :probe]
+            all_ids, all_scores = [], []
+            for query, lists in zip(queries, nearest):
+                # Only the probed lists are touched, not all N rows
+                rows = np.concatenate([self._postings[c] for c in lists.tolist()])
+                rows = rows[self._alive[rows]]
+                ids, scores = self._select(rows, (self._vectors[rows] @ query)[None, :], k)
+                all_ids.append(ids[0])
+                all_scores.append(scores[0])
+            return all_ids, all_scores
+
+    def _select(self, rows: np.ndarray, scores: np.ndarray, k: int) -> Tuple[List[np.ndarray], List[np.ndarray]]:
+        all_ids, all_scores = [], []
+        for row_scores in scores:
+            if k < len(row_scores):
+                top = np.argpartition(-row_scores, k - 1)[:k]
+            else:
+                top = np.arange(len(row_scores))
+            top = top[np.argsort(-row_scores[top], kind='stable')]
+            all_ids.append(self._ids[rows[top]].copy())
+            all_scores.append(row_scores[top].astype(np.float32))
+        return all_ids, all_scores
+
+    def get(self, vector_id: int) -> Optional[np.ndarray]:
+        row = self._row_of.get(int(vector_id))
+        return None if row is None else np.array(self._vectors[row])
+
+    def count(self) -> int:
+        return len(self._row_of)
+
+    def __contains__(self, vector_id: int) -> bool:
+        return int(vector_id) in self._row_of
+
+    def __len__(self) -> int:
+        return self.count()
+
+    # ------------------------------------------------------------------ #
+    # Persistence
+    # ------------------------------------------------------------------ #
+
+    def save(self, directory: str, keep_versions: int = 2) -> str:
+        """Write the index and atomically point ``directory`` at it.
+
+        Each save goes to a fresh ``<directory>.versions/<timestamp>``
+        directory; ``directory`` itself is a symlink that is replaced in a
+        single rename, so readers see the old index or the new one and
+        never a missing or half-written directory. Only the newest
+        ``keep_versions`` versions are kept. Returns the version directory.
+        """
+        directory = directory.rstrip(os.sep)
+        versions_dir = f"{directory}.versions"
+        name = datetime.utcnow().strftime('%Y%m%d%H%M%S%f')
+        version_dir = os.path.join(versions_dir, name)
+        with self._lock:
+            tmp_dir = f"{version_dir}.tmp"
+            os.makedirs(tmp_dir)
+
+            live = np.flatnonzero(self._alive[:self._size])
+            np.save(os.path.join(tmp_dir, 'vectors.npy'), np.ascontiguousarray(self._vectors[live]))
+            np.save(os.path.join(tmp_dir, 'ids.npy'), self._ids[live])
+            np.save(os.path.join(tmp_dir, 'lists.npy'), self._lists[live])
+            if self.centroids is not None:
+                np.save(os.path.join(tmp_dir, 'centroids.npy'), self.centroids)
+            with open(os.path.join(tmp_dir, 'meta.json'), 'w') as f:
+                json.dump({
+                    'version': self.FORMAT_VERSION,
+                    'dim': self.dim,
+                    'mode': self.mode,
+                    'n_lists': self.n_lists,
+                    'n_probe': self.n_probe,
+                    'min_train_size': self.min_train_size,
+                }, f)
+            os.rename(tmp_dir, version_dir)
+
+        if os.path.isdir(directory) and not os.path.islink(directory):
+            # Index saved before versioning: move it aside once, then link
+            os.rename(directory, os.path.join(versions_dir, '0-legacy'))
+        tmp_link = f"{directory}.tmp-link"
+        if os.path.lexists(tmp_link):
+            os.remove(tmp_link)
+        os.symlink(os.path.join(os.path.basename(versions_dir), name), tmp_link)
+        os.replace(tmp_link, directory)
+
+        # Mapped files of pruned versions stay readable for readers holding them
+        versions = sorted(n for n in os.listdir(versions_dir) if not n.endswith('.tmp'))
+        for old in versions[:-keep_versions] if keep_versions else []:
+            if old != name:
+                shutil.rmtree(os.path.join(versions_dir, old), ignore_errors=True)
+        return version_dir
+
+    @classmethod
+    def load(cls, directory: str, mmap: bool = True) -> 'VectorIndex':
+        """Open an index written by ``save``; vectors are memory-mapped by default"""
+        with open(os.path.join(directory, 'meta.json')) as f:
+            meta = json.load(f)
+        index = cls(dim=meta['dim'], mode=meta['mode'], n_lists=meta['n_lists'],
+                    n_probe=meta['n_probe'], min_train_size=meta['min_train_size'])
+
+        mmap_mode = 'r' if mmap else None
+        index._vectors = np.load(os.path.join(directory, 'vectors.npy'), mmap_mode=mmap_mode)
+        index._ids = np.load(os.path.join(directory, 'ids.npy'))
+        index._lists = np.load(os.path.join(directory, 'lists.npy'))
+        index._alive = np.ones(len(index._ids), dtype=bool)
+        index._size = len(index._ids)
+        index._row_of = {vector_id: row for row, vector_id in enumerate(index._ids.tolist())}
+        centroids_path = os.path.join(directory, 'centroids.npy')
+        if os.path.exists(centroids_path):
+            index.centroids = np.load(centroids_path)
+            index._build_postings()
+        index.source = os.path.realpath(directory)
+        if index.dim is None and index._vectors.ndim == 2:
+            index.dim = index._vectors.shape[1]
+        return index
+
+    @classmethod
+    def open(cls, directory: str, **kwargs) -> 'VectorIndex':
+        """Load ``directory`` if it holds an index, otherwise start an empty one"""
+        if os.path.exists(os.path.join(directory, 'meta.json')):
+            return cls.load(directory)
+        return cls(**kwargs)
+
+    def get_stats(self) -> Dict[str, object]:
+        return {
+            'mode': self.mode,
+            'dim': self.dim,
+            'vectors': self.count(),
+            'rows': self._size,
+            'trained': self.centroids is not None,
+            'memory_mapped': isinstance(self._vectors, np.memmap),
+        }
@@ -0,0 +1,100 @@
+"""Tests for the micro-batching encoder and corpus encoding"""
+
+import multiprocessing
+import threading
+
+import numpy as np
+import pytest
+from services.batch_encoder import BatchEncoder, encode_corpus, encode_sorted
+from services.model_registry import model_registry
+from utils import process_pool
+
+
+class LengthModel:
+    """Deterministic stand-in: embeds a text as [len, first char code]"""
+    
+    def encode(self, texts, batch_size=32):
+        return np.array([[len(t), ord(t[0]) if t else 0] for t in texts], dtype=np.float32)
+
+
+class TestBatchEncoder:
+    def test_encode_sorted_restores_order(self):
+        seen = []
+        
+        def encode(texts):
+            seen.append(list(texts))
+            return LengthModel().encode(texts)
+        
+        texts = ["ccc", "a", "bb"]
+        result = encode_sorted(encode, texts)
+        assert seen == [["a", "bb", "ccc"]]
+        assert result[:, 0].tolist() == [3, 1, 2]
+    
+    def test_concurrent_submits_share_batches(self):
+        calls = []
+        
+        def encode(texts):
+            calls.append(len(texts))
+            return LengthModel().encode(texts)
+        
+        encoder = BatchEncoder(encode_fn=encode, max_batch_size=16, max_wait_ms=50)
+        barrier = threading.Barrier(12)
+        results = {}
+        
+        def request(i):
+            barrier.wait()
+            results[i] = encoder.submit("x" * (i + 1)).result(timeout=5)
+        
+        threads = [threading.Thread(target=request, args=(i,)) for i in range(12)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        encoder.close()
+        
+        assert all(results[i][0] == i + 1 for i in range(12))
+        assert sum(calls) == 12
+        assert len(calls) < 12
+    
+    def test_errors_reach_every_future(self):
+        def encode(texts):
+            raise RuntimeError("model unavailable")
+        
+        encoder = BatchEncoder(encode_fn=encode, max_wait_ms=20)
+        futures = [encoder.submit(t) for t in ("a", "b")]
+        for future in futures:
+            with pytest.raises(RuntimeError):
+                future.result(timeout=5)
+        encoder.close()
+
+
+class TestEncodeCorpus:
+    @pytest.fixture(autouse=True)
+    def fake_model(self):
+        model_registry.register('length-model', lambda name: LengthModel())
+        yield
+        # Pool workers were forked with this registration; drop them with it
+        process_pool.shutdown_process_pool('batch_encoder')
+        model_registry.unload('length-model')
+    
+    def test_in_process(self):
+        texts = [f"{'y' * (i % 7)}z" for i in range(50)]
+        result = encode_corpus(texts, 'length-model', chunk_size=8, processes=1)
+        assert result[:, 0].tolist() == [len(t) for t in texts]
+    
+    @pytest.mark.skipif(multiprocessing.get_start_method() != 'fork',
+                        reason="stand-in model registration is inherited only via fork")
+    def test_process_pool_keeps_order(self):
+        texts = [f"{'y' * (i % 7)}z" for i in range(50)]
+        result = encode_corpus(texts, 'length-model', chunk_size=8, processes=2)
+        assert result[:, 0].tolist() == [len(t) for t in texts]
+        pool = process_pool._pools['batch_encoder'][2]
+        encode_corpus(texts, 'length-model', chunk_size=8, processes=2)
+        assert process_pool._pools['batch_encoder'][2] is pool
+    
+    def test_daemonic_process_encodes_in_process(self, monkeypatch):
+        monkeypatch.setattr('services.batch_encoder.can_start_workers', lambda: False)
+        texts = [f"{'y' * (i % 7)}z" for i in range(50)]
+        result = encode_corpus(texts, 'length-model', chunk_size=8, processes=2)
+        assert result[:, 0].tolist() == [len(t) for t in texts]
+        assert 'batch_encoder' not in process_pool._pools
@@ -0,0 +1,57 @@
+"""Tests for the shared hashed TF-IDF vectorizer"""
+
+import numpy as np
+import pytest
+from app.services.corpus_vectorizer import CorpusVectorizer
+
+CORPUS = [
+    "python django postgresql backend developer",
+    "react typescript frontend developer",
+    "python machine learning pytorch",
+    "kubernetes docker devops engineer",
+]
+
+
+class TestCorpusVectorizer:
+    def test_rows_are_l2_normalised_cosines(self):
+        vectorizer = CorpusVectorizer().fit(CORPUS)
+        matrix = vectorizer.transform(CORPUS)
+        norms = np.sqrt(matrix.multiply(matrix).sum(axis=1)).A.ravel()
+        np.testing.assert_allclose(norms, 1.0, rtol=1e-5)
+        
+        job = vectorizer.transform(["senior python backend developer"])
+        scores = (matrix @ job.T).toarray().ravel()
+        assert int(np.argmax(scores)) == 0
+        assert scores[3] == pytest.approx(0.0)
+    
+    def test_partial_fit_matches_full_fit(self):
+        full = CorpusVectorizer().fit(CORPUS)
+        incremental = CorpusVectorizer().fit(CORPUS[:2]).partial_fit(CORPUS[2:])
+        np.testing.assert_array_equal(full.doc_freq, incremental.doc_freq)
+        assert (full.transform(CORPUS) != incremental.transform(CORPUS)).nnz == 0
+        
+        incremental.remove_documents(CORPUS[2:])
+        np.testing.assert_array_equal(incremental.doc_freq, CorpusVectorizer().fit(CORPUS[:2]).doc_freq)
+    
+    def test_save_and_load(self, tmp_path):
+        path = str(tmp_path / "tfidf.npz")
+        vectorizer = CorpusVectorizer(n_features=2 ** 12).fit(CORPUS)
+        vectorizer.save(path)
+        loaded = CorpusVectorizer.load(path)
+        assert loaded.n_docs == len(CORPUS)
+        assert (loaded.transform(CORPUS) != vectorizer.transform(CORPUS)).nnz == 0
+    
+    def test_apply_change_merges_other_workers_updates(self, tmp_path):
+        path = str(tmp_path / "tfidf.npz")
+        CorpusVectorizer(n_features=2 ** 12).fit(CORPUS[:2]).save(path)
+        worker_a = CorpusVectorizer.load(path)
+        worker_b = CorpusVectorizer.load(path)
+        
+        worker_a.apply_change(added=[CORPUS[2]], path=path)
+        worker_b.apply_change(added=[CORPUS[3]], removed=[CORPUS[0]], path=path)
+        
+        expected = CorpusVectorizer(n_features=2 ** 12).fit(CORPUS[1:])
+        np.testing.assert_array_equal(worker_b.doc_freq, expected.doc_freq)
+        assert worker_a.refresh(path)
+        assert worker_a.n_docs == 3
+        np.testing.assert_array_equal(CorpusVectorizer.load(path).doc_freq, expected.doc_freq)
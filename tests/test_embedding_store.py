@@ -0,0 +1,81 @@
+"""Tests for the content-hash embedding store"""
+
+import numpy as np
+import pytest
+from services.embedding_store import EmbeddingStore, content_key
+
+
+class CountingEncoder:
+    def __init__(self, dim=8):
+        self.dim = dim
+        self.calls = []
+    
+    def __call__(self, texts):
+        self.calls.append(list(texts))
+        rng = np.random.default_rng(len(self.calls))
+        return rng.normal(size=(len(texts), self.dim))
+
+
+class TestEmbeddingStore:
+    def test_key_normalises_text_and_includes_model(self):
+        assert content_key("Python  developer\n", "m") == content_key("Python developer", "m")
+        assert content_key("Python developer", "m") != content_key("Python developer", "m2")
+    
+    def test_each_text_encoded_once(self):
+        store = EmbeddingStore()
+        encoder = CountingEncoder()
+        first = store.get_or_encode(["a", "b", "a ", "c"], "m", encoder)
+        second = store.get_or_encode(["c", "a", "d"], "m", encoder)
+        
+        assert encoder.calls == [["a", "b", "c"], ["d"]]
+        assert first.shape == (4, 8)
+        np.testing.assert_array_equal(first[0], first[2])
+        np.testing.assert_array_equal(second[1], first[0])
+    
+    def test_models_are_kept_apart(self):
+        store = EmbeddingStore()
+        store.get_or_encode(["a"], "small", CountingEncoder(dim=4))
+        store.get_or_encode(["a"], "large", CountingEncoder(dim=16))
+        assert store.get("a", "small").shape == (4,)
+        assert store.get("a", "large").shape == (16,)
+    
+    def test_persisted_float16_reopen(self, tmp_path):
+        store = EmbeddingStore(str(tmp_path), hot_size=2, initial_capacity=2)
+        encoder = CountingEncoder()
+        texts = [f"resume {i}" for i in range(10)]
+        vectors = store.get_or_encode(texts, "m", encoder)
+        
+        reopened = EmbeddingStore(str(tmp_path))
+        again = reopened.get_or_encode(texts, "m", encoder)
+        assert len(encoder.calls) == 1
+        np.testing.assert_allclose(again, vectors, rtol=1e-2, atol=1e-2)
+        assert reopened.get_stats()['store_hits'] == 10
+        assert reopened.get("unseen", "m") is None
+    
+    def test_two_writers_share_one_directory(self, tmp_path):
+        first = EmbeddingStore(str(tmp_path), initial_capacity=2)
+        second = EmbeddingStore(str(tmp_path), initial_capacity=2)
+        a = first.get_or_encode(["a", "b"], "m", CountingEncoder())
+        c = second.get_or_encode(["c", "d", "e"], "m", CountingEncoder())
+        
+        # Each writer sees the other's rows instead of overwriting them
+        np.testing.assert_allclose(second.get("a", "m"), a[0], atol=1e-2)
+        np.testing.assert_allclose(first.get("e", "m"), c[2], atol=1e-2)
+        
+        reopened = EmbeddingStore(str(tmp_path))
+        for text, vector in zip(["a", "b", "c", "d", "e"], np.vstack([a, c])):
+            np.testing.assert_allclose(reopened.get(text, "m"), vector, atol=1e-2)
+        assert reopened.get_stats()['models'] == {'m': 5}
+    
+    def test_torn_ids_line_is_truncated_before_next_append(self, tmp_path):
+        store = EmbeddingStore(str(tmp_path))
+        store.get_or_encode(["a"], "m", CountingEncoder())
+        with open(tmp_path / "m.ids", "a") as f:
+            f.write("deadbeef\t")
+        
+        reopened = EmbeddingStore(str(tmp_path))
+        vector = reopened.get_or_encode(["b"], "m", CountingEncoder())
+        
+        again = EmbeddingStore(str(tmp_path))
+        assert again.get("a", "m") is not None
+        np.testing.assert_allclose(again.get("b", "m"), vector[0], atol=1e-2)
@@ -0,0 +1,90 @@
+"""Tests for streaming PDF/DOCX text extraction"""
+
+import asyncio
+from unittest.mock import Mock
+
+import pytest
+
+pytest.importorskip('PyPDF2')
+docx = pytest.importorskip('docx')
+
+from utils import file_parser
+from utils.file_parser import extract_text_from_pdf, iter_pdf_pages, limit_text, parse_file, parse_file_async
+
+
+def make_pdf(page_texts):
+    """Minimal PDF with one line of Helvetica text per page"""
+    n = len(page_texts)
+    font_id = 3 + 2 * n
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [" + b" ".join(b"%d 0 R" % (3 + 2 * i) for i in range(n)) +
+        b"] /Count %d >>" % n,
+    ]
+    for i, text in enumerate(page_texts):
+        stream = b"BT /F1 12 Tf 72 720 Td (" + text.encode('latin-1') + b") Tj ET"
+        objects.append(b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents %d 0 R"
+                       b" /Resources << /Font << /F1 %d 0 R >> >> >>" % (4 + 2 * i, font_id))
+        objects.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+    objects.append(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+
+    out, offsets = bytearray(b"%PDF-1.4\n"), []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(out)
+
+
+@pytest.fixture
+def pdf_path(tmp_path):
+    path = tmp_path / 'resume.pdf'
+    path.write_bytes(make_pdf([f"Page {i} Python" for i in range(20)]))
+    return str(path)
+
+
+class TestFileParser:
+    def test_pages_stream_in_order_with_limits(self, pdf_path):
+        pages = list(iter_pdf_pages(pdf_path, max_pages=None))
+        assert [p.strip() for p in pages] == [f"Page {i} Python" for i in range(20)]
+        assert len(list(iter_pdf_pages(pdf_path, max_pages=3))) == 3
+        assert extract_text_from_pdf(pdf_path, max_pages=None) == "".join(pages)
+        assert len(extract_text_from_pdf(pdf_path, max_bytes=25).encode('utf-8')) == 25
+
+    def test_parallel_pages_match_serial(self, pdf_path, monkeypatch):
+        monkeypatch.setattr(file_parser, 'PARALLEL_MIN_PAGES', 4)
+        serial = extract_text_from_pdf(pdf_path, max_pages=None)
+        assert extract_text_from_pdf(pdf_path, max_pages=None, workers=2) == serial
+        assert extract_text_from_pdf(pdf_path, max_pages=None, max_bytes=40, workers=2) == \
+            extract_text_from_pdf(pdf_path, max_pages=None, max_bytes=40)
+
+    def test_parallel_only_for_paths_outside_daemons(self, pdf_path, monkeypatch):
+        monkeypatch.setattr(file_parser, 'PARALLEL_MIN_PAGES', 4)
+        monkeypatch.setattr(file_parser, 'get_process_pool', Mock(side_effect=AssertionError('pool used')))
+        with open(pdf_path, 'rb') as handle:
+            data = handle.read()
+        assert len(list(iter_pdf_pages(data, max_pages=None, workers=2))) == 20
+
+        monkeypatch.setattr(file_parser, 'can_start_workers', lambda: False)
+        assert len(list(iter_pdf_pages(pdf_path, max_pages=None, workers=2))) == 20
+
+    def test_limit_text_cuts_on_utf8_boundary(self):
+        assert "".join(limit_text(["опыт ", "работы"], max_bytes=7)) == "опы"
+        assert "".join(limit_text(["a", "b"], max_bytes=None)) == "ab"
+
+    def test_parse_file_dispatch_and_async(self, tmp_path, pdf_path):
+        document = docx.Document()
+        document.add_paragraph("Senior Go developer")
+        document.add_table(rows=1, cols=1).cell(0, 0).text = "Kubernetes"
+        docx_path = str(tmp_path / 'resume.docx')
+        document.save(docx_path)
+        txt_path = tmp_path / 'resume.txt'
+        txt_path.write_text("plain resume", encoding='utf-8')
+
+        assert parse_file(docx_path) == "Senior Go developerKubernetes"
+        assert parse_file(str(txt_path), max_bytes=5) == "plain"
+        assert asyncio.run(parse_file_async(pdf_path, max_pages=1)).strip() == "Page 0 Python"
+        assert parse_file(str(tmp_path / 'broken.pdf')) == ""
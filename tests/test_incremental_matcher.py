@@ -0,0 +1,176 @@
+"""Tests for change-driven incremental re-matching"""
+
+import pytest
+from sqlalchemy import Column, DateTime, Float, ForeignKey, Integer, JSON, String, Text, UniqueConstraint, create_engine
+from sqlalchemy.orm import declarative_base, sessionmaker
+
+from app.services.corpus_vectorizer import CorpusVectorizer
+from app.services.incremental_matcher import IncrementalMatcher, install_change_hooks, upsert_matches
+
+Base = declarative_base()
+
+
+class Resume(Base):
+    __tablename__ = 'resumes'
+    id = Column(Integer, primary_key=True)
+    skills = Column(JSON)
+    summary = Column(Text)
+    raw_text = Column(Text)
+
+
+class Job(Base):
+    __tablename__ = 'jobs'
+    id = Column(Integer, primary_key=True)
+    title = Column(String(255))
+    description = Column(Text)
+    required_skills = Column(JSON)
+
+
+class Match(Base):
+    __tablename__ = 'matches'
+    id = Column(Integer, primary_key=True)
+    resume_id = Column(Integer, ForeignKey('resumes.id'), nullable=False)
+    job_id = Column(Integer, ForeignKey('jobs.id'), nullable=False)
+    match_score = Column(Float)
+    semantic_fit = Column(String(50))
+    created_at = Column(DateTime)
+    __table_args__ = (UniqueConstraint('resume_id', 'job_id', name='uq_resume_job'),)
+
+
+@pytest.fixture
+def session():
+    engine = create_engine('sqlite://')
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    session.add_all([
+        Job(id=1, title='Python backend developer', description='Django postgresql', required_skills=['python']),
+        Job(id=2, title='Frontend engineer', description='React typescript', required_skills=['react']),
+        Resume(id=10, skills=['python', 'django'], summary='backend developer'),
+        Resume(id=11, skills=['react'], summary='frontend typescript engineer'),
+    ])
+    session.commit()
+    yield session
+    session.close()
+
+
+def matcher_for(session, vectorizer_path=None):
+    vectorizer = CorpusVectorizer(n_features=2 ** 12)
+    return IncrementalMatcher(session, vectorizer=vectorizer, min_score=0.05,
+                              resume_model=Resume, job_model=Job, match_model=Match,
+                              vectorizer_path=vectorizer_path)
+
+
+def pairs(session):
+    return {(m.resume_id, m.job_id): m.match_score for m in session.query(Match)}
+
+
+class TestIncrementalMatcher:
+    def test_resume_change_scores_one_row(self, session):
+        matcher = matcher_for(session)
+        stats = matcher.on_resume_changed(10, created=True)
+        assert stats['scored'] == 2
+        assert set(pairs(session)) == {(10, 1)}
+    
+    def test_update_upserts_and_drops_stale_pairs(self, session):
+        matcher = matcher_for(session)
+        matcher.on_resume_changed(10, created=True)
+        first = pairs(session)[(10, 1)]
+        
+        session.get(Resume, 10).skills = ['react', 'typescript']
+        session.commit()
+        matcher.on_resume_changed(10)
+        
+        current = pairs(session)
+        assert (10, 1) not in current or current[(10, 1)] < first
+        assert (10, 2) in current
+        assert session.query(Match).filter_by(resume_id=10, job_id=2).count() == 1
+    
+    def test_job_change_scores_one_column(self, session):
+        matcher = matcher_for(session)
+        stats = matcher.on_job_changed(2, created=True)
+        assert stats['scored'] == 2
+        assert set(pairs(session)) == {(11, 2)}
+        
+        matcher.on_job_changed(2)
+        assert session.query(Match).count() == 1
+    
+    def test_deleted_resume_removes_matches(self, session):
+        matcher = matcher_for(session)
+        matcher.on_job_changed(1, created=True)
+        session.query(Resume).filter_by(id=10).delete()
+        session.commit()
+        assert matcher.on_resume_changed(10)['removed'] == 1
+    
+    def test_update_swaps_document_statistics_and_persists(self, session, tmp_path):
+        path = str(tmp_path / 'tfidf.npz')
+        matcher = matcher_for(session, vectorizer_path=path)
+        matcher.on_resume_changed(10, created=True)
+        
+        old_text = matcher._row_text(session.query(*matcher._resume_columns()).filter(Resume.id == 10).one())
+        session.get(Resume, 10).skills = ['react', 'typescript']
+        session.commit()
+        matcher.on_resume_changed(10, previous_text=old_text)
+        
+        new_text = matcher._row_text(session.query(*matcher._resume_columns()).filter(Resume.id == 10).one())
+        expected = CorpusVectorizer(n_features=2 ** 12).fit([new_text])
+        assert matcher.vectorizer.n_docs == 1
+        assert (matcher.vectorizer.doc_freq == expected.doc_freq).all()
+        assert (CorpusVectorizer.load(path).doc_freq == expected.doc_freq).all()
+        
+        matcher.on_resume_deleted(10, previous_text=new_text)
+        assert CorpusVectorizer.load(path).n_docs == 0
+
+
+class TestUpsertMatches:
+    def test_rerun_overwrites_instead_of_duplicating(self, session):
+        upsert_matches(session, [{'resume_id': 10, 'job_id': 1, 'match_score': 0.4}], Match)
+        upsert_matches(session, [{'resume_id': 10, 'job_id': 1, 'match_score': 0.6},
+                                 {'resume_id': 11, 'job_id': 1, 'match_score': 0.2}], Match)
+        session.commit()
+        assert pairs(session) == {(10, 1): 0.6, (11, 1): 0.2}
+
+
+class TestChangeHooks:
+    @staticmethod
+    def install(session, events):
+        install_change_hooks(session,
+                             on_resume=lambda i, c, p: events.append(('resume', i, c, p)),
+                             on_job=lambda i, c, p: events.append(('job', i, c, p)),
+                             on_resume_deleted=lambda i, p: events.append(('resume deleted', i, p)),
+                             on_job_deleted=lambda i, p: events.append(('job deleted', i, p)),
+                             resume_model=Resume, job_model=Job)
+    
+    def test_dispatch_after_commit_only(self, session):
+        events = []
+        self.install(session, events)
+        
+        session.add(Resume(id=12, skills=['go']))
+        session.flush()
+        assert events == []
+        session.commit()
+        assert events == [('resume', 12, True, None)]
+        
+        session.get(Job, 1).title = 'Senior Python developer'
+        session.rollback()
+        session.get(Job, 2).title = 'Senior frontend engineer'
+        session.commit()
+        assert events[1:] == [('job', 2, False, 'Frontend engineer React typescript react')]
+    
+    def test_deletes_dispatch_to_delete_handlers(self, session):
+        events = []
+        self.install(session, events)
+        
+        session.delete(session.get(Resume, 11))
+        session.delete(session.get(Job, 1))
+        session.commit()
+        assert sorted(events, key=str) == [
+            ('job deleted', 1, 'Python backend developer Django postgresql python'),
+            ('resume deleted', 11, 'react frontend typescript engineer'),
+        ]
+        
+        # Created and deleted in one transaction: nothing to undo
+        session.add(Resume(id=13, skills=['go']))
+        session.flush()
+        session.delete(session.get(Resume, 13))
+        session.commit()
+        assert len(events) == 2
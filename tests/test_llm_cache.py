@@ -0,0 +1,81 @@
+"""Tests for the SQLite LLM response cache"""
+
+import asyncio
+import json
+import threading
+
+import pytest
+from services.llm_cache import LLMResponseCache
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return LLMResponseCache(str(tmp_path / 'llm.sqlite3'), cap_check_interval=1)
+
+
+class TestLLMResponseCache:
+    def test_key_covers_model_prompts_and_temperature(self, cache):
+        cache.put('gpt', 'sys', 'resume', 0.2, '{"a": 1}')
+        assert cache.get('gpt', 'sys', 'resume', 0.2) == '{"a": 1}'
+        assert cache.get('gpt', 'sys', 'resume', 0.7) is None
+        assert cache.get('gpt', 'other', 'resume', 0.2) is None
+        assert cache.get('yandex', 'sys', 'resume', 0.2) is None
+        stats = cache.get_stats()
+        assert (stats['hits'], stats['misses'], stats['entries']) == (1, 3, 1)
+    
+    def test_get_or_call_calls_once_and_skips_invalid(self, cache):
+        calls = []
+        
+        def call():
+            calls.append(1)
+            return '{"ok": true}'
+        
+        for _ in range(3):
+            assert cache.get_or_call('gpt', '', 'p', 0.0, call, validate=json.loads) == '{"ok": true}'
+        assert len(calls) == 1
+        
+        with pytest.raises(json.JSONDecodeError):
+            cache.get_or_call('gpt', '', 'bad', 0.0, lambda: 'not json', validate=json.loads)
+        assert cache.get('gpt', '', 'bad', 0.0) is None
+    
+    def test_ttl_and_size_cap(self, tmp_path):
+        cache = LLMResponseCache(str(tmp_path / 'llm.sqlite3'), ttl_seconds=-1)
+        cache.put('gpt', '', 'p', 0.0, 'x')
+        assert cache.get('gpt', '', 'p', 0.0) is None
+        assert cache.get_stats()['expired'] == 1
+        
+        capped = LLMResponseCache(str(tmp_path / 'capped.sqlite3'), max_entries=3, cap_check_interval=1,
+                                  touch_interval=0)
+        for i in range(5):
+            capped.put('gpt', '', f'p{i}', 0.0, str(i))
+        capped.get('gpt', '', 'p2', 0.0)
+        capped.put('gpt', '', 'p5', 0.0, '5')
+        assert capped.get_stats()['entries'] == 3
+        assert capped.get('gpt', '', 'p2', 0.0) == '2'
+        assert capped.get('gpt', '', 'p3', 0.0) is None
+    
+    def test_persists_and_is_thread_safe(self, tmp_path):
+        path = str(tmp_path / 'llm.sqlite3')
+        cache = LLMResponseCache(path)
+        threads = [threading.Thread(target=cache.put, args=('gpt', '', f'p{i}', 0.0, str(i))) for i in range(16)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert LLMResponseCache(path).get('gpt', '', 'p7', 0.0) == '7'
+    
+    def test_hits_do_not_wait_for_writers(self, cache):
+        cache.put('gpt', '', 'p', None, 'x')
+        with cache._write_lock:
+            # A fresh entry is served without touching last_access
+            assert cache.get('gpt', '', 'p', None) == 'x'
+            assert cache.get('gpt', '', 'missing', None) is None
+        assert cache.get('gpt', '', 'p', 0.0) is None
+    
+    def test_aget_or_call_stores_validated_response(self, cache):
+        async def call():
+            return '{"ok": true}'
+        
+        result = asyncio.run(cache.aget_or_call('gpt', '', 'p', None, call, validate=json.loads))
+        assert result == '{"ok": true}'
+        assert cache.get('gpt', '', 'p', None) == '{"ok": true}'
@@ -0,0 +1,115 @@
+"""Tests for LLMClient batch analysis against a local stub server"""
+
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from llm_client import LLMClient
+from services.llm_cache import LLMResponseCache
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Echoes the resume back as analysis JSON; fails the first hits per resume"""
+    
+    def log_message(self, *args):
+        pass
+    
+    def do_POST(self):
+        server = self.server
+        payload = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        resume = payload['messages'][1]['content'].split('\n\n')[1]
+        
+        with server.lock:
+            server.active += 1
+            server.peak = max(server.peak, server.active)
+            attempts = server.attempts.setdefault(resume, 0) + 1
+            server.attempts[resume] = attempts
+        try:
+            time.sleep(server.delay)
+            failures = server.failures.get(resume, 0)
+            if attempts <= failures:
+                self.send_response(429 if attempts % 2 else 503)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+            if resume == 'bad request':
+                self.send_response(400)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+            
+            content = json.dumps({'name': resume})
+            body = json.dumps({'choices': [{'message': {'content': content}}]}).encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        finally:
+            with server.lock:
+                server.active -= 1
+
+
+@pytest.fixture
+def stub_server():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubHandler)
+    server.lock = threading.Lock()
+    server.active = server.peak = 0
+    server.attempts = {}
+    server.failures = {}
+    server.delay = 0.02
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def client(stub_server, monkeypatch):
+    monkeypatch.setenv('PROXY_API_KEY', 'test-key')
+    monkeypatch.setenv('PROXY_API_BASE_URL', f'http://127.0.0.1:{stub_server.server_port}/v1')
+    return LLMClient(max_retries=3, backoff_base=0.01, backoff_max=0.05, timeout=5, use_cache=False)
+
+
+class TestAnalyzeResumes:
+    def test_results_in_input_order_with_bounded_concurrency(self, client, stub_server):
+        texts = [f'resume {i}' for i in range(20)]
+        results = asyncio.run(client.analyze_resumes(texts, concurrency=4))
+        assert [r['name'] for r in results] == texts
+        assert 1 < stub_server.peak <= 4
+    
+    def test_retries_rate_limits_and_server_errors(self, client, stub_server):
+        stub_server.failures = {'resume a': 2, 'resume b': 1}
+        results = asyncio.run(client.analyze_resumes(['resume a', 'resume b', 'resume c'], concurrency=2))
+        assert [r['name'] for r in results] == ['resume a', 'resume b', 'resume c']
+        assert stub_server.attempts == {'resume a': 3, 'resume b': 2, 'resume c': 1}
+    
+    def test_failures_are_returned_per_item(self, client, stub_server):
+        stub_server.failures = {'resume x': 10}
+        results = asyncio.run(client.analyze_resumes(['resume x', 'bad request', 'resume ok']))
+        assert isinstance(results[0], RuntimeError)
+        assert stub_server.attempts['resume x'] == 4
+        assert isinstance(results[1], RuntimeError)
+        assert stub_server.attempts['bad request'] == 1
+        assert results[2] == {'name': 'resume ok'}
+    
+    def test_sync_analyze_resume_uses_session(self, client):
+        assert client.analyze_resume('single') == {'name': 'single'}
+
+
+class TestResponseCache:
+    def test_repeated_resumes_skip_the_network(self, stub_server, monkeypatch, tmp_path):
+        monkeypatch.setenv('PROXY_API_KEY', 'test-key')
+        monkeypatch.setenv('PROXY_API_BASE_URL', f'http://127.0.0.1:{stub_server.server_port}/v1')
+        cache = LLMResponseCache(str(tmp_path / 'llm.sqlite3'))
+        client = LLMClient(timeout=5, cache=cache)
+        
+        assert client.analyze_resume('cached') == {'name': 'cached'}
+        results = asyncio.run(client.analyze_resumes(['cached', 'fresh']))
+        assert [r['name'] for r in results] == ['cached', 'fresh']
+        assert stub_server.attempts == {'cached': 1, 'fresh': 1}
+        assert cache.get_stats()['hits'] == 1
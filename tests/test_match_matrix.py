@@ -0,0 +1,77 @@
+"""Tests for the materialised match-matrix snapshots"""
+
+import os
+
+import numpy as np
+import pytest
+from app.services.match_matrix import MatchMatrixStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    return MatchMatrixStore(str(tmp_path / 'matrix'), refresh_interval=0)
+
+
+PAIRS = [
+    (1, 10, 0.9), (1, 11, 0.5), (1, 12, 0.7),
+    (2, 10, 0.65), (2, 12, 0.95),
+]
+
+
+class TestMatchMatrix:
+    def test_top_k_per_resume_and_job(self, store):
+        store.build(PAIRS, revision='r1', top_k=2)
+        snapshot = store.current('r1')
+        
+        assert snapshot.jobs_for_resume(1) == [(10, pytest.approx(0.9)), (12, pytest.approx(0.7))]
+        assert [job for job, _ in snapshot.jobs_for_resume(1, min_score=0.8)] == [10]
+        assert [resume for resume, _ in snapshot.resumes_for_job(12)] == [2, 1]
+        assert snapshot.jobs_for_resume(3) is None
+    
+    def test_matches_brute_force(self, store):
+        rng = np.random.default_rng(1)
+        resumes = rng.integers(1, 50, size=2000)
+        jobs = rng.integers(1, 80, size=2000)
+        pairs = {(int(r), int(j)): float(s) for r, j, s in zip(resumes, jobs, rng.random(2000))}
+        store.build([(r, j, s) for (r, j), s in pairs.items()], revision='r1', top_k=5)
+        snapshot = store.current('r1')
+        
+        for resume_id in range(1, 50):
+            expected = sorted(((j, s) for (r, j), s in pairs.items() if r == resume_id),
+                              key=lambda p: (-p[1], p[0]))[:5]
+            got = snapshot.jobs_for_resume(resume_id) or []
+            assert [j for j, _ in got] == [j for j, _ in expected]
+    
+    def test_revision_and_atomic_swap(self, store):
+        store.build(PAIRS, revision='r1')
+        assert store.current('r2') is None
+        first = store.current('r1')
+        
+        store.build([(1, 99, 0.99)], revision='r2')
+        assert store.current('r1') is None
+        assert store.current('r2').jobs_for_resume(1) == [(99, pytest.approx(0.99))]
+        # Readers that already hold the old snapshot keep working
+        assert first.jobs_for_resume(2)[0][0] == 12
+        
+        assert os.path.islink(store.current_link)
+        assert len(store.prune(keep=1)) == 1
+        assert store.current(None).revision == 'r2'
+    
+    def test_store_lookup_falls_back_when_truncated_stale_or_old(self, store):
+        store.build(PAIRS, revision='r1', top_k=2)
+        
+        # Resume 1 has three jobs; a full top-2 row cannot vouch for min_score 0.4
+        assert store.jobs_for_resume(1, min_score=0.4, revision='r1') is None
+        assert [j for j, _ in store.jobs_for_resume(1, min_score=0.8, revision='r1')] == [10]
+        assert store.jobs_for_resume(1, min_score=0.8, revision='r1', max_age=-1) is None
+        
+        store.invalidate('resume', 2)
+        assert store.jobs_for_resume(2, min_score=0.9, revision='r1') is None
+        assert store.jobs_for_resume(1, min_score=0.8, revision='r1') is not None
+        store.invalidate('job', 10)
+        assert store.jobs_for_resume(1, min_score=0.8, revision='r1') is None
+        
+        # A rebuild covers the recorded changes
+        store.build(PAIRS, revision='r1', top_k=2)
+        assert store.jobs_for_resume(2, min_score=0.9, revision='r1') == [(12, pytest.approx(0.95))]
+        assert open(store.invalidations_path).read() == ''
@@ -0,0 +1,52 @@
+"""Tests for the chunked match_candidates task"""
+
+from unittest.mock import Mock
+
+import numpy as np
+import pytest
+from scipy import sparse
+
+import app.tasks.matching as matching
+
+
+class FakeVectorizer:
+    def transform(self, texts):
+        return sparse.csr_matrix(np.ones((len(texts), 1)))
+
+
+@pytest.fixture
+def stubbed(monkeypatch):
+    """Stub the DB-facing pieces; the third candidate fails on the first pass."""
+    calls = {'after_ids': [], 'upserted': [], 'failed': False}
+
+    def iter_chunks(chunk_size, after_id=0, until_id=None):
+        calls['after_ids'].append(after_id)
+        ids = [i for i in range(1, 5) if i > after_id]
+        for start in range(0, len(ids), chunk_size):
+            chunk = ids[start:start + chunk_size]
+            if 3 in chunk and not calls['failed']:
+                calls['failed'] = True
+                raise RuntimeError('connection reset')
+            yield [(candidate_id, 'python', '') for candidate_id in chunk]
+
+    monkeypatch.setattr(matching, 'Job', Mock(query=Mock(get=Mock(return_value=Mock(description='python',
+                                                                                        requirements='')))))
+    monkeypatch.setattr(matching, '_fitted_vectorizer', lambda job_text, chunk_size: FakeVectorizer())
+    monkeypatch.setattr(matching, '_iter_candidate_chunks', iter_chunks)
+    monkeypatch.setattr(matching, 'upsert_matches',
+                        lambda session, rows, model: calls['upserted'].extend(r['resume_id'] for r in rows))
+    monkeypatch.setattr(matching, 'get_match_matrix', Mock())
+    monkeypatch.setattr(matching, 'log_service_operation', Mock())
+    monkeypatch.setattr('app.db', Mock(), raising=False)
+    return calls
+
+
+class TestMatchCandidatesRetry:
+    def test_positional_delay_retries_and_resumes_after_last_chunk(self, stubbed):
+        # Same call shape as the webhook's match_candidates.delay(job_id)
+        result = matching.match_candidates.apply(args=(7,), kwargs={'chunk_size': 2}).get()
+
+        assert stubbed['after_ids'] == [0, 2]
+        assert stubbed['upserted'] == [1, 2, 3, 4]
+        assert result['matches_created'] == 4
+        assert result['job_id'] == 7
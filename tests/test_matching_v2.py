@@ -101,3 +101,360 @@ class TestMatchingServiceV2:
         matches = service.batch_calculate_matches(candidates, test_job)
         assert len(matches) == 10
         assert matches[0].final_score >= matches[-1].final_score  # Sorted by score
+    
+    def test_find_jobs_for_candidate_sorted(self, service, perfect_candidate, test_job):
+        """Candidate is encoded once and ranked against every job"""
+        office_job = dict(test_job, id=2, salary=50000)
+        matches = service.find_jobs_for_candidate(perfect_candidate, [office_job, test_job])
+        assert [m.job_id for m in matches] == [1, 2]
+
+
+class TestVectorizedBatchScoring:
+    SKILLS = ['python', 'java', 'go', 'sql', 'docker', 'react']
+    LEVELS = ['junior', 'middle', 'senior', 'lead', 'principal', 'unknown']
+    
+    @pytest.fixture
+    def service(self):
+        return MatchingServiceV2()
+    
+    @staticmethod
+    def _random_candidate(rng, i):
+        skills = [
+            {'name': name.title(), 'years': rng.randint(0, 12)} if rng.random() < 0.8 else name
+            for name in rng.sample(TestVectorizedBatchScoring.SKILLS, rng.randint(0, 5))
+        ]
+        enriched = {
+            'skills': skills,
+            'seniority_level': rng.choice(TestVectorizedBatchScoring.LEVELS),
+            'total_years_experience': rng.randint(0, 15),
+            'remote_preference': rng.choice([True, False, None]),
+            'learning_ability': rng.random(),
+        }
+        if rng.random() < 0.7:
+            enriched['salary_expectation'] = rng.choice([0, 50000, 100000, 130000, 170000, 250000])
+        return {'id': i, 'name': f'Candidate {i}', 'enriched_data': enriched}
+    
+    @staticmethod
+    def _random_job(rng, i):
+        required = [
+            {'name': name.title(), 'level': rng.randint(1, 5), 'required': rng.random() < 0.6}
+            for name in rng.sample(TestVectorizedBatchScoring.SKILLS, rng.randint(0, 4))
+        ]
+        enriched = {
+            'skills_required': required,
+            'seniority_level': rng.choice([None, 1, 2, 3, 4, 5]),
+            'years_required': rng.choice([0, 2, 5, 8]),
+            'remote_policy': rng.choice(['remote', 'office', 'hybrid', None]),
+            'hard_requirements': [{'name': r['name']} for r in required if rng.random() < 0.3],
+        }
+        if enriched['seniority_level'] is None:
+            del enriched['seniority_level']
+        return {'id': i, 'salary': rng.choice([0, 100000, 150000]), 'enriched_data': enriched}
+    
+    def test_batch_scores_match_scalar_path(self, service):
+        """Vectorized engine reproduces calculate_match factor by factor"""
+        import random
+        rng = random.Random(42)
+        candidates = [self._random_candidate(rng, i) for i in range(200)]
+        matrix = service.encode_candidates(candidates)
+        
+        for j in range(25):
+            job = self._random_job(rng, j)
+            scores = service.score_batch(matrix, job)
+            for i, candidate in enumerate(candidates):
+                expected = service.calculate_match(candidate, job).breakdown
+                actual = service._breakdown_from_batch(scores, i)
+                for field in ('skill_match', 'seniority_match', 'experience_match', 'culture_fit',
+                              'growth_potential', 'salary_compatibility', 'final_score'):
+                    assert getattr(actual, field) == pytest.approx(getattr(expected, field), abs=1e-9)
+                assert actual.recommendation == expected.recommendation
+    
+    def test_score_jobs_match_scalar_path(self, service):
+        """One candidate against many jobs reproduces calculate_match per job"""
+        import random
+        rng = random.Random(7)
+        jobs = [self._random_job(rng, j) for j in range(60)]
+        
+        for i in range(20):
+            candidate = self._random_candidate(rng, i)
+            scores = service.score_jobs(candidate, jobs)
+            for j, job in enumerate(jobs):
+                expected = service.calculate_match(candidate, job).breakdown
+                actual = service._breakdown_from_batch(scores, j)
+                for field in ('skill_match', 'seniority_match', 'experience_match', 'culture_fit',
+                              'growth_potential', 'salary_compatibility', 'final_score'):
+                    assert getattr(actual, field) == pytest.approx(getattr(expected, field), abs=1e-9)
+        assert len(service.score_jobs(candidate, []).final_score) == 0
+
+
+class TestTwoPhaseMatching:
+    @pytest.fixture
+    def service(self):
+        return MatchingServiceV2()
+    
+    @pytest.fixture
+    def job(self):
+        return {
+            'id': 7,
+            'salary': 120000,
+            'enriched_data': {
+                'skills_required': [{'name': 'Python', 'level': 2, 'required': True}],
+                'seniority_level': 2,
+                'years_required': 3,
+            }
+        }
+    
+    @pytest.fixture
+    def candidates(self):
+        return [
+            {'id': i, 'name': f'Candidate {i}', 'enriched_data': {
+                'skills': [{'name': 'Python', 'years': i}],
+                'seniority_level': 'mid',
+                'total_years_experience': i,
+            }}
+            for i in range(20)
+        ]
+    
+    def test_ranking_skips_narrative(self, service, job, candidates, monkeypatch):
+        """rank_candidates never builds explanations"""
+        def fail(*args, **kwargs):
+            raise AssertionError("narrative generated during ranking")
+        monkeypatch.setattr(service, '_generate_explanation', fail)
+        monkeypatch.setattr(service, '_generate_interview_questions', fail)
+        
+        ranked = service.rank_candidates(candidates, job, limit=5)
+        assert len(ranked) == 5
+        assert ranked[0].final_score >= ranked[-1].final_score
+    
+    def test_narrative_only_for_limit(self, service, job, candidates, monkeypatch):
+        """batch_calculate_matches explains only the top results"""
+        calls = []
+        original = service._generate_explanation
+        monkeypatch.setattr(service, '_generate_explanation',
+                            lambda *args: calls.append(args) or original(*args))
+        
+        matches = service.batch_calculate_matches(candidates, job, limit=3)
+        assert len(matches) == 3
+        assert len(calls) == 3
+    
+    def test_explain_matches_scalar_result(self, service, job, candidates):
+        """Explaining a ranked match yields the same DetailedMatch as calculate_match"""
+        ranked = service.rank_candidates(candidates, job, limit=1)[0]
+        detailed = service.explain_match(ranked)
+        expected = service.calculate_match(ranked.candidate, job)
+        assert detailed.explanation == expected.explanation
+        assert detailed.interview_questions == expected.interview_questions
+        assert detailed.final_score == pytest.approx(expected.final_score)
+
+
+class TestCompiledCandidates:
+    @pytest.fixture
+    def service(self):
+        return MatchingServiceV2(profile_cache_size=2)
+    
+    @pytest.fixture
+    def job(self):
+        return {
+            'id': 1,
+            'salary': 150000,
+            'enriched_data': {
+                'skills_required': [{'name': 'Python', 'level': 3, 'required': True}],
+                'seniority_level': 3,
+                'years_required': 5,
+            }
+        }
+    
+    @staticmethod
+    def _candidate(candidate_id, years=8, updated_at='2026-01-01'):
+        return {
+            'id': candidate_id,
+            'name': f'Dev {candidate_id}',
+            'updated_at': updated_at,
+            'enriched_data': {
+                'skills': [{'name': 'Python', 'years': years}],
+                'seniority_level': 'senior',
+                'total_years_experience': 10,
+            }
+        }
+    
+    def test_compiled_candidate_scores_like_dict(self, service, job):
+        candidate = self._candidate(1)
+        compiled = service.compile_candidate(candidate)
+        assert compiled.skills == {'python': 5}
+        assert service.calculate_match(compiled, job).final_score == pytest.approx(
+            service.calculate_match(candidate, job).final_score)
+        assert service.rank_candidates([compiled], job)[0].resume_id == 1
+    
+    def test_cache_hit_and_updated_at_invalidation(self, service):
+        first = service.compile_candidate(self._candidate(1))
+        assert service.compile_candidate(self._candidate(1)) is first
+        
+        changed = service.compile_candidate(self._candidate(1, years=1, updated_at='2026-02-01'))
+        assert changed is not first
+        assert changed.skills == {'python': 1}
+        assert service.profile_cache.stats['hits'] == 1
+        assert service.profile_cache.stats['misses'] == 2
+    
+    def test_content_hash_used_without_updated_at(self, service):
+        candidate = self._candidate(1, updated_at=None)
+        first = service.compile_candidate(candidate)
+        assert service.compile_candidate(dict(candidate)) is first
+        
+        candidate['enriched_data']['skills'][0]['years'] = 2
+        assert service.compile_candidate(candidate) is not first
+    
+    def test_encode_candidates_uses_profile_cache(self, service):
+        candidate = self._candidate(1)
+        service.encode_candidates([candidate])
+        service.encode_candidates([dict(candidate)])
+        assert service.profile_cache.stats == {'hits': 1, 'misses': 1, 'evictions': 0}
+        assert service.profile_cache.entries[1][1].content_hash is None
+    
+    def test_lru_eviction(self, service):
+        service.compile_candidates([self._candidate(i) for i in range(3)])
+        assert len(service.profile_cache) == 2
+        assert service.profile_cache.stats['evictions'] == 1
+        assert 0 not in service.profile_cache.entries
+
+
+class TestSkillIndexPrefilter:
+    @pytest.fixture
+    def service(self):
+        return MatchingServiceV2()
+    
+    @pytest.fixture
+    def candidates(self):
+        stacks = [['Python', 'SQL'], ['Python'], ['Java', 'SQL'], ['python', 'sql', 'Docker'], []]
+        return [
+            {'id': i, 'name': f'Dev {i}', 'updated_at': '2026-01-01T00:00:00', 'enriched_data': {
+                'skills': [{'name': s, 'years': 4} for s in stack],
+                'seniority_level': 'mid',
+            }}
+            for i, stack in enumerate(stacks)
+        ]
+    
+    @pytest.fixture
+    def job(self):
+        return {'id': 1, 'enriched_data': {
+            'skills_required': [{'name': 'Python', 'level': 2}],
+            'hard_requirements': [{'name': 'Python'}, {'name': 'SQL'}],
+        }}
+    
+    def test_eligible_ids_intersect_postings(self, service, candidates, job):
+        for candidate in candidates:
+            service.index_candidate(candidate)
+        assert service.eligible_candidate_ids(job).tolist() == [0, 3]
+        assert service.eligible_candidate_ids({'enriched_data': {}}) is None
+    
+    def test_incremental_update_and_remove(self, service, candidates, job):
+        for candidate in candidates:
+            service.index_candidate(candidate)
+        candidates[1]['enriched_data']['skills'].append('SQL')
+        service.index_candidate(candidates[1])
+        service.unindex_candidate(3)
+        assert service.eligible_candidate_ids(job).tolist() == [0, 1]
+    
+    def test_prefiltered_ranking_matches_full_ranking(self, service, candidates, job):
+        for candidate in candidates[:-1]:
+            service.index_candidate(candidate)
+        
+        full = [m for m in service.rank_candidates(candidates, job) if m.eligible]
+        filtered = service.rank_candidates(candidates, job, use_skill_index=True)
+        # Unindexed candidate 4 is kept and rejected by the scorer
+        assert [m.resume_id for m in filtered if m.eligible] == [m.resume_id for m in full]
+        assert {m.resume_id for m in filtered} == {0, 3, 4}
+
+    def test_stale_or_unversioned_entries_are_kept(self, service, candidates, job):
+        for candidate in candidates:
+            service.index_candidate(candidate)
+        # Another process gave candidate 1 SQL; this index still has the old skills
+        updated = dict(candidates[1], updated_at='2026-02-01T00:00:00')
+        unversioned = {k: v for k, v in candidates[2].items() if k != 'updated_at'}
+        kept = service.prefilter_candidates([candidates[0], updated, unversioned, candidates[4]], job)
+        assert [c['id'] for c in kept] == [0, 1, 2]
+    
+    @pytest.fixture
+    def resume_db(self):
+        from datetime import datetime
+        from sqlalchemy import Column, DateTime, Integer, JSON, create_engine
+        from sqlalchemy.orm import declarative_base, sessionmaker
+        
+        Base = declarative_base()
+        
+        class Resume(Base):
+            __tablename__ = 'resumes'
+            id = Column(Integer, primary_key=True)
+            skills = Column(JSON)
+            updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+        
+        engine = create_engine('sqlite://')
+        Base.metadata.create_all(engine)
+        return Resume, sessionmaker(bind=engine)
+    
+    def test_build_from_db_versions_entries(self, service, job, resume_db):
+        from app.services.skill_index import build_skill_index
+        Resume, Session = resume_db
+        session = Session()
+        session.add_all([Resume(id=i, skills=skills) for i, skills in
+                         enumerate([['Python', 'SQL'], ['Python'], ['python', 'sql']], 1)])
+        session.commit()
+        
+        assert build_skill_index(service, session, resume_model=Resume, chunk_size=2) == 3
+        assert service.eligible_candidate_ids(job).tolist() == [1, 3]
+        row = session.get(Resume, 2)
+        assert service.skill_index.version(2) == str(row.updated_at)
+    
+    def test_commit_hooks_keep_index_current(self, service, job, resume_db):
+        from app.services.skill_index import install_skill_index_hooks
+        Resume, Session = resume_db
+        install_skill_index_hooks(service, Session, resume_model=Resume)
+        
+        session = Session()
+        session.add_all([Resume(id=1, skills=['Python', 'SQL']), Resume(id=2, skills=['Python'])])
+        session.commit()
+        assert service.eligible_candidate_ids(job).tolist() == [1]
+        
+        session.get(Resume, 2).skills = ['Python', 'SQL']
+        session.delete(session.get(Resume, 1))
+        session.commit()
+        assert service.eligible_candidate_ids(job).tolist() == [2]
+        assert service.skill_index.version(2) == str(session.get(Resume, 2).updated_at)
+        
+        session.add(Resume(id=3, skills=['Python', 'SQL']))
+        session.flush()
+        session.rollback()
+        assert service.eligible_candidate_ids(job).tolist() == [2]
+
+
+class TestTopKSelection:
+    def test_top_k_indices_matches_stable_sort(self):
+        import random
+        from app.services.ranking import top_k_indices
+        rng = random.Random(7)
+        scores = [rng.choice([0.0, 0.25, 0.5, 0.75, 1.0]) for _ in range(300)]
+        expected = sorted(range(len(scores)), key=lambda i: scores[i], reverse=True)
+        
+        for k in (1, 5, 37, 299, 300, None):
+            assert top_k_indices(scores, k).tolist() == expected[:k]
+        assert top_k_indices(scores, 10, min_score=0.75).tolist() == [
+            i for i in expected if scores[i] >= 0.75][:10]
+    
+    def test_heap_keeps_best_and_skips_floor(self):
+        from app.services.ranking import TopKHeap
+        heap = TopKHeap(k=2, min_score=0.3)
+        for name, score in [('a', 0.5), ('b', 0.2), ('c', 0.9), ('d', 0.5), ('e', 0.7)]:
+            heap.push(score, name)
+        assert heap.items() == ['c', 'e']
+        assert not heap.would_accept(0.6)
+    
+    def test_batch_limit_and_min_score(self):
+        service = MatchingServiceV2()
+        job = {'id': 1, 'enriched_data': {'years_required': 10}}
+        candidates = [
+            {'id': i, 'enriched_data': {'total_years_experience': i, 'seniority_level': 'senior'}}
+            for i in range(12)
+        ]
+        matches = service.batch_calculate_matches(candidates, job, limit=3, min_score=0.0)
+        assert [m.resume_id for m in matches] == [10, 11, 9]
+        floor = service.batch_calculate_matches(candidates, job, min_score=matches[-1].final_score)
+        assert [m.resume_id for m in floor] == [10, 11, 9]
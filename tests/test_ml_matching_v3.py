@@ -0,0 +1,172 @@
+"""Tests for ML matching service v3"""
+
+import pytest
+from app.services.ml_matching_service_v3 import MLMatchingServiceV3, MatchScore
+
+
+class TestMLMatchingServiceV3:
+    @pytest.fixture
+    def service(self):
+        service = MLMatchingServiceV3(min_score_threshold=0.0)
+        service.initialize_skill_vocab(['python', 'java', 'sql', 'docker', 'react', 'go'])
+        return service
+    
+    @pytest.fixture
+    def candidate(self):
+        return {
+            'id': 'c1',
+            'skills': ['python', 'sql', 'docker'],
+            'years_experience': 6,
+            'experience_level': 'senior',
+            'company_values': ['ownership', 'remote'],
+        }
+    
+    @pytest.fixture
+    def jobs(self):
+        stacks = [['python', 'sql'], ['java'], ['python', 'docker', 'sql'], ['react', 'go'], ['python']]
+        return [
+            {
+                'id': f'j{i}',
+                'skills': stack,
+                'years_experience': 3 + i,
+                'experience_level': ['junior', 'mid', 'senior', 'lead', 'senior'][i],
+                'company_values': ['ownership'],
+            }
+            for i, stack in enumerate(stacks)
+        ]
+    
+    def test_match_candidate_to_job(self, service, candidate, jobs):
+        match = service.match_candidate_to_job(candidate, jobs[2])
+        assert isinstance(match, MatchScore)
+        assert match.component_scores['skills'] == pytest.approx(1.0)
+        assert 0.0 <= match.overall_score <= 1.0
+    
+    def test_get_top_matches_ordering(self, service, candidate, jobs):
+        expected = sorted(jobs, key=lambda job: service._score_components(candidate, job)[-1], reverse=True)
+        top = service.get_top_matches(candidate, jobs, top_k=3)
+        assert [m.job_id for m in top] == [job['id'] for job in expected[:3]]
+    
+    def test_get_top_matches_builds_only_top_k(self, service, candidate, jobs):
+        service.get_top_matches(candidate, jobs, top_k=2)
+        assert len(service.match_cache) == 2
+    
+    def test_min_score_threshold(self, service, candidate, jobs):
+        service.min_score_threshold = 0.999
+        assert service.get_top_matches(candidate, jobs) == []
+    
+    def test_batch_matches_scalar_path(self, service, candidate, jobs):
+        """Batched grid scoring agrees with match_candidate_to_job"""
+        other = dict(candidate, id='c2', skills=['java', 'react'], company_values=[], experience_level='junior')
+        batch = service.get_top_matches_batch([candidate, other], jobs, top_k=3)
+        
+        scalar_service = MLMatchingServiceV3(min_score_threshold=0.0)
+        scalar_service.initialize_skill_vocab(service.skill_extractor.skill_vocab)
+        for row, profile in zip(batch, [candidate, other]):
+            expected = scalar_service.get_top_matches(profile, jobs, top_k=3)
+            assert [m.job_id for m in row] == [m.job_id for m in expected]
+            for actual, want in zip(row, expected):
+                assert actual.overall_score == pytest.approx(want.overall_score)
+                assert actual.component_scores == pytest.approx(want.component_scores)
+    
+    def test_batch_requires_vocab(self, candidate, jobs):
+        with pytest.raises(ValueError):
+            MLMatchingServiceV3().get_top_matches_batch([candidate], jobs)
+
+
+class TestSparseSkillFeatures:
+    VOCAB = ['python', 'java', 'sql', 'docker', 'react', 'go']
+    
+    def test_sparse_rows_match_dense(self):
+        from app.services.ml_matching_service_v3 import SkillFeatureExtractor
+        dense = SkillFeatureExtractor(self.VOCAB)
+        sparse = SkillFeatureExtractor(self.VOCAB, sparse=True)
+        profile = {'skills': ['sql', 'python', 'unknown', 'sql']}
+        
+        assert sparse.extract(profile).toarray().ravel().tolist() == dense.extract(profile).tolist()
+        assert sparse.extract_indices(profile).tolist() == [0, 2]
+        assert sparse.extract_indices(profile).dtype.name == 'uint32'
+        
+        matrix = sparse.extract_matrix([profile, {'skills': []}, {'skills': ['go']}])
+        assert matrix.shape == (3, len(self.VOCAB))
+        assert matrix.toarray()[2].tolist() == dense.extract({'skills': ['go']}).tolist()
+    
+    def test_vocab_persistence_keeps_ids(self, tmp_path):
+        from app.services.ml_matching_service_v3 import SkillFeatureExtractor
+        extractor = SkillFeatureExtractor(self.VOCAB, sparse=True)
+        extractor.add_skills(['rust', 'python'])
+        path = str(tmp_path / 'vocab.json')
+        extractor.save_vocab(path)
+        
+        restored = SkillFeatureExtractor.load_vocab(path, sparse=True)
+        assert restored.encode(['rust', 'java']).tolist() == extractor.encode(['rust', 'java']).tolist() == [1, 6]
+        assert restored.decode([6]) == ['rust']
+    
+    def test_sparse_service_scores_like_dense(self):
+        profile = {'id': 1, 'skills': ['python', 'sql'], 'years_experience': 4, 'experience_level': 'mid'}
+        job = {'id': 2, 'skills': ['python', 'docker'], 'years_experience': 5, 'experience_level': 'senior'}
+        dense, sparse = MLMatchingServiceV3(), MLMatchingServiceV3()
+        dense.initialize_skill_vocab(self.VOCAB)
+        sparse.initialize_skill_vocab(self.VOCAB, sparse=True)
+        assert sparse.match_candidate_to_job(profile, job).overall_score == pytest.approx(
+            dense.match_candidate_to_job(profile, job).overall_score)
+
+
+class TestMatchCache:
+    @pytest.fixture
+    def service(self):
+        service = MLMatchingServiceV3(min_score_threshold=0.0, cache_max_entries=2, cache_ttl_seconds=60)
+        service.initialize_skill_vocab(['python', 'java', 'sql'])
+        return service
+    
+    @staticmethod
+    def _job(i):
+        return {'id': i, 'skills': ['python'], 'years_experience': i, 'experience_level': 'mid'}
+    
+    def test_hits_and_profile_change(self, service):
+        candidate = {'id': 1, 'skills': ['python'], 'years_experience': 3}
+        first = service.match_candidate_to_job(candidate, self._job(1))
+        assert service.match_candidate_to_job(dict(candidate), self._job(1)) is first
+        
+        candidate['skills'] = ['java']
+        changed = service.match_candidate_to_job(candidate, self._job(1))
+        assert changed is not first
+        assert changed.component_scores['skills'] == 0.0
+        stats = service.get_cache_stats()
+        assert (stats['hits'], stats['misses']) == (1, 2)
+    
+    def test_lru_eviction(self, service):
+        candidate = {'id': 1, 'skills': ['python']}
+        for i in range(3):
+            service.match_candidate_to_job(candidate, self._job(i))
+        assert len(service.match_cache) == 2
+        assert service.get_cache_stats()['evictions'] == 1
+    
+    def test_ttl_expiry(self, service, monkeypatch):
+        import app.services.ml_matching_service_v3 as module
+        now = [1000.0]
+        monkeypatch.setattr(module.time, 'monotonic', lambda: now[0])
+        candidate = {'id': 1, 'skills': ['python']}
+        first = service.match_candidate_to_job(candidate, self._job(1))
+        now[0] += 61
+        assert service.match_candidate_to_job(candidate, self._job(1)) is not first
+        assert service.get_cache_stats()['expirations'] == 1
+    
+    def test_batch_results_stream(self, service):
+        candidate = {'id': 1, 'skills': ['python']}
+        service.match_candidate_to_job(candidate, self._job(1))
+        results = service.get_batch_results()
+        assert not isinstance(results, dict)
+        assert [r['job_id'] for r in results] == [1]
+    
+    def test_each_profile_hashed_once_per_call(self, service, monkeypatch):
+        hashed = []
+        original = MLMatchingServiceV3._content_hash
+        monkeypatch.setattr(MLMatchingServiceV3, '_content_hash',
+                            staticmethod(lambda profile: hashed.append(profile['id']) or original(profile)))
+        candidate = {'id': 'c', 'skills': ['python']}
+        service.get_top_matches(candidate, [self._job(1), self._job(2)], top_k=2)
+        assert sorted(hashed, key=str) == [1, 2, 'c']
+        
+        hashed.clear()
+        service.match_candidate_to_job(candidate, self._job(3))
+        assert sorted(hashed, key=str) == [3, 'c']
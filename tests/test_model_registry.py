@@ -0,0 +1,42 @@
+"""Tests for the lazy process-wide model registry"""
+
+import threading
+import time
+
+from services.model_registry import ModelRegistry
+
+
+class TestModelRegistry:
+    def test_lazy_single_load_across_threads(self):
+        loads = []
+        
+        def loader(name):
+            loads.append(name)
+            time.sleep(0.05)
+            return object()
+        
+        registry = ModelRegistry(default_loader=loader)
+        assert not registry.is_loaded('mini')
+        
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(registry.get('mini'))) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        assert loads == ['mini']
+        assert len({id(model) for model in results}) == 1
+        assert registry.is_loaded('mini')
+    
+    def test_preload_and_stats(self):
+        registry = ModelRegistry(default_loader=lambda name: bytearray(1024 * 1024))
+        registry.register('custom', lambda name: {'name': name})
+        registry.preload(['a', 'custom'])
+        
+        stats = registry.get_stats()
+        assert set(stats) == {'a', 'custom'}
+        assert stats['a']['load_seconds'] >= 0
+        assert 'rss_delta_bytes' in stats['a']
+        assert registry.get('custom') == {'name': 'custom'}
+        assert registry.unload('a') and not registry.is_loaded('a')
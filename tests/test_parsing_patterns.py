@@ -0,0 +1,54 @@
+"""Tests for the precompiled parsing pattern registry"""
+
+import random
+import re
+
+from app.services.parsing import patterns
+
+GROUPS = [patterns.EXPERIENCE, patterns.ROLES, patterns.EDUCATION, patterns.LANGUAGES,
+          patterns.SENIORITY, patterns.BENEFITS, patterns.SALARY_MIN]
+
+WORDS = ['Senior', 'LEAD', 'lead', '10+ years', '5+ yrs', 'mba', 'bachelor', 'b.s.', 'english', 'рус',
+         'fully remote', 'flexible', 'health insurance', 'mental health', 'bonus', '$120k', '150 usd',
+         'from $90', 'experience', '7 years of experience', 'опыт от 5', 'qa', 'product manager',
+         'data science', 'doctor', 'ui', 'x', 'and', '-', '$', '2024']
+
+
+def reference_first(group, text):
+    """Per-pattern loop as the parsers used to do it"""
+    for label, sources in group.alternatives:
+        for source in sources:
+            matches = re.findall(source, text, re.IGNORECASE)
+            if matches:
+                return label, matches[0]
+    return None
+
+
+def reference_found(group, text):
+    return [label for label, sources in group.alternatives
+            if any(re.search(source, text, re.IGNORECASE) for source in sources)]
+
+
+class TestPatternGroup:
+    def test_matches_per_call_ignorecase_loop(self):
+        rng = random.Random(0)
+        for _ in range(500):
+            text = ' '.join(rng.choice(WORDS) for _ in range(rng.randint(0, 12)))
+            for group in GROUPS:
+                # Case-sensitive groups are fed lowercased text, as the parsers do
+                subject = text if group.flags & re.IGNORECASE else text.lower()
+                assert group.found_ordered(subject) == reference_found(group, text)
+                found = group.first(subject)
+                expected = reference_first(group, text)
+                if expected is None:
+                    assert found is None
+                else:
+                    assert found[0] == expected[0]
+                    if len(group.alternatives[group.labels.index(found[0])][1]) == 1:
+                        assert group.value(found[1]) == expected[1]
+
+    def test_value_without_capture_is_whole_match(self):
+        group = patterns.PatternGroup([('a', r'fo+'), ('b', r'(\d+)px')])
+        label, match = group.first('size 12px, fooo')
+        assert (label, group.value(match)) == ('a', 'fooo')
+        assert group.value(group.first('12px')[1]) == '12'
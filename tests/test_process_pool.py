@@ -0,0 +1,30 @@
+"""Tests for the per-process worker pools"""
+
+import pytest
+from utils import process_pool
+
+
+@pytest.fixture(autouse=True)
+def clean_pools():
+    yield
+    process_pool.shutdown_process_pool()
+
+
+class TestProcessPool:
+    def test_pool_reused_until_size_changes(self):
+        assert process_pool.pool_map('t', 2, abs, [-1, -2, 3]) == [1, 2, 3]
+        pool = process_pool.get_process_pool('t', 2)
+        assert process_pool.get_process_pool('t', 2) is pool
+        assert process_pool.get_process_pool('t', 3) is not pool
+    
+    def test_inherited_pool_is_not_reused(self, monkeypatch):
+        pool = process_pool.get_process_pool('t', 2)
+        monkeypatch.setattr(process_pool.os, 'getpid', lambda: -1)
+        assert process_pool.get_process_pool('t', 2) is not pool
+        monkeypatch.undo()
+        pool.shutdown()
+    
+    def test_shutdown_drops_pool(self):
+        process_pool.get_process_pool('t', 2)
+        process_pool.shutdown_process_pool('t')
+        assert 't' not in process_pool._pools
@@ -0,0 +1,65 @@
+"""Tests for ResumeParserAdvanced's shared parse context"""
+
+from app.services.parsing.resume_parser_advanced import ResumeParserAdvanced
+from app.services.parsing.skill_extractor import SkillExtractor
+
+RESUME = """Senior Backend Engineer, 7 years of experience.
+Python, Django, PostgreSQL, Docker, K8s and AWS. Python daily.
+Master of Computer Science. English, Russian."""
+
+
+class CountingExtractor(SkillExtractor):
+    def __init__(self):
+        super().__init__()
+        self.calls = 0
+
+    def count_mentions(self, text_lower):
+        self.calls += 1
+        return super().count_mentions(text_lower)
+
+
+class TestResumeParserAdvanced:
+    def test_skills_extracted_once_and_shared(self):
+        parser = ResumeParserAdvanced()
+        parser.skill_extractor = CountingExtractor()
+        result = parser.parse(RESUME)
+
+        assert parser.skill_extractor.calls == 1
+        assert result['parsing_status'] == 'success'
+        assert result['skills'][0]['name'] == 'Python'
+        assert 'Kubernetes' in result['tech_stack']['tools']
+        assert result['experience_years'] == 7
+        assert result['primary_role'] == 'Backend Engineer'
+        assert {'type': 'master', 'found': True} in result['education']
+        assert result['languages'][:2] == ['English', 'Russian']
+
+    def test_stage_timings_reported(self):
+        result = ResumeParserAdvanced().parse(RESUME)
+        assert set(result['stage_timings_ms']) == {
+            'skills', 'experience_years', 'primary_role', 'tech_stack',
+            'education', 'languages', 'confidence_score'}
+        assert all(ms >= 0 for ms in result['stage_timings_ms'].values())
+
+    def test_empty_text_reports_error(self):
+        result = ResumeParserAdvanced().parse('   ')
+        assert result['parsing_status'] == 'error'
+        assert 'stage_timings_ms' not in result
+
+    def test_parse_many_keeps_order_and_per_document_status(self):
+        texts = [RESUME, '', 'Junior QA engineer, 1 year. Selenium, Java.', RESUME.replace('Python', 'Rust')] * 5
+        serial = ResumeParserAdvanced().parse_many(texts, workers=1)
+        pooled = ResumeParserAdvanced().parse_many(texts, workers=2, chunk_size=3)
+
+        assert [r['parsing_status'] for r in pooled] == ['success', 'error', 'success', 'success'] * 5
+        strip = lambda r: {k: v for k, v in r.items() if k not in ('parsed_at', 'stage_timings_ms')}
+        assert [strip(r) for r in pooled] == [strip(r) for r in serial]
+        assert ResumeParserAdvanced().parse_many([]) == []
+
+    def test_parse_many_reuses_one_pool(self):
+        from utils import process_pool
+        parser = ResumeParserAdvanced()
+        parser.parse_many([RESUME] * 4, workers=2, chunk_size=1)
+        pool = process_pool._pools['resume_parser'][2]
+        parser.parse_many([RESUME] * 4, workers=2, chunk_size=1)
+        assert process_pool._pools['resume_parser'][2] is pool
+        process_pool.shutdown_process_pool('resume_parser')
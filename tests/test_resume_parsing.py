@@ -186,6 +186,34 @@ class TestResumeParsingAPI:
             assert deleted_resume is None
 
 
+    @pytest.mark.parametrize('body', [
+        None,
+        {'resume_ids': []},
+        {'resume_ids': '1,2'},
+        {'resume_ids': [1, 'abc']},
+        {'resume_ids': [1, -2]},
+        {'resume_ids': [True]},
+        {'resume_ids': [1], 'workers': 0},
+        {'resume_ids': [1], 'workers': 'many'},
+    ])
+    def test_batch_parsing_rejects_bad_input(self, client, body):
+        """Test POST /api/resumes/parse-batch returns 400 on malformed input."""
+        with patch('app.routes.resume_parsing.parse_resumes_batch') as task:
+            response = client.post('/api/resumes/parse-batch', json=body)
+        assert response.status_code == 400
+        task.delay.assert_not_called()
+    
+    def test_batch_parsing_clamps_workers(self, client):
+        """Test POST /api/resumes/parse-batch caps workers at PARSE_MAX_WORKERS."""
+        with patch('app.routes.resume_parsing.parse_resumes_batch') as task, \
+                patch('app.routes.resume_parsing.settings.PARSE_MAX_WORKERS', 2):
+            task.delay.return_value = Mock(id='task-1')
+            response = client.post('/api/resumes/parse-batch',
+                                   json={'resume_ids': [3, '4'], 'workers': 64})
+        assert response.status_code == 202
+        task.delay.assert_called_once_with([3, 4], workers=2)
+
+
 class TestResumeEducationModel:
     """Test ResumeEducation model."""
     
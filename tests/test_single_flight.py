@@ -0,0 +1,110 @@
+"""Tests for single-flight coalescing around cache lookups"""
+
+import threading
+import time
+
+import pytest
+from services.single_flight import LocalLockBackend, SingleFlight, SingleFlightCache
+
+
+class DictCache:
+    """CacheService stand-in"""
+
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value, ttl=3600):
+        self.data[key] = value
+
+
+def run_concurrently(fns):
+    barrier = threading.Barrier(len(fns))
+    results = [None] * len(fns)
+
+    def worker(i, fn):
+        barrier.wait()
+        results[i] = fn()
+
+    threads = [threading.Thread(target=worker, args=(i, fn)) for i, fn in enumerate(fns)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return results
+
+
+def slow_compute(calls, value, delay=0.1):
+    def compute():
+        calls.append(1)
+        time.sleep(delay)
+        return value
+    return compute
+
+
+class TestSingleFlight:
+    def test_concurrent_misses_compute_once_in_process(self):
+        cache, calls = DictCache(), []
+        flight = SingleFlightCache(cache)
+        compute = slow_compute(calls, {'salary': 100})
+        results = run_concurrently([lambda: flight.get_or_compute('k', compute)] * 8)
+        assert len(calls) == 1
+        assert all(value == {'salary': 100} for value, _ in results)
+        assert cache.data['k'] == {'salary': 100}
+        assert flight.get_or_compute('k', compute) == ({'salary': 100}, True)
+
+    def test_lock_coalesces_across_instances(self):
+        # Two SingleFlightCache objects play the part of two worker processes
+        cache, locks, calls = DictCache(), LocalLockBackend(), []
+        workers = [SingleFlightCache(cache, locks, poll_interval=0.01) for _ in range(2)]
+        compute = slow_compute(calls, 42)
+        results = run_concurrently([lambda w=w: w.get_or_compute('k', compute) for w in workers])
+        assert len(calls) == 1
+        assert sorted(results) == [(42, False), (42, True)]
+        assert not locks.is_locked('lock:k')
+
+    def test_errors_reach_all_waiters_and_none_is_not_cached(self):
+        calls = []
+
+        def failing():
+            calls.append(1)
+            time.sleep(0.1)
+            raise RuntimeError('llm down')
+
+        flight = SingleFlight()
+
+        def call():
+            try:
+                return flight.do('k', failing)
+            except RuntimeError as e:
+                return str(e)
+
+        assert run_concurrently([call] * 4) == ['llm down'] * 4
+        assert len(calls) == 1
+
+        cache = DictCache()
+        assert SingleFlightCache(cache, LocalLockBackend()).get_or_compute('missing', lambda: None) == (None, False)
+        assert 'missing' not in cache.data
+
+    def test_local_lock_expires_and_checks_token(self):
+        locks = LocalLockBackend()
+        token = locks.acquire('lock:k', 0.05)
+        assert token and locks.acquire('lock:k', 0.05) is None
+        locks.release('lock:k', 'not-the-owner')
+        assert locks.is_locked('lock:k')
+        time.sleep(0.06)
+        assert locks.acquire('lock:k', 1.0) is not None
+
+
+    def test_heartbeat_keeps_lock_past_ttl(self):
+        cache, locks, calls = DictCache(), LocalLockBackend(), []
+        workers = [SingleFlightCache(cache, locks, lock_ttl=0.06, wait_timeout=2.0, poll_interval=0.01)
+                   for _ in range(2)]
+        # The computation outlives the lock TTL several times over
+        compute = slow_compute(calls, 7, delay=0.3)
+        results = run_concurrently([lambda w=w: w.get_or_compute('k', compute) for w in workers])
+        assert len(calls) == 1
+        assert sorted(results) == [(7, False), (7, True)]
+        assert not locks.is_locked('lock:k')
@@ -0,0 +1,43 @@
+"""Tests for the single-pass skill extractor"""
+
+import random
+import re
+
+from app.services.parsing.skill_extractor import TECH_SKILLS_DB, SkillExtractor
+
+
+def per_skill_counts(text):
+    """Reference: one \\b-bounded regex per skill, as before"""
+    counts = {}
+    for skill in TECH_SKILLS_DB:
+        found = re.findall(r'\b' + re.escape(skill) + r'\b', text.lower())
+        if found:
+            counts[skill] = len(found)
+    return counts
+
+
+class TestSkillExtractor:
+    def test_matches_per_skill_regex_counts(self):
+        extractor = SkillExtractor(aliases={})
+        rng = random.Random(0)
+        vocab = list(TECH_SKILLS_DB) + ['gitx', 'pythonic', 'java-script', 'Docker,', 'AWS.', 'опыт', 'redis_']
+        for _ in range(200):
+            text = ' '.join(rng.choice(vocab) for _ in range(rng.randint(0, 40)))
+            counts = {s['name'].lower(): s['mentions'] for s in extractor.extract(text)}
+            assert counts == per_skill_counts(text)
+
+    def test_aliases_fold_into_canonical_skill(self):
+        skills = {s['name']: s for s in SkillExtractor().extract(
+            'Go, golang and K8s; Kubernetes, C++ / c# and Node.js on Postgres')}
+        assert skills['Golang']['mentions'] == 2
+        assert skills['Kubernetes']['mentions'] == 2
+        assert skills['Cpp']['mentions'] == 1
+        assert skills['Csharp']['mentions'] == 1
+        assert skills['Nodejs']['mentions'] == 1
+        assert skills['Postgresql']['mentions'] == 1
+        assert 'Gopher' not in skills and SkillExtractor().extract('gopher going') == []
+
+    def test_custom_taxonomy(self):
+        extractor = SkillExtractor({'terraform': {'category': 'devops'}}, {'tf': 'terraform', 'x': 'missing'})
+        [skill] = extractor.extract('Terraform, tf modules')
+        assert (skill['name'], skill['mentions'], skill['level']) == ('Terraform', 2, 2)
@@ -0,0 +1,96 @@
+"""Tests for the NumPy vector index used by embedding matching"""
+
+import numpy as np
+import pytest
+from services.vector_index import VectorIndex
+
+
+@pytest.fixture
+def clustered():
+    rng = np.random.default_rng(0)
+    centers = rng.normal(size=(16, 32))
+    vectors = np.vstack([c + 0.05 * rng.normal(size=(100, 32)) for c in centers])
+    return np.arange(len(vectors)) + 1000, vectors.astype(np.float32)
+
+
+class TestVectorIndex:
+    def test_flat_search_is_exact(self, clustered):
+        ids, vectors = clustered
+        index = VectorIndex()
+        index.add(ids, vectors)
+        
+        query = vectors[5] + 0.01
+        found, scores = index.search(query, k=10)
+        normed = VectorIndex.normalize(vectors)
+        expected = np.argsort(-(normed @ VectorIndex.normalize(query)[0]), kind='stable')[:10]
+        assert found.tolist() == ids[expected].tolist()
+        assert scores[0] == pytest.approx(float(np.max(normed @ VectorIndex.normalize(query)[0])), rel=1e-5)
+    
+    def test_ivf_recall(self, clustered):
+        ids, vectors = clustered
+        flat = VectorIndex()
+        ivf = VectorIndex(mode='ivf', n_lists=16, n_probe=3, min_train_size=256)
+        flat.add(ids, vectors)
+        ivf.add(ids, vectors)
+        assert ivf.centroids is not None
+        
+        hits = 0
+        for query in vectors[::40]:
+            exact = set(flat.search(query, k=20)[0].tolist())
+            hits += len(exact & set(ivf.search(query, k=20)[0].tolist()))
+        assert hits / (20 * len(vectors[::40])) > 0.9
+    
+    def test_incremental_update_and_remove(self):
+        index = VectorIndex()
+        index.add([1, 2, 3], np.eye(3))
+        index.add([2], [[1.0, 0.0, 0.0]])
+        assert index.remove([1, 99]) == 1
+        found, _ = index.search([1.0, 0.0, 0.0], k=2)
+        assert found.tolist() == [2, 3]
+        assert len(index) == 2
+        index.compact()
+        assert index.search([0.0, 0.0, 1.0], k=1)[0].tolist() == [3]
+    
+    def test_persistence_is_memory_mapped(self, tmp_path, clustered):
+        ids, vectors = clustered
+        index = VectorIndex(mode='ivf', n_lists=8, min_train_size=100)
+        index.add(ids, vectors)
+        index.remove([ids[0]])
+        directory = str(tmp_path / 'resumes')
+        index.save(directory)
+        
+        loaded = VectorIndex.load(directory)
+        assert loaded.get_stats()['memory_mapped']
+        assert len(loaded) == len(ids) - 1
+        assert loaded.search(vectors[3], k=1)[0].tolist() == [ids[3]]
+        
+        loaded.add([1], vectors[:1])
+        assert loaded.search(vectors[0], k=1)[0].tolist() == [1]
+        loaded.save(directory)
+        assert len(VectorIndex.open(directory)) == len(ids)
+    
+    def test_ivf_postings_track_updates(self, clustered):
+        ids, vectors = clustered
+        index = VectorIndex(mode='ivf', n_lists=16, n_probe=16, min_train_size=256)
+        index.add(ids, vectors)
+        assert sum(len(rows) for rows in index._postings) == len(ids)
+        
+        # Replacing and removing leaves dead rows in the postings; search skips them
+        index.add([ids[0]], -vectors[:1])
+        index.remove([ids[1]])
+        found = index.search(vectors[1], k=len(ids))[0].tolist()
+        assert ids[1] not in found and found.count(ids[0]) == 1
+        assert len(found) == len(ids) - 1
+    
+    def test_save_swaps_symlink_and_prunes_versions(self, tmp_path):
+        directory = str(tmp_path / 'jobs')
+        index = VectorIndex()
+        for i in range(3):
+            index.add([i], np.eye(3)[i:i + 1])
+            index.save(directory, keep_versions=2)
+        
+        assert (tmp_path / 'jobs').is_symlink()
+        assert len(list((tmp_path / 'jobs.versions').iterdir())) == 2
+        loaded = VectorIndex.load(directory)
+        assert len(loaded) == 3
+        assert loaded.source == str((tmp_path / 'jobs').resolve())
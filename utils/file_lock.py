@@ -0,0 +1,27 @@
+"""Cross-process file locking for on-disk stores shared by several workers."""
+
+import os
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows dev machines: single-process use only
+    fcntl = None
+
+
+@contextmanager
+def file_lock(path):
+    """Hold an exclusive ``flock`` on ``path`` (created if missing).
+
+    Gunicorn and Celery workers writing the same store take this lock around
+    each read-modify-write, so appends and saves never interleave.
+    """
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path, 'a') as handle:
+        if fcntl is not None:
+            fcntl.flock(handle.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
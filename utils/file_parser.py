@@ -1,36 +1,143 @@
+import asyncio
+import io
+import os
+from concurrent.futures.process import BrokenProcessPool
+from functools import lru_cache
+from typing import Iterable, Iterator, Optional, Union
+
 import PyPDF2
 from docx import Document
 import re
 
-def extract_text_from_pdf(file_path):
+from utils.process_pool import can_start_workers, get_process_pool, shutdown_process_pool
+
+# Upper bounds so a huge upload cannot tie up a worker
+MAX_PAGES = int(os.getenv('PARSE_MAX_PAGES', '100'))
+MAX_TEXT_BYTES = int(os.getenv('PARSE_MAX_TEXT_BYTES', str(2 * 1024 * 1024)))
+# PDFs with at least this many pages are split across processes when workers > 1
+PARALLEL_MIN_PAGES = 16
+
+Source = Union[str, bytes, io.IOBase]
+
+
+def _open(source: Source):
+    return io.BytesIO(source) if isinstance(source, (bytes, bytearray)) else source
+
+
+def limit_text(chunks: Iterable[str], max_bytes: Optional[int] = MAX_TEXT_BYTES) -> Iterator[str]:
+    """Pass chunks through until ``max_bytes`` of UTF-8 text have been yielded."""
+    remaining = max_bytes
+    for chunk in chunks:
+        if remaining is None:
+            yield chunk
+            continue
+        data = chunk.encode('utf-8')
+        if len(data) >= remaining:
+            yield data[:remaining].decode('utf-8', errors='ignore')
+            return
+        remaining -= len(data)
+        yield chunk
+
+
+@lru_cache(maxsize=2)
+def _cached_reader(path: str, mtime_ns: int, size: int) -> PyPDF2.PdfReader:
+    # Keyed on mtime/size so a rewritten file is opened again
+    return PyPDF2.PdfReader(path)
+
+
+def _pdf_page_range(path: str, mtime_ns: int, size: int, start: int, stop: int) -> list:
+    """Text of pages ``[start, stop)``; process-pool entry point.
+
+    Each worker opens a document once and reuses the reader for every
+    range of it that it is given.
+    """
+    reader = _cached_reader(path, mtime_ns, size)
+    return [reader.pages[i].extract_text() or "" for i in range(start, stop)]
+
+
+def iter_pdf_pages(source: Source, max_pages: Optional[int] = MAX_PAGES,
+                   workers: int = 1, pages_per_task: int = 8) -> Iterator[str]:
+    """Yield PDF page text one page at a time, in page order.
+
+    With ``workers > 1``, a file path and a long document, page ranges are
+    extracted on the process's shared pool; workers receive only the path
+    and page bounds. Pages are still yielded in order, and unstarted ranges
+    are cancelled if the consumer stops early. Bytes and file objects, and
+    calls from daemonic processes (e.g. Celery prefork children), are
+    extracted serially.
+    """
+    reader = PyPDF2.PdfReader(_open(source))
+    page_count = len(reader.pages)
+    if max_pages is not None:
+        page_count = min(page_count, max_pages)
+
+    if (workers <= 1 or page_count < PARALLEL_MIN_PAGES
+            or not isinstance(source, (str, os.PathLike)) or not can_start_workers()):
+        for i in range(page_count):
+            yield reader.pages[i].extract_text() or ""
+        return
+
+    path = os.fspath(source)
+    stat = os.stat(path)
+    pool = get_process_pool('pdf_pages', workers)
+    futures = []
+    try:
+        for start in range(0, page_count, pages_per_task):
+            futures.append(pool.submit(_pdf_page_range, path, stat.st_mtime_ns, stat.st_size,
+                                       start, min(start + pages_per_task, page_count)))
+        for future in futures:
+            yield from future.result()
+    except BrokenProcessPool:
+        shutdown_process_pool('pdf_pages')
+        raise
+    finally:
+        for future in futures:
+            future.cancel()
+
+
+def iter_docx_text(source: Source) -> Iterator[str]:
+    """Yield paragraph texts, then table cell texts."""
+    doc = Document(_open(source))
+    for paragraph in doc.paragraphs:
+        yield paragraph.text
+    for table in doc.tables:
+        for row in table.rows:
+            for cell in row.cells:
+                yield cell.text
+
+
+def extract_text_from_pdf(file_path, max_pages: Optional[int] = MAX_PAGES,
+                          max_bytes: Optional[int] = MAX_TEXT_BYTES, workers: int = 1):
     """Extract text from PDF file."""
     try:
-        text = ""
-        with open(file_path, 'rb') as file:
-            pdf_reader = PyPDF2.PdfReader(file)
-            for page in pdf_reader.pages:
-                text += page.extract_text()
-        return text
+        return "".join(limit_text(iter_pdf_pages(file_path, max_pages, workers), max_bytes))
     except Exception as e:
         print(f"Error reading PDF {file_path}: {str(e)}")
         return ""
 
-def extract_text_from_doc(file_path):
+def extract_text_from_doc(file_path, max_bytes: Optional[int] = MAX_TEXT_BYTES):
     """Extract text from DOCX file."""
     try:
-        doc = Document(file_path)
-        text = ""
-        for paragraph in doc.paragraphs:
-            text += paragraph.text
-        for table in doc.tables:
-            for row in table.rows:
-                for cell in row.cells:
-                    text += cell.text
-        return text
+        return "".join(limit_text(iter_docx_text(file_path), max_bytes))
     except Exception as e:
         print(f"Error reading DOCX {file_path}: {str(e)}")
         return ""
 
+def parse_file(file_path, max_pages: Optional[int] = MAX_PAGES,
+               max_bytes: Optional[int] = MAX_TEXT_BYTES, workers: int = 1):
+    """Extract text from an uploaded PDF, DOCX or plain-text file."""
+    ext = os.path.splitext(str(file_path))[1].lower()
+    if ext == '.pdf':
+        return extract_text_from_pdf(file_path, max_pages, max_bytes, workers)
+    if ext in ('.docx', '.doc'):
+        return extract_text_from_doc(file_path, max_bytes)
+    with open(file_path, 'r', encoding='utf-8', errors='ignore') as file:
+        return "".join(limit_text(iter(lambda: file.read(64 * 1024), ''), max_bytes))
+
+async def parse_file_async(file_path, **limits):
+    """``parse_file`` in a worker thread, so async servers keep serving."""
+    return await asyncio.to_thread(parse_file, file_path, **limits)
+
 def clean_text(text):
     """Clean and normalize text."""
     text = re.sub(r'\s+', ' ', text)
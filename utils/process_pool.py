@@ -0,0 +1,59 @@
+"""Per-process worker pools shared by batch jobs (parsing, encoding, PDF text).
+
+Pools are started on first use and reused by every later call in the same
+process, so a batch does not pay for forking (and re-importing heavy
+modules) each time. A pool inherited across ``fork`` is never reused: its
+workers belong to the parent.
+"""
+
+import atexit
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+_pools: Dict[str, Tuple[int, int, ProcessPoolExecutor]] = {}
+_lock = threading.Lock()
+
+
+def can_start_workers() -> bool:
+    """False in daemonic processes (e.g. Celery prefork children), which cannot have children."""
+    return not multiprocessing.current_process().daemon
+
+
+def get_process_pool(name: str, workers: int) -> ProcessPoolExecutor:
+    """Return this process's pool called ``name``, restarting it only if ``workers`` changes."""
+    with _lock:
+        entry = _pools.get(name)
+        if entry is not None:
+            pid, size, pool = entry
+            if pid == os.getpid() and size == workers:
+                return pool
+            if pid == os.getpid():
+                pool.shutdown(wait=True)
+        pool = ProcessPoolExecutor(max_workers=workers)
+        _pools[name] = (os.getpid(), workers, pool)
+        return pool
+
+
+def shutdown_process_pool(name: Optional[str] = None) -> None:
+    """Stop one pool, or all of them; they start again on next use."""
+    with _lock:
+        for key in ([name] if name is not None else list(_pools)):
+            entry = _pools.pop(key, None)
+            if entry is not None and entry[0] == os.getpid():
+                entry[2].shutdown(wait=True)
+
+
+def pool_map(name: str, workers: int, fn: Callable, *iterables: Iterable) -> List:
+    """``map`` over the named pool; a broken pool is dropped so the next call starts afresh."""
+    try:
+        return list(get_process_pool(name, workers).map(fn, *iterables))
+    except BrokenProcessPool:
+        shutdown_process_pool(name)
+        raise
+
+
+atexit.register(shutdown_process_pool)